@@ -0,0 +1,354 @@
+"""
+Title: To-Do List Benchmark Suite
+Description: Times the application's task panel operations on synthetic task lists & flags regressions
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tkinter
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+
+SIZES = [1000, 10000, 100000, 1000000]
+REPEATS = 20  # Calls timed per operation, whole list operations run once
+TOLERANCE = 0.2  # Slowdown flagged as a regression, as a fraction of the baseline
+MIN_SECONDS = 0.001  # Timing differences below this are noise, never regressions
+BULK_ROWS = 500  # Rows selected by bulk operations, at most a tenth of the tasks
+WIDGET_COMMANDS = {"button", "canvas", "checkbutton", "entry", "frame", "label", "listbox", "menu", "menubutton",
+                   "radiobutton", "scrollbar", "text", "toplevel"}
+
+
+class StubTcl:
+    """
+    This class stands in for the Tcl interpreter of a Tk root so the application runs without
+    a display. Every command succeeds & only counts, except for what the application reads back.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.variables = {}
+        self.commands = {}  # Tcl command name -> Python callback
+        self.options = {}  # Widget path -> option -> value, for cget & invoke
+        self.timers = {}  # Timer ID -> callback command name, timers never fire
+
+    def call(self, *args):
+        self.calls += 1
+        if len(args) == 1 and isinstance(args[0], tuple): args = args[0]
+        if len(args) < 2: return ""
+        if args[0] in WIDGET_COMMANDS: self.options[args[1]] = dict(zip(args[2::2], args[3::2]))
+        elif args[1] == "configure" and len(args) > 2:
+            self.options.setdefault(args[0], {}).update(zip(args[2::2], args[3::2]))
+        elif args[1] == "cget": return self.options.get(args[0], {}).get(args[2], "10")
+        elif args[0] == "after":
+            if args[1] == "info": return self.timers.get(args[2], ""), "timer"
+            if args[1] == "cancel": self.timers.pop(args[2], None)
+            else:
+                self.timers[f"after#{self.calls}"] = args[-1]
+                return f"after#{self.calls}"
+        elif args[1] == "invoke":
+            command = self.commands.get(self.options.get(args[0], {}).get("-command"))
+            return command() if command is not None else ""
+
+        # Fonts & geometry are read back as numbers
+        if args[0] in ("winfo", "font"): return "10"
+        return ""
+
+    def eval(self, script):
+        self.calls += 1
+        return ""
+
+    def createcommand(self, name, function): self.commands[name] = function
+
+    def deletecommand(self, name): self.commands.pop(name, None)
+
+    def globalsetvar(self, name, value): self.variables[name] = value
+
+    def globalgetvar(self, name): return self.variables.get(name, "")
+
+    def globalunsetvar(self, name): self.variables.pop(name, None)
+
+    setvar, getvar, unsetvar = globalsetvar, globalgetvar, globalunsetvar
+
+    def splitlist(self, value): return value if isinstance(value, tuple) else tuple(str(value).split())
+
+    split = splitlist
+
+    def getint(self, value): return int(value or 0)
+
+    def getdouble(self, value): return float(value or 0)
+
+    def getboolean(self, value): return value not in ("", "0", "false", "no", "off", 0, False)
+
+    def wantobjects(self): return 1
+
+    def mainloop(self, threshold=0): pass
+
+    def dooneevent(self, flags=0): return 0
+
+    def quit(self): pass
+
+    def willdispatch(self): pass
+
+
+class CountingTcl:
+    """ This class counts the Tcl calls of a real Tk root's interpreter """
+
+    def __init__(self, tk):
+        self.tk = tk
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self.tk.call(*args)
+
+    def eval(self, script):
+        self.calls += 1
+        return self.tk.eval(script)
+
+    def mainloop(self, threshold=0):
+        """ The application starts its event loop on import, the benchmarks drive it instead """
+
+    def __getattr__(self, name): return getattr(self.tk, name)
+
+
+def patchTk(stub):
+    """ Makes the application's Tk root a withdrawn counting one, or a stub when there's no display """
+
+    class BenchmarkTk(tkinter.Tk):
+        def __init__(self, *args, **kwargs):
+            if stub:
+                self.master, self.children, self._w = None, {}, "."
+                self._tclCommands, self._tkloaded = None, True
+                self.tk = StubTcl()
+                if tkinter._support_default_root: tkinter._default_root = self
+            else:
+                super().__init__(*args, **kwargs)
+                self.tk = CountingTcl(self.tk)
+                self.withdraw()
+
+    tkinter.Tk = BenchmarkTk
+
+
+def importApplication(stub, workDirectory):
+    """ Imports the application against a benchmark root, saving under workDirectory """
+    patchTk(stub)
+    os.makedirs(os.path.join(workDirectory, "application"), exist_ok=True)
+    os.chdir(os.path.join(workDirectory, "application"))  # Application saves to '../persistentSave.*'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import todoLIstApplication as app
+
+    # Dialogs answer right away, an error dialog means an operation didn't run
+    def showerror(title, message): raise RuntimeError(message)
+    app.messagebox = SimpleNamespace(showinfo=lambda *args, **kwargs: None, showerror=showerror)
+    app.filedialog = SimpleNamespace(asksaveasfilename=lambda **kwargs: os.path.join(workDirectory, "tasks.jsonl"))
+    return app
+
+
+def fillStore(app, size):
+    """ Replaces every task with size synthetic tasks & saves them, like a previous session would have """
+    app.clearAll()
+    app.undoHistory.clear()  # A previous session's tasks can't be undone, the Clear All isn't kept either
+    observers, app.store.observers = app.store.observers, []  # Filling isn't measured, nothing is indexed yet
+    try:
+        for i in range(size):
+            app.store.addTask(f"Task {random.randrange(size)}", random.choice(["", "2026/9/1/12:00", "2027/1/1/9:30"]),
+                              random.sample(["Work", "Personal", "Hobby", "Other"], random.randint(0, 2)),
+                              f"Description {i}")
+    finally: app.store.observers = observers
+    app.updatePersistentFile()
+
+
+# ============== Operations ==============
+
+def selectRow(app, repeat):
+    """ Selects a row spread over the task panel like a user click """
+    app.tasksPanelView.selection_clear(0, "end")
+    app.tasksPanelView.selection_set(repeat * 7919 % len(app.store))
+
+
+def selectRows(app, repeat):
+    """ Selects BULK_ROWS consecutive rows like a shift click """
+    app.tasksPanelView.selection_clear(0, "end")
+    count = min(BULK_ROWS, len(app.store) // 10)
+    first = repeat * 7919 % max(1, len(app.store) - count)
+    app.tasksPanelView.selection_set(first, first + count - 1)
+
+
+def addTask(app, repeat):
+    """ Opens the add task window & submits it """
+    app.addNewTask()
+    window = list(app.root.children.values())[-1]
+    frames = [window]
+    while frames:
+        widget = frames.pop()
+        if isinstance(widget, tkinter.Button) and widget.cget("text") == "Submit": return widget.invoke()
+        frames.extend(widget.children.values())
+    raise RuntimeError("Add task window has no submit button")
+
+
+def deleteTask(app, repeat):
+    selectRow(app, repeat)
+    app.deleteTask()
+
+
+def markTaskDoneOrUndone(app, repeat):
+    selectRow(app, repeat)
+    app.markTaskDoneOrUndone()
+
+
+def prioritizeOrUnprioritizeTask(app, repeat):
+    selectRow(app, repeat)
+    app.prioritizeOrUnprioritizeTask()
+
+
+def bulkDeleteTasks(app, repeat):
+    selectRows(app, repeat)
+    app.deleteTask()
+
+
+def bulkMarkTasksDoneOrUndone(app, repeat):
+    selectRows(app, repeat)
+    app.markTaskDoneOrUndone()
+
+
+def searchTasks(app, repeat):
+    app.entryVar.set(f"task {repeat}")
+    app.searchTasks()
+
+
+def fuzzySearch(app, repeat):
+    app.searchTypeVar.set("Fuzzy")
+    app.entryVar.set(f"tsak {repeat}")
+    app.searchTasks()
+
+
+def sortTasks(app, repeat):
+    app.sortVar.set(["Name", "Deadline", "Creation Date", "Default"][repeat % 4])
+    app.sortTasks()
+
+
+def flipSort(app, repeat): app.flipSort()
+
+
+def loadSavedFile(app, repeat): app.loadSavedFile()
+
+
+def saveTaskList(app, repeat): app.saveTaskList()
+
+
+def resetView(app):
+    """ Returns to an unsearched, default sorted & unflipped task panel """
+    if app.pendingSearch is not None: app.root.after_cancel(app.pendingSearch)
+    app.entryVar.set("")
+    app.searchTypeVar.set("Name")
+    app.sortVar.set("Default")
+    if app.store.tasksListFlipped: app.store.setFlipped(False)
+    app.searchTasks()
+
+
+# Operation -> calls timed, None for REPEATS
+OPERATIONS = {loadSavedFile: 1, addTask: None, deleteTask: None, markTaskDoneOrUndone: None,
+              prioritizeOrUnprioritizeTask: None, bulkDeleteTasks: None, bulkMarkTasksDoneOrUndone: None,
+              searchTasks: None, fuzzySearch: None, sortTasks: 4, flipSort: None, saveTaskList: 1}
+
+
+def measure(app, operation, calls):
+    """ Returns median seconds & Tcl calls per call, then the peak traced bytes of one more call """
+    tcl = app.root.tk
+    seconds = []
+    tclBefore = tcl.calls
+    for repeat in range(calls):
+        start = time.perf_counter()
+        operation(app, repeat)
+        app.root.update_idletasks()
+        seconds.append(time.perf_counter() - start)
+    tclCalls = (tcl.calls - tclBefore) / calls
+
+    # Traced separately as tracing slows everything down
+    tracemalloc.start()
+    baseBytes = tracemalloc.get_traced_memory()[0]
+    operation(app, calls)
+    app.root.update_idletasks()
+    peakBytes = tracemalloc.get_traced_memory()[1] - baseBytes
+    tracemalloc.stop()
+    resetView(app)
+    return statistics.median(seconds), sum(seconds), tclCalls, peakBytes
+
+
+def runSuite(app, sizes, repeats):
+    results = []
+    for size in sizes:
+        fillStore(app, size)
+        for operation, calls in OPERATIONS.items():
+            calls = calls or repeats
+            seconds, totalSeconds, tclCalls, peakBytes = measure(app, operation, calls)
+            results.append({"size": size, "operation": operation.__name__, "calls": calls, "seconds": seconds,
+                            "totalSeconds": totalSeconds, "tclCalls": tclCalls, "peakBytes": peakBytes})
+            print(f"{size:>8} tasks  {operation.__name__:<30} {seconds * 1000:10.3f} ms  "
+                  f"{tclCalls:8.0f} Tcl calls  {peakBytes / 1024:10.0f} KiB peak", flush=True)
+    return results
+
+
+# ============== Baseline Comparison ==============
+
+def compare(results, baseline, tolerance):
+    """ Returns a line per measurement that got worse than baseline by more than tolerance """
+    baselineOf = {(result["size"], result["operation"]): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = baselineOf.get((result["size"], result["operation"]))
+        if before is None: continue
+        for metric, floor in (("seconds", MIN_SECONDS), ("tclCalls", 1), ("peakBytes", 64 * 1024)):
+            if result[metric] > before[metric] * (1 + tolerance) and result[metric] - before[metric] > floor:
+                regressions.append(f"{result['size']:>8} tasks  {result['operation']:<30} {metric}: "
+                                   f"{before[metric]:.6g} -> {result[metric]:.6g}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the application's operations on synthetic task lists")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, metavar="TASKS")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="calls timed per operation")
+    parser.add_argument("--stub", action="store_true", help="use a stub Tk root even when a display is available")
+    parser.add_argument("--output", default="benchmarkResults.json", help="machine-readable results file")
+    parser.add_argument("--baseline", help="results file to compare against, exits with 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown, 0.2 = 20%%")
+    arguments = parser.parse_args(argv)
+    output, baselinePath = os.path.abspath(arguments.output), arguments.baseline and os.path.abspath(arguments.baseline)
+
+    # A withdrawn real root is used whenever a display is available
+    stub = arguments.stub
+    if not stub:
+        try: tkinter.Tk().destroy()
+        except tkinter.TclError: stub = True
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as workDirectory:
+        app = importApplication(stub, workDirectory)
+        try: results = runSuite(app, arguments.sizes, arguments.repeats)
+        finally: app.onClosing()
+        os.chdir(os.path.dirname(output))
+
+    report = {"created": datetime.now().isoformat(" ", "seconds"), "python": platform.python_version(),
+              "platform": platform.platform(), "tk": "stub" if stub else "withdrawn", "results": results}
+    with open(output, "w") as f: json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if baselinePath:
+        with open(baselinePath) as f: baseline = json.load(f)
+        regressions = compare(results, baseline, arguments.tolerance)
+        for line in regressions: print(f"REGRESSION {line}")
+        if regressions: sys.exit(1)
+        print(f"No regressions against {baselinePath}")
+
+
+if __name__ == "__main__":
+    main()
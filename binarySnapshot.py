@@ -0,0 +1,318 @@
+import mmap
+import os
+import pickle
+import struct
+import weakref
+from array import array
+from bisect import bisect_left
+
+from task import Task, internCategories, taskFields
+from taskStorage import JournalStorage
+
+MAGIC = b"TODOBIN1"
+HEADER = struct.Struct("<8sQQQQ")  # Magic, task count, then offsets of string heap, lazy field heap & pickled metadata
+# Task record: ID, order label, creation time, due time, flags, then (heap offset, byte length) of each string field
+RECORD = struct.Struct("<qqqqB" + "QI" * 5)
+STRING_FIELDS = ["name", "deadline", "category", "description", "reminder"]  # Order of a record's string fields
+LAZY_FIELDS = {slot: STRING_FIELDS.index(slot) for slot in ["deadline", "description"]}  # Decoded when first read
+NO_DUE = -2 ** 63  # Due time of tasks without a valid deadline
+DONE, PRIORITY, HAS_REMINDER = 1, 2, 4  # Record flags
+CATEGORY_SEPARATOR = "\x1f"
+mappedSnapshots = weakref.WeakValueDictionary()  # Path -> its mapping while tasks or storage still use it
+
+
+class BinarySnapshot:
+    """
+    This class opens a binary snapshot with mmap: fixed-width task records, an ID index & UTF-8
+    string heaps. Loading only unpacks the records & short strings, deadline texts & descriptions are
+    kept in their own heap & decoded from the mapping when first read, e.g. when a task's row is shown.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f: self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, heapOffset, lazyHeapOffset, metaOffset = HEADER.unpack_from(self.map)
+        if magic != MAGIC: raise ValueError(f"{path} isn't a binary task snapshot")
+        view = memoryview(self.map)
+        recordsEnd = HEADER.size + count * RECORD.size
+        indexStart = aligned(recordsEnd)
+        self.records = view[HEADER.size:recordsEnd]  # In task store order
+        self.sortedIds = view[indexStart:indexStart + 8 * count].cast('q')
+        self.rowOf = view[indexStart + 8 * count:indexStart + 16 * count].cast('q')  # Record of each sorted ID
+        self.heap = view[heapOffset:lazyHeapOffset]
+        self.lazyHeap = view[lazyHeapOffset:metaOffset]
+        self.meta = pickle.loads(view[metaOffset:])
+
+    def __reduce__(self):
+        """ Pickles as its path, so journaled tasks keep reading undecoded fields from the same mapping """
+        return mapSnapshot, (self.path,)
+
+    def saveData(self):
+        """ Returns snapshot content in save file format, its tasks as MappedTasks """
+        data = dict(self.meta)
+        data["tasks"] = self.tasks()
+        return data
+
+    def tasks(self):
+        heap = self.heap
+        categoriesAt = {}  # Heap offset -> category tuple, tasks with the same categories share one
+        tasks = []
+        for (taskId, order, created, due, flags, nameOffset, nameLength, _, _, categoryOffset, categoryLength,
+             _, _, reminderOffset, reminderLength) in RECORD.iter_unpack(self.records):
+            task = MappedTask.__new__(MappedTask)
+            task.id = taskId
+            task.order = order
+            task.name = str(heap[nameOffset:nameOffset + nameLength], "utf-8")
+            task.deadline = task.description = self  # Read from the snapshot when first used
+            category = categoriesAt.get(categoryOffset)
+            if category is None:
+                text = str(heap[categoryOffset:categoryOffset + categoryLength], "utf-8")
+                category = internCategories(text.split(CATEGORY_SEPARATOR) if text else ())
+                categoriesAt[categoryOffset] = category
+            task.category = category
+            task.created = created
+            task.done = bool(flags & DONE)
+            task.priority = bool(flags & PRIORITY)
+            task.reminder = str(heap[reminderOffset:reminderOffset + reminderLength], "utf-8") \
+                if flags & HAS_REMINDER else None
+            task.due = None if due == NO_DUE else due
+            tasks.append(task)
+
+        # Unpacked pages leave resident memory, the lazy heap is read back from the page cache when needed
+        if hasattr(self.map, "madvise"): self.map.madvise(mmap.MADV_DONTNEED)
+        return tasks
+
+    def encoded(self, taskId, field):
+        """ Returns a task's lazily loaded string field as UTF-8 bytes within the mapping """
+        record = RECORD.unpack_from(self.records, self.rowOf[bisect_left(self.sortedIds, taskId)] * RECORD.size)
+        offset, length = record[5 + 2 * field], record[6 + 2 * field]
+        return self.lazyHeap[offset:offset + length]
+
+    def decode(self, taskId, field): return str(self.encoded(taskId, field), "utf-8")
+
+
+def mapSnapshot(path):
+    """ Returns the snapshot at path, mapped once however many tasks & journal records refer to it """
+    snapshot = mappedSnapshots.get(path)
+    if snapshot is None: snapshot = mappedSnapshots[path] = BinarySnapshot(path)
+    return snapshot
+
+
+def aligned(offset): return (offset + 7) & ~7
+
+
+def lazyField(slot, field):
+    """ Returns a property decoding slot from its task's snapshot when first read, until then the slot holds it """
+    stored = getattr(Task, slot)
+
+    def get(task):
+        value = stored.__get__(task)
+        if type(value) is BinarySnapshot:
+            value = value.decode(task.id, field)
+            stored.__set__(task, value)
+        return value
+    return property(get, stored.__set__)
+
+
+class MappedTask(Task):
+    """ A task loaded from a binary snapshot, it behaves like any task once its lazy fields are decoded """
+
+    __slots__ = ()
+    deadline = lazyField("deadline", LAZY_FIELDS["deadline"])
+    description = lazyField("description", LAZY_FIELDS["description"])
+
+
+getDeadline, getDescription = Task.deadline.__get__, Task.description.__get__  # Slot values without decoding
+
+
+def savedFields(task):
+    """ Returns task's slot values like taskFields, fields never decoded are their snapshot instead """
+    if type(task) is not MappedTask: return taskFields(task)
+    return (task.id, task.order, task.name, getDeadline(task), task.category, task.created, getDescription(task),
+            task.done, task.priority, task.reminder, task.due)
+
+
+def writeBinarySnapshot(f, meta, rows):
+    """
+    Writes a binary snapshot of savedFields rows in task store order & the pickled metadata, a field
+    that's still a snapshot is copied over from that snapshot's heap as it is
+    """
+    heap, lazyHeap = bytearray(), bytearray()
+    records = bytearray()
+    ids = array('q')
+    categoriesAt = {}  # Category tuple -> (heap offset, length), written once
+
+    def put(value, heap=heap):
+        offset = len(heap)
+        heap.extend(value.encode() if type(value) is str else value)
+        return offset, len(heap) - offset
+
+    for taskId, order, name, deadline, category, created, description, done, priority, reminder, due in rows:
+        if type(deadline) is BinarySnapshot: deadline = deadline.encoded(taskId, LAZY_FIELDS["deadline"])
+        if type(description) is BinarySnapshot: description = description.encoded(taskId, LAZY_FIELDS["description"])
+        categorySpan = categoriesAt.get(category)
+        if categorySpan is None: categorySpan = categoriesAt[category] = put(CATEGORY_SEPARATOR.join(category))
+        flags = DONE * done | PRIORITY * priority | HAS_REMINDER * (reminder is not None)
+        records += RECORD.pack(taskId, order, created, NO_DUE if due is None else due, flags,
+                               *put(name), *put(deadline, lazyHeap), *categorySpan,
+                               *put(description, lazyHeap), *put(reminder or ""))
+        ids.append(taskId)
+
+    rowOf = array('q', sorted(range(len(ids)), key=ids.__getitem__))
+    sortedIds = array('q', map(ids.__getitem__, rowOf))
+    indexStart = aligned(HEADER.size + len(records))
+    heapOffset = indexStart + 16 * len(ids)
+    f.write(HEADER.pack(MAGIC, len(ids), heapOffset, heapOffset + len(heap), heapOffset + len(heap) + len(lazyHeap)))
+    f.write(records)
+    f.write(bytes(indexStart - HEADER.size - len(records)))
+    f.write(sortedIds)
+    f.write(rowOf)
+    f.write(heap)
+    f.write(lazyHeap)
+    pickle.dump(meta, f)
+
+
+class BinaryStorage(JournalStorage):
+    """
+    This class journals mutations like JournalStorage, but compacts them into a memory-mapped binary
+    snapshot, so launching unpacks fixed-width records instead of unpickling every task. A pickle
+    snapshot of the journal storage is migrated by the first load. Each snapshot is written to a new
+    numbered file (snapshotPath.N) & the highest number is current, since Windows can't replace or
+    delete a file that's still mapped. Older files are deleted once nothing maps them.
+    """
+
+    lazyFields = list(LAZY_FIELDS)  # Task fields decoded only when read, so they aren't indexed ahead
+
+    def __init__(self, snapshotPath='../persistentSave.bin', journalPath='../persistentSave.journal',
+                 compactEvery=1000, picklePath='../persistentSave.pkl'):
+        super().__init__(snapshotPath, journalPath, compactEvery)
+        self.picklePath = picklePath  # Older pickle snapshot the journal may continue
+        self.snapshots = []  # Snapshots mapped by load, journal records may name them until closed
+
+    def load(self, store):
+        """ Loads snapshot & replays journal tail like JournalStorage, a pickle save is migrated right away """
+        migrating = self.currentSnapshotPath() is None and os.path.exists(self.picklePath)
+        found = super().load(store)
+        paths = [self.snapshotPath] + [path for number, path in self.snapshotFiles()]
+        self.snapshots = [mappedSnapshots[path] for path in paths if path in mappedSnapshots]
+        if migrating and found: self.save(store)
+        return found
+
+    def readSnapshot(self):
+        """ Returns mapped snapshot content, or the older pickle snapshot's until there's a binary one """
+        path = self.currentSnapshotPath()
+        if path is not None and os.path.getsize(path) > 0: return mapSnapshot(path).saveData()
+        if not os.path.exists(self.picklePath) or os.path.getsize(self.picklePath) == 0: return None
+        with open(self.picklePath, 'rb') as f:
+            return pickle.load(f)
+
+    def writeSnapshot(self, data):
+        """ Saves the whole task store content, a crash while writing leaves the previous save intact """
+        meta = {key: value for key, value in data.items() if key != "tasks"}
+        self.writeRows(meta, map(savedFields, data["tasks"]))
+
+    def writeRows(self, meta, rows):
+        # Renamed to a new number once complete, tasks of older snapshots keep reading their mappings
+        files = self.snapshotFiles()
+        tempPath = self.snapshotPath + ".tmp"
+        with open(tempPath, 'wb') as f:
+            writeBinarySnapshot(f, meta, rows)
+            f.flush()
+            os.fsync(f.fileno())
+            self.snapshotBytes += f.tell()
+        os.replace(tempPath, f"{self.snapshotPath}.{files[-1][0] + 1 if files else 1}")
+        self.removeSnapshots([path for number, path in files] + [self.snapshotPath])
+
+    def snapshotFiles(self):
+        """ Returns (number, path) of every complete numbered snapshot, newest last """
+        directory, name = os.path.split(self.snapshotPath)
+        prefix = name + "."
+        return sorted((int(entry[len(prefix):]), os.path.join(directory, entry))
+                      for entry in os.listdir(directory or ".")
+                      if entry.startswith(prefix) and entry[len(prefix):].isdigit())
+
+    def currentSnapshotPath(self):
+        """ Returns the newest snapshot's path, an unnumbered one was written before snapshots were numbered """
+        files = self.snapshotFiles()
+        if files: return files[-1][1]
+        return self.snapshotPath if os.path.exists(self.snapshotPath) else None
+
+    @staticmethod
+    def removeSnapshots(paths):
+        """
+        Deletes replaced snapshots, one still mapped is deleted by a later save instead, since tasks may read
+        from it & journaled tasks name it. Windows also refuses to delete a file another process maps.
+        """
+        for path in paths:
+            if path in mappedSnapshots: continue
+            try: os.remove(path)
+            except (FileNotFoundError, PermissionError): pass
+
+    captureFields = staticmethod(savedFields)  # Fields never decoded are copied on the writer thread
+
+    def writeCapture(self, data):
+        rows = data.pop("tasks")
+        self.writeRows(data, rows)
+        os.remove(self.oldJournalPath)
+
+    def closeFiles(self):
+        self.snapshots = []
+        super().closeFiles()
+
+    def clear(self):
+        """
+        Deletes all saved content like JournalStorage, but an empty snapshot replaces the others, so
+        mapped ones aren't deleted right away & the older pickle snapshot isn't loaded again
+        """
+        self.generation = 0
+        self.writeSnapshot({"tasks": [], "journalGeneration": self.generation})
+        if os.path.exists(self.oldJournalPath): os.remove(self.oldJournalPath)
+        if self.journalFile is not None: self.startJournal()
+
+
+# Meant for testing purposes
+if __name__ == "__main__":
+    import random
+    import subprocess
+    import sys
+    import tempfile
+    import time
+
+    from taskStorage import PickleStorage
+    from taskStore import TaskStore
+
+    def residentBytes():
+        """ Returns current resident set size, Linux only """
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    # Each load runs in a fresh interpreter so resident memory only counts the loaded store
+    if len(sys.argv) == 4 and sys.argv[1] == "load":
+        storage = BinaryStorage(sys.argv[3]) if sys.argv[2] == "binary" else PickleStorage(sys.argv[3])
+        before = residentBytes()
+        start = time.perf_counter()
+        store = TaskStore()
+        store.loadData(storage.readSnapshot())
+        seconds = time.perf_counter() - start
+        print(seconds, residentBytes() - before)
+        sys.exit()
+
+    words = ["report", "meeting", "groceries", "dentist", "invoice", "laundry", "project", "review", "budget"]
+    directory = tempfile.mkdtemp()
+    for size in [int(size) for size in sys.argv[1:]] or [100000, 1000000]:
+        store = TaskStore()
+        for i in range(size):
+            store.addTask(f"Task {i}", random.choice(["", "2026/9/1/12:00", "2027/1/1/9:30"]),
+                          random.sample(["Work", "Personal", "Hobby", "Other"], random.randint(0, 2)),
+                          " ".join(random.choices(words, k=random.randint(5, 40))))
+        for mode, storage in [("pickle", PickleStorage(os.path.join(directory, "tasks.pkl"))),
+                              ("binary", BinaryStorage(os.path.join(directory, "tasks.bin")))]:
+            start = time.perf_counter()
+            storage.save(store)
+            saveSeconds = time.perf_counter() - start
+            result = subprocess.run([sys.executable, __file__, "load", mode, storage.snapshotPath],
+                                    capture_output=True, text=True, check=True)
+            loadSeconds, rss = map(float, result.stdout.split())
+            path = storage.currentSnapshotPath() if mode == "binary" else storage.snapshotPath
+            print(f"{size:>8} tasks, {mode}: {os.path.getsize(path) / 2 ** 20:6.1f} MiB file, "
+                  f"save {saveSeconds:6.2f} s, load {loadSeconds:6.2f} s, RSS +{rss / 2 ** 20:7.1f} MiB")
+        del store
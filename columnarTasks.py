@@ -0,0 +1,198 @@
+from datetime import datetime
+
+try:
+    import numpy
+except ImportError:  # Columns fall back to plain lists & Python loops
+    numpy = None
+
+NO_DEADLINE = float("inf")  # Tasks without a valid deadline sort & filter as due last
+
+
+class TaskColumns:
+    """
+    This class lays the task store out as one column per field so filters, date ranges
+    & sorts are mask & argsort operations with NumPy, or list passes without it. String
+    columns stay lists either way, fixed width NumPy strings would pad every row to the
+    longest text. Columns are rebuilt on the first query after the store changes, string
+    columns once a query needs them.
+    """
+
+    def __init__(self, useNumpy=None):
+        """ useNumpy of None uses NumPy whenever it's installed """
+        self.useNumpy = numpy is not None if useNumpy is None else useNumpy and numpy is not None
+        self.store = None
+        self.stale = True
+        self.tasks = []  # Row -> task
+        self.ids = []  # Row -> task ID, rows are in task ID order so stable sorts break ties by ID
+        self.created = []  # Creation time in epoch seconds
+        self.due = []  # Deadline in epoch seconds, NO_DEADLINE when missing
+        self.done = []
+        self.priority = []
+        self.categoryBits = []  # Bitmask of categories, see bitOf
+        self.bitOf = {}  # Category -> bit, only the first 63 distinct categories get one
+        self.categories = []  # Category tuples for categories without a bit
+        self.names = None  # Raw name per row, what sorting by name compares
+        self.lowerTexts = {}  # String column -> lowercase text per row, what the search bar matches
+
+    def rebuild(self, store):
+        """ Marks columns for rebuilding & keeps track of mutations of store """
+        if self.store is not store:
+            if self.store is not None: self.store.removeObserver(self.update)
+            store.addObserver(self.update)
+            self.store = store
+        self.stale = True
+
+    def update(self, action, *args):
+        """ Task store observer, any task change rebuilds the columns when next queried """
+        if action not in ("progress", "flip"): self.stale = True
+
+    def build(self):
+        """ Fills every column from the store's tasks """
+        tasks = self.tasks = sorted(self.store.tasksById.values(), key=lambda task: task.id)
+        self.ids = [task.id for task in tasks]
+        self.created = [task.created for task in tasks]
+        self.due = [NO_DEADLINE if task.due is None else task.due for task in tasks]
+        self.done = [task.done for task in tasks]
+        self.priority = [task.priority for task in tasks]
+        self.categories = [task.category for task in tasks]
+        self.bitOf = {}
+        for task in tasks:
+            for category in task.category:
+                if category not in self.bitOf and len(self.bitOf) < 63: self.bitOf[category] = 1 << len(self.bitOf)
+        self.categoryBits = [sum(self.bitOf.get(category, 0) for category in set(task.category)) for task in tasks]
+        self.names = None
+        self.lowerTexts = {}
+
+        if self.useNumpy:
+            self.ids = numpy.array(self.ids, dtype=numpy.int64)
+            self.created = numpy.array(self.created, dtype=numpy.int64)
+            self.due = numpy.array(self.due, dtype=numpy.float64)
+            self.done = numpy.array(self.done, dtype=bool)
+            self.priority = numpy.array(self.priority, dtype=bool)
+            self.categoryBits = numpy.array(self.categoryBits, dtype=numpy.int64)
+        self.stale = False
+
+    def lowerText(self, column):
+        """ Returns a search column, creation dates are formatted once per rebuild instead of once per search """
+        texts = self.lowerTexts.get(column)
+        if texts is None:
+            if column == "creation date":
+                texts = [datetime.fromtimestamp(task.created).strftime('%Y/%m/%d/%H:%M') for task in self.tasks]
+            else: texts = [getattr(task, column).lower() for task in self.tasks]
+            self.lowerTexts[column] = texts
+        return texts
+
+    # ============== Queries ==============
+
+    def select(self, done=None, priority=None, category=None, createdRange=None, dueRange=None,
+               searchType=None, searchTerm=""):
+        """
+        Returns matching rows, every given condition must hold. Ranges are
+        [start, stop) epoch seconds, search terms match like the search bar.
+        """
+        if self.stale: self.build()
+        searchTerm = searchTerm.lower()
+        if self.useNumpy:
+            return self.selectNumpy(done, priority, category, createdRange, dueRange, searchType, searchTerm)
+
+        rows = range(len(self.ids))
+        if done is not None: rows = [row for row in rows if self.done[row] == done]
+        if priority is not None: rows = [row for row in rows if self.priority[row] == priority]
+        if category is not None:
+            bit = self.bitOf.get(category)
+            if bit is None: rows = [row for row in rows if category in self.categories[row]]
+            else: rows = [row for row in rows if self.categoryBits[row] & bit]
+        if createdRange is not None:
+            start, stop = createdRange
+            rows = [row for row in rows if start <= self.created[row] < stop]
+        if dueRange is not None:
+            start, stop = dueRange
+            rows = [row for row in rows if start <= self.due[row] < stop]
+        if searchTerm or searchType == "category":  # Even an empty term needs a category to match in
+            if searchType == "category":
+                rows = [row for row in rows if any(searchTerm in c.lower() for c in self.categories[row])]
+            else:
+                texts = self.lowerText(searchType)
+                rows = [row for row in rows if searchTerm in texts[row]]
+        return list(rows)
+
+    def selectNumpy(self, done, priority, category, createdRange, dueRange, searchType, searchTerm):
+        mask = numpy.ones(len(self.ids), dtype=bool)
+        if done is not None: mask &= self.done == done
+        if priority is not None: mask &= self.priority == priority
+        if category is not None:
+            bit = self.bitOf.get(category)
+            if bit is None: mask &= numpy.fromiter((category in c for c in self.categories), bool, len(self.ids))
+            else: mask &= (self.categoryBits & bit) != 0
+        if createdRange is not None: mask &= (self.created >= createdRange[0]) & (self.created < createdRange[1])
+        if dueRange is not None: mask &= (self.due >= dueRange[0]) & (self.due < dueRange[1])
+        if searchTerm or searchType == "category":
+            if searchType == "category":
+                mask &= numpy.fromiter((any(searchTerm in c.lower() for c in categories)
+                                        for categories in self.categories), bool, len(self.ids))
+            else:
+                texts = self.lowerText(searchType)
+                mask &= numpy.fromiter((searchTerm in text for text in texts), bool, len(self.ids))
+        return numpy.flatnonzero(mask)
+
+    def sortedIds(self, sortType, rows=None, flipped=False):
+        """ Returns task IDs of rows (every row if None) in "Sort By" order, ties broken by ID """
+        if self.stale: self.build()
+        if rows is None: rows = numpy.arange(len(self.ids)) if self.useNumpy else range(len(self.ids))
+        if sortType == "default":
+            tasksById = self.store.tasksById
+            if self.useNumpy: taskIds = self.ids[numpy.asarray(rows, dtype=numpy.int64)].tolist()
+            else: taskIds = [self.ids[row] for row in rows]
+            taskIds.sort(key=lambda taskId: tasksById[taskId].order)
+            return taskIds[::-1] if flipped else taskIds
+        if sortType == "name":
+            if self.names is None: self.names = [task.name for task in self.tasks]
+            # Python's string sort beats an argsort of NumPy strings, which would first copy every name
+            rows = sorted(numpy.asarray(rows).tolist() if self.useNumpy else rows, key=self.names.__getitem__)
+            taskIds = self.ids[rows].tolist() if self.useNumpy else [self.ids[row] for row in rows]
+            return taskIds[::-1] if flipped else taskIds
+        key = {"deadline": self.due, "creation date": self.created}[sortType]
+
+        if self.useNumpy:
+            rows = numpy.asarray(rows, dtype=numpy.int64)
+            taskIds = self.ids[rows[numpy.argsort(key[rows], kind="stable")]]
+            return (taskIds[::-1] if flipped else taskIds).tolist()
+        taskIds = [self.ids[row] for row in sorted(rows, key=key.__getitem__)]
+        return taskIds[::-1] if flipped else taskIds
+
+
+# Meant for testing purposes
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    from taskStore import TaskStore
+
+    def timed(function):
+        start = time.perf_counter()
+        result = function()
+        return time.perf_counter() - start, result
+
+    sizes = [int(size) for size in sys.argv[1:]] or [10000, 100000, 1000000]
+    for size in sizes:
+        store = TaskStore()
+        for i in range(size):
+            store.addTask(f"Task {random.randrange(size)}", random.choice(["", "2026/9/1/12:00", "2026/10/1/9:30"]),
+                          random.sample(["Work", "Personal", "Hobby", "Other"], random.randint(0, 2)), "")
+            store.getTask(i).created -= random.randrange(86400 * 365)
+        now = time.time()
+
+        for useNumpy in ([True, False] if numpy is not None else [False]):
+            columns = TaskColumns(useNumpy)
+            columns.rebuild(store)
+            buildTime = timed(columns.build)[0]
+            filterTime, rows = timed(lambda: columns.select(done=False, category="Work",
+                                                            createdRange=(now - 86400 * 30, now)))
+            # First search & sort also build their string column, the repeated search only scans it
+            searchTime, found = timed(lambda: columns.select(searchType="creation date", searchTerm="/0"))
+            againTime = timed(lambda: columns.select(searchType="creation date", searchTerm="/1"))[0]
+            sortTime = timed(lambda: columns.sortedIds("name", found))[0]
+            print(f"{size:>8} tasks, {'numpy ' if useNumpy else 'python'}: build {buildTime * 1000:8.1f} ms, "
+                  f"filter {filterTime * 1000:7.2f} ms ({len(rows)}), search {searchTime * 1000:7.2f} ms "
+                  f"({len(found)}) then {againTime * 1000:7.2f} ms, sort {sortTime * 1000:7.2f} ms")
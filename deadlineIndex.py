@@ -0,0 +1,91 @@
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+# Search type -> function of the current time returning its [start, stop) deadline range
+DEADLINE_RANGES = {
+    "overdue": lambda now: (float("-inf"), now),
+    "due in 24 hours": lambda now: (now, now + 86400),
+    "due this week": lambda now: (now, endOfWeek(now))
+}
+
+
+def endOfWeek(now):
+    """ Returns epoch seconds of the coming Monday at midnight """
+    today = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (today + timedelta(days=7 - today.weekday())).timestamp()
+
+
+class DeadlineIndex:
+    """
+    This class keeps the not yet done tasks that have a deadline sorted by when
+    they're due, so deadline range searches are two bisects over the index
+    """
+
+    def __init__(self):
+        self.entries = []  # Sorted (due, task ID) entries
+        self.entryOf = {}  # Task ID -> its current entry
+        self.store = None
+
+    def rebuild(self, store):
+        """ Re-indexes every task of store & keeps index updated with its mutations """
+        if self.store is not store:
+            if self.store is not None: self.store.removeObserver(self.update)
+            store.addObserver(self.update)
+            self.store = store
+        self.entryOf = {task.id: (task.due, task.id) for task in store.tasksById.values()
+                        if task.due is not None and not task.done}
+        self.entries = sorted(self.entryOf.values())
+
+    def clear(self):
+        self.entries = []
+        self.entryOf = {}
+
+    def update(self, action, *args):
+        """ Task store observer that moves changed tasks within the index """
+        if action == "add": self.addTask(args[0])
+        elif action == "edit" or action == "done":
+            self.removeTask(args[0])
+            self.addTask(self.store.getTask(args[0]))
+        elif action == "delete": self.removeTask(args[0])
+        elif action == "restore": self.updateTasks({task.id for task in args[0]})
+        elif action == "clear": self.clear()
+        elif action == "batch": self.updateBatch(args[0])
+
+    def updateBatch(self, mutations):
+        """ Filters a batch's changed tasks out of the index in one pass, then re-adds those still open """
+        changedIds = {mutation[1] for mutation in mutations if mutation[0] in ("edit", "done", "delete")}
+        for mutation in mutations:
+            if mutation[0] not in ("edit", "done", "delete"): self.update(*mutation)
+        if changedIds: self.updateTasks(changedIds)
+
+    def updateTasks(self, taskIds):
+        """ Filters tasks out of the index in one pass, then merges back those still open with one sort """
+        for taskId in taskIds: self.entryOf.pop(taskId, None)
+        self.entries = [entry for entry in self.entries if entry[1] not in taskIds]
+        for taskId in taskIds:
+            task = self.store.tasksById.get(taskId)
+            if task is not None and task.due is not None and not task.done:
+                self.entryOf[taskId] = entry = (task.due, taskId)
+                self.entries.append(entry)
+        self.entries.sort()
+
+    def addTask(self, task):
+        if task.due is None or task.done: return
+        entry = (task.due, task.id)
+        self.entryOf[task.id] = entry
+        insort(self.entries, entry)
+
+    def removeTask(self, taskId):
+        entry = self.entryOf.pop(taskId, None)
+        if entry is not None: del self.entries[bisect_left(self.entries, entry)]
+
+    def dueBetween(self, start, stop):
+        """ Returns IDs of tasks due in [start, stop) epoch seconds, soonest first """
+        first = bisect_left(self.entries, (start,))
+        last = bisect_left(self.entries, (stop,), first)
+        return [taskId for due, taskId in self.entries[first:last]]
+
+    def search(self, searchType, now=None):
+        """ Returns IDs of tasks matching a DEADLINE_RANGES search type at the given or current time """
+        return self.dueBetween(*DEADLINE_RANGES[searchType](time.time() if now is None else now))
@@ -0,0 +1,132 @@
+MAX_MATCHED_ROWS = 2000  # Larger reordered ranges are replaced instead of diffed
+
+
+class ListboxReconciler:
+    """
+    This class keeps a Listbox showing a sequence of tasks by sending
+    only the row inserts, deletes & color changes between two renders
+    """
+
+    def __init__(self, listbox, formatRow):
+        """ formatRow(task) returns the row text & background color (or None) """
+        self.listbox = listbox
+        self.formatRow = formatRow
+        self.rowIds = []  # Task ID shown in each Listbox row
+        self.dirtyIds = set()  # Tasks whose row text or color changed since last render
+        self.tclCalls = 0  # Listbox calls issued since creation
+        self.lastRenderTclCalls = 0  # Listbox calls issued by the most recent render
+
+    def update(self, action, *args):
+        """ Task store observer that marks rows needing a repaint """
+        if action in ("edit", "done", "priority"): self.dirtyIds.add(args[0])
+        elif action == "restore": self.dirtyIds.update(task.id for task in args[0])
+        elif action == "batch":
+            for mutation in args[0]: self.update(*mutation)
+
+    def reset(self):
+        """ Forgets shown rows so the next render redraws every row, e.g. once the store was reloaded """
+        if self.rowIds: self.deleteRows(0, len(self.rowIds))
+        self.rowIds = []
+        self.dirtyIds.clear()
+
+    def render(self, tasks):
+        """ Updates Listbox to show tasks in order & returns the shown task IDs """
+        callsBefore = self.tclCalls
+        tasksById = {task["id"]: task for task in tasks}
+        oldIds = self.rowIds
+        newIds = list(tasksById)
+
+        # Rows shared by the start & end of both renders are left alone
+        start = 0
+        shortest = min(len(oldIds), len(newIds))
+        while start < shortest and oldIds[start] == newIds[start]: start += 1
+        oldEnd, newEnd = len(oldIds), len(newIds)
+        while oldEnd > start and newEnd > start and oldIds[oldEnd - 1] == newIds[newEnd - 1]:
+            oldEnd -= 1
+            newEnd -= 1
+        oldMiddle, newMiddle = oldIds[start:oldEnd], newIds[start:newEnd]
+
+        # Apply changed ranges bottom-up so earlier row indexes stay valid
+        insertedIds = set()
+        for tag, i1, i2, j1, j2 in reversed(self.diff(oldMiddle, newMiddle)):
+            if tag in ("delete", "replace"): self.deleteRows(start + i1, start + i2)
+            if tag in ("insert", "replace"):
+                self.insertRows(start + i1, [tasksById[taskId] for taskId in newMiddle[j1:j2]])
+                insertedIds.update(newMiddle[j1:j2])
+
+        # Repaint kept rows whose task changed
+        dirtyIds = (self.dirtyIds & tasksById.keys()) - insertedIds
+        if dirtyIds:
+            for row, taskId in enumerate(newIds):
+                if taskId in dirtyIds:
+                    self.deleteRows(row, row + 1)
+                    self.insertRows(row, [tasksById[taskId]])
+        self.dirtyIds.clear()
+
+        self.rowIds = newIds
+        self.lastRenderTclCalls = self.tclCalls - callsBefore
+        return newIds
+
+    @staticmethod
+    def diff(oldIds, newIds):
+        """ Returns SequenceMatcher style opcodes turning oldIds into newIds """
+        if not oldIds and not newIds: return []
+        if not oldIds: return [("insert", 0, 0, 0, len(newIds))]
+        if not newIds: return [("delete", 0, len(oldIds), 0, 0)]
+
+        # Common single row moves, e.g. marking a task done or prioritizing it
+        if len(oldIds) == len(newIds):
+            if oldIds[0] == newIds[-1] and oldIds[1:] == newIds[:-1]:
+                return [("delete", 0, 1, 0, 0), ("insert", len(oldIds), len(oldIds), len(newIds) - 1, len(newIds))]
+            if oldIds[-1] == newIds[0] and oldIds[:-1] == newIds[1:]:
+                return [("insert", 0, 0, 0, 1), ("delete", len(oldIds) - 1, len(oldIds), len(newIds), len(newIds))]
+
+        # Narrowing or widening a search only removes or adds rows
+        if len(newIds) < len(oldIds): opcodes = ListboxReconciler.subsequenceDiff(oldIds, newIds, "delete")
+        else: opcodes = ListboxReconciler.subsequenceDiff(newIds, oldIds, "insert")
+        if opcodes is not None: return opcodes
+
+        if len(oldIds) > MAX_MATCHED_ROWS or len(newIds) > MAX_MATCHED_ROWS:
+            return [("replace", 0, len(oldIds), 0, len(newIds))]
+        from difflib import SequenceMatcher  # Only needed for uncommon reorders
+        return SequenceMatcher(None, oldIds, newIds, autojunk=False).get_opcodes()
+
+    @staticmethod
+    def subsequenceDiff(longerIds, shorterIds, tag):
+        """
+        Returns opcodes removing rows from longerIds (tag "delete") or adding
+        them to shorterIds (tag "insert"), or None if shorterIds isn't a subsequence
+        """
+        opcodes = []
+        j = 0
+        runStart = None
+        for i, taskId in enumerate(longerIds):
+            if j < len(shorterIds) and shorterIds[j] == taskId:
+                if runStart is not None:
+                    opcodes.append((runStart, i, j))
+                    runStart = None
+                j += 1
+            elif runStart is None: runStart = i
+        if j < len(shorterIds): return None
+        if runStart is not None: opcodes.append((runStart, len(longerIds), j))
+
+        # Convert runs of longerIds to opcodes indexed in (old, new) order
+        if tag == "delete": return [("delete", i1, i2, j, j) for i1, i2, j in opcodes]
+        return [("insert", j, j, i1, i2) for i1, i2, j in opcodes]
+
+    # ============== Counted Listbox Calls ==============
+
+    def deleteRows(self, first, stop):
+        """ Deletes rows [first, stop) with a single Listbox call """
+        self.listbox.delete(first, stop - 1)
+        self.tclCalls += 1
+
+    def insertRows(self, index, tasks):
+        """ Inserts rows with one Listbox call plus one call per colored row """
+        rows = [self.formatRow(task) for task in tasks]
+        self.listbox.insert(index, *[text for text, color in rows])
+        self.tclCalls += 1
+        for offset, (text, color) in enumerate(rows):
+            if color is not None:
+                self.listbox.itemconfig(index + offset, {'bg': color})
+                self.tclCalls += 1
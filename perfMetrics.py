@@ -0,0 +1,200 @@
+import cProfile
+import io
+import json
+import math
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from functools import wraps
+
+BUCKETS_PER_DOUBLING = 4  # Histogram resolution, bucket bounds grow by 2 ** (1 / 4) ≈ 19%
+SMALLEST_SECONDS = 1e-6  # Latencies below this share the first bucket
+BUCKET_COUNT = 120  # Covers 1 µs up to about 16 minutes
+CAPTURES_KEPT = 10
+SAMPLE_INTERVAL = 0.002  # Seconds between stack samples of a sampled action
+SLOW_ACTION_SECONDS = 0.1  # Sampled actions at least this slow keep their samples
+
+
+class LatencyHistogram:
+    """
+    This class counts latencies in fixed logarithmic buckets, so recording is O(1) & memory never
+    grows. Percentiles are accurate to a bucket's width.
+    """
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        bucket = 0 if seconds <= SMALLEST_SECONDS else int(math.log2(seconds / SMALLEST_SECONDS) * BUCKETS_PER_DOUBLING)
+        self.counts[min(bucket, BUCKET_COUNT - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+
+    def percentile(self, fraction):
+        """ Returns upper bound of the bucket holding the given fraction of latencies, None if empty """
+        if not self.count: return None
+        wanted = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted: return min(self.max, SMALLEST_SECONDS * 2 ** ((bucket + 1) / BUCKETS_PER_DOUBLING))
+        return self.max
+
+
+class OperationStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.tclCalls = 0
+        self.bytesPersisted = 0
+
+    def toData(self):
+        latency = self.latency
+        return {"calls": latency.count, "totalSeconds": latency.total, "p50": latency.percentile(0.5),
+                "p95": latency.percentile(0.95), "p99": latency.percentile(0.99), "max": latency.max,
+                "tclCalls": self.tclCalls, "bytesPersisted": self.bytesPersisted}
+
+
+class PerfMetrics:
+    """
+    This class instruments application operations with call counts, latency histograms, Tcl calls
+    issued & bytes persisted. An instrumented call costs a few microseconds, so it's always on.
+    The next action can be captured with cProfile, or actions can be stack sampled to keep the slow ones.
+    """
+
+    def __init__(self, tclCalls=lambda: 0, bytesWritten=lambda: 0, extraMetrics=None):
+        """ tclCalls & bytesWritten return running totals, extraMetrics maps a name to a metrics dict getter """
+        self.tclCalls = tclCalls
+        self.bytesWritten = bytesWritten
+        self.extraMetrics = extraMetrics or {}
+        self.operations = {}  # Operation name -> OperationStats
+        self.started = datetime.now()
+        self.depth = 0  # Instrumented calls in progress, nested calls are measured but never captured
+        self.captureMode = None  # "profile" captures the next action once, "sample" keeps sampling slow actions
+        self.captures = deque(maxlen=CAPTURES_KEPT)
+        self.sampler = None
+
+    def timed(self, name):
+        """ Decorator recording every call of an operation under name """
+        stats = self.operations.setdefault(name, OperationStats())
+
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                tclBefore, bytesBefore = self.tclCalls(), self.bytesWritten()
+                capture = self.captureMode if self.depth == 0 else None
+                self.depth += 1
+                start = time.perf_counter()
+                try:
+                    if capture is None: return function(*args, **kwargs)
+                    return self.capture(name, capture, start, function, args, kwargs)
+                finally:
+                    stats.latency.record(time.perf_counter() - start)
+                    self.depth -= 1
+                    stats.tclCalls += self.tclCalls() - tclBefore
+                    stats.bytesPersisted += self.bytesWritten() - bytesBefore
+            return wrapper
+        return decorator
+
+    # ============== Slow Action Captures ==============
+
+    def captureNext(self):
+        """ Profiles the next instrumented action with cProfile """
+        self.captureMode = "profile"
+
+    def sampleSlowActions(self, enabled=True):
+        """ Stack samples every instrumented action, keeping samples of ones slower than SLOW_ACTION_SECONDS """
+        self.captureMode = "sample" if enabled else None
+        if enabled and self.sampler is None: self.sampler = StackSampler(threading.get_ident())
+
+    def capture(self, name, mode, start, function, args, kwargs):
+        if mode == "profile":
+            self.captureMode = None
+            profile = cProfile.Profile()
+            try: return profile.runcall(function, *args, **kwargs)
+            finally:
+                report = io.StringIO()
+                pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(30)
+                self.addCapture(name, mode, time.perf_counter() - start, report.getvalue())
+
+        self.sampler.start()
+        try: return function(*args, **kwargs)
+        finally:
+            samples = self.sampler.stop()
+            seconds = time.perf_counter() - start
+            if seconds >= SLOW_ACTION_SECONDS: self.addCapture(name, mode, seconds, formatSamples(samples))
+
+    def addCapture(self, name, mode, seconds, report):
+        self.captures.append({"operation": name, "mode": mode, "seconds": seconds,
+                              "when": datetime.now().isoformat(" ", "seconds"), "report": report})
+
+    # ============== Reports ==============
+
+    def toData(self):
+        """ Returns every metric in a JSON friendly format """
+        data = {"started": self.started.isoformat(" ", "seconds"), "bytesPersisted": self.bytesWritten(),
+                "tclCalls": self.tclCalls(),
+                "operations": {name: stats.toData() for name, stats in self.operations.items()},
+                "captures": list(self.captures)}
+        for name, metrics in self.extraMetrics.items(): data[name] = metrics()
+        return data
+
+    def exportJson(self, path):
+        with open(path, "w") as f: json.dump(self.toData(), f, indent=2, default=str)
+
+    def formatTable(self):
+        """ Returns operations as a fixed-width text table, latencies in milliseconds """
+        milliseconds = lambda seconds: "-" if seconds is None else f"{seconds * 1000:.2f}"
+        lines = [f"{'Operation':<30}{'Calls':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'Max':>9}{'Tcl':>9}{'Bytes':>11}"]
+        for name, stats in sorted(self.operations.items()):
+            data = stats.toData()
+            lines.append(f"{name:<30}{data['calls']:>7}{milliseconds(data['p50']):>9}{milliseconds(data['p95']):>9}"
+                         f"{milliseconds(data['p99']):>9}{milliseconds(data['max']):>9}{data['tclCalls']:>9}"
+                         f"{data['bytesPersisted']:>11}")
+        return "\n".join(lines)
+
+
+class StackSampler:
+    """ This class samples one thread's call stack from a background thread while started """
+
+    def __init__(self, threadId, interval=SAMPLE_INTERVAL):
+        self.threadId = threadId
+        self.interval = interval
+        self.running = threading.Event()
+        self.samples = Counter()
+        threading.Thread(target=self.run, name="stackSampler", daemon=True).start()
+
+    def start(self):
+        self.samples = Counter()
+        self.running.set()
+
+    def stop(self):
+        """ Stops sampling, returns Counter of sampled stacks (innermost frame first) """
+        self.running.clear()
+        return self.samples
+
+    def run(self):
+        while True:
+            self.running.wait()
+            frame = sys._current_frames().get(self.threadId)
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_code.co_name} ({frame.f_code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            if self.running.is_set(): self.samples[tuple(stack)] += 1
+            time.sleep(self.interval)
+
+
+def formatSamples(samples, limit=15):
+    """ Returns most sampled stacks first, each as its sample count & innermost frames """
+    total = sum(samples.values()) or 1
+    lines = [f"{sum(samples.values())} samples every {SAMPLE_INTERVAL * 1000:.0f} ms"]
+    for stack, count in samples.most_common(limit):
+        lines.append(f"{count / total:6.1%}  " + " <- ".join(stack[:6]))
+    return "\n".join(lines)
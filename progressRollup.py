@@ -0,0 +1,77 @@
+from array import array
+from datetime import datetime
+
+PROGRESS_ACTIONS = ("add", "delete", "done", "undone")
+UNKNOWN_YEAR = 0  # Older saves only stored an action's month, their counts are kept under this year
+ACTION_INDEX = {action: i for i, action in enumerate(PROGRESS_ACTIONS)}
+YEAR_SIZE = 12 * len(PROGRESS_ACTIONS)
+
+
+class ProgressRollup:
+    """
+    This class counts user actions per (year, month, action) in one fixed-size
+    array per year, so recording an action is O(1) & saving it doesn't grow with use
+    """
+
+    def __init__(self):
+        self.years = {}  # Year -> array of counts indexed by month * number of actions + action
+
+    def __len__(self):
+        """ Total number of recorded actions """
+        return sum(sum(counts) for counts in self.years.values())
+
+    def bump(self, action, year, month, amount=1):
+        """ Counts action done in given year & month (1 to 12) """
+        counts = self.years.get(year)
+        if counts is None: counts = self.years[year] = array('I', [0]) * YEAR_SIZE
+        counts[(month - 1) * len(PROGRESS_ACTIONS) + ACTION_INDEX[action]] += amount
+
+    def record(self, action, when=None, amount=1):
+        """ Counts action done amount times now or at given datetime & returns its (action, year, month) """
+        when = when or datetime.now()
+        self.bump(action, when.year, when.month, amount)
+        return action, when.year, when.month
+
+    def count(self, action, year, month):
+        counts = self.years.get(year)
+        if counts is None: return 0
+        return counts[(month - 1) * len(PROGRESS_ACTIONS) + ACTION_INDEX[action]]
+
+    def totalCounts(self, year=None):
+        """ Returns one year's counts array, or every year's counts summed if None """
+        totals = array('I', [0]) * YEAR_SIZE
+        for countsYear, counts in self.years.items():
+            if year is None or countsYear == year:
+                for i, count in enumerate(counts): totals[i] += count
+        return totals
+
+    def monthTotals(self, year=None, totals=None):
+        """ Returns month (1 to 12) -> action -> count for one year, or every year merged if None """
+        if totals is None: totals = self.totalCounts(year)
+        return {month: {action: totals[(month - 1) * len(PROGRESS_ACTIONS) + i] for i, action in enumerate(PROGRESS_ACTIONS)}
+                for month in range(1, 13)}
+
+    def rows(self):
+        """ Yields (year, month, action, count) for every non-zero counter """
+        for year, counts in self.years.items():
+            for i, count in enumerate(counts):
+                if count: yield year, i // len(PROGRESS_ACTIONS) + 1, PROGRESS_ACTIONS[i % len(PROGRESS_ACTIONS)], count
+
+    # ============== Save File Conversion ==============
+
+    def toData(self):
+        """ Returns counts in a JSON & pickle friendly format """
+        return {str(year): list(counts) for year, counts in self.years.items()}
+
+    @classmethod
+    def fromData(cls, data):
+        rollup = cls()
+        for year, counts in data.items(): rollup.years[int(year)] = array('I', counts)
+        return rollup
+
+    @classmethod
+    def fromEntries(cls, entries):
+        """ Converts an older save's [action, "MM"] progress list into counts of UNKNOWN_YEAR """
+        rollup = cls()
+        for action, month in entries: rollup.bump(action, UNKNOWN_YEAR, int(month))
+        return rollup
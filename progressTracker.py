@@ -1,5 +1,12 @@
-import matplotlib.pyplot as plt
-from collections import Counter
+import base64
+import hashlib
+import io
+from collections import OrderedDict
+
+from progressRollup import ProgressRollup
+
+RENDER_CACHE_SIZE = 32  # Distinct progress charts kept rendered
+renderCache = OrderedDict()  # Counts hash -> {"figure": built figure, image format: rendered bytes}
 
 
 class ProgressTracker:
@@ -8,37 +15,51 @@ class ProgressTracker:
     display the to-do list's task progress/actions
     """
 
-    """ Store progress tracker data on creation """
-    def __init__(self, data): self.data = data
+    def __init__(self, data):
+        """ Store progress rollup on creation, an older [action, "MM"] list is converted """
+        self.data = data if isinstance(data, ProgressRollup) else ProgressRollup.fromEntries(data)
+
+        # Read every year's counters merged into month buckets, cost doesn't grow with use
+        self.totals = self.data.totalCounts()
+        self.countsHash = hashlib.blake2b(self.totals.tobytes(), digest_size=16).hexdigest()
+
+    def cached(self):
+        """ Returns render cache entry of these counts, creating & drawing its figure on a miss """
+        entry = renderCache.get(self.countsHash)
+        if entry is not None:
+            renderCache.move_to_end(self.countsHash)
+            return entry
 
-    def show(self):
-        """ Create & open new progress tracker graph/window """
+        # Imported on first use, matplotlib is slow to import & rarely needed. Agg needs no display.
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
 
-        # Extract months from data
-        months = [int(item[1]) for item in self.data]
+        figure = Figure(tight_layout=True)  # Keeps rotated month labels & axis labels inside image
+        FigureCanvasAgg(figure)
+        self.draw(figure)
+        entry = renderCache[self.countsHash] = {"figure": figure}
+        if len(renderCache) > RENDER_CACHE_SIZE: renderCache.popitem(last=False)
+        return entry
 
-        # Count number of occurrences of each month
-        monthCounts = Counter(months)
+    def draw(self, figure):
+        """ Draws progress tracker graph onto figure """
+        from matplotlib.ticker import FixedFormatter, FixedLocator
 
-        # Create lists of months & counts for plotting
-        x = list(monthCounts.keys())
-        y = list(monthCounts.values())
+        monthActionCounts = self.data.monthTotals(totals=self.totals)
+
+        # Only plot months with recorded actions
+        x = [month for month, counts in monthActionCounts.items() if any(counts.values())]
 
         # Map task actions to colors
         colorDict = {"add": "green", "delete": "red", "done": "blue", "undone": "orange"}
 
-        # Count number of occurrences of each action for each month
-        monthActionCounts = {month: Counter() for month in x}
-        for action, month in self.data:
-            monthActionCounts[int(month)][action] += 1
-
         # Create lists of counts for each action
         addTaskCounts = [monthActionCounts[month]["add"] for month in x]
         deleteTaskCounts = [monthActionCounts[month]["delete"] for month in x]
         doneTaskCounts = [monthActionCounts[month]["done"] for month in x]
         undoneTaskCounts = [monthActionCounts[month]["undone"] for month in x]
 
-        fig, ax = plt.subplots()
+        ax = figure.subplots()
 
         # Create stacked bar chart with updated legend labels
         ax.bar(x, addTaskCounts, color=colorDict["add"], label="Add Task")
@@ -59,18 +80,40 @@ class ProgressTracker:
         ax.set_ylabel('Number of Actions', labelpad=10)
 
         # Set x-axis to display abbreviated months with labels from Jan to Dec
-        ax.xaxis.set_major_locator(plt.FixedLocator(range(1, 13)))
+        ax.xaxis.set_major_locator(FixedLocator(range(1, 13)))
         ax.xaxis.set_major_formatter(
-            plt.FixedFormatter(['Jan', 'Feb', 'Mar', 'Apr',
-                                'May', 'Jun', 'Jul', 'Aug', 'Sep',
-                                'Oct', 'Nov', 'Dec']))
-        plt.xticks(rotation=90)
+            FixedFormatter(['Jan', 'Feb', 'Mar', 'Apr',
+                            'May', 'Jun', 'Jul', 'Aug', 'Sep',
+                            'Oct', 'Nov', 'Dec']))
+        ax.tick_params(axis='x', labelrotation=90)
 
         # Add a legend with updated labels
         ax.legend()
 
-        fig.canvas.manager.set_window_title('To-Do List Progress Tracker')
-        plt.show()
+    def render(self, imageFormat="png"):
+        """ Returns graph as "png" or "svg" image bytes, unchanged counts return the cached image """
+        entry = self.cached()
+        image = entry.get(imageFormat)
+        if image is None:
+            buffer = io.BytesIO()
+            entry["figure"].savefig(buffer, format=imageFormat)
+            image = entry[imageFormat] = buffer.getvalue()
+        return image
+
+    def show(self, master):
+        """
+        Create & open new progress tracker window inside master's Tk event loop, each window shows
+        its own image of the cached PNG, so no figure is shared between windows
+        """
+        import tkinter as tk
+
+        window = tk.Toplevel(master)
+        window.title('To-Do List Progress Tracker')
+        image = tk.PhotoImage(master=window, data=base64.b64encode(self.render("png")), format="png")
+        label = tk.Label(window, image=image)
+        label.image = image  # Tk drops the image once Python stops referencing it
+        label.pack(fill=tk.BOTH, expand=True)
+        return window
 
 
 # Meant for testing purposes
@@ -102,5 +145,28 @@ if __name__ == "__main__":
     """Example 4"""
     # data = []
 
+    import os
+    import sys
+    import tempfile
+    import time
+    import tkinter as tk
+
     progressTracker = ProgressTracker(data)
-    progressTracker.show()
+    for imageFormat in ("png", "svg"):
+        renderCache.clear()
+        start = time.perf_counter()
+        image = progressTracker.render(imageFormat)
+        firstTime = time.perf_counter() - start
+        start = time.perf_counter()
+        ProgressTracker(data).render(imageFormat)
+        print(f"{imageFormat}: {len(image)} bytes, rendered in {firstTime * 1000:.1f} ms, "
+              f"cached in {(time.perf_counter() - start) * 1000:.3f} ms")
+    imagePath = os.path.join(tempfile.gettempdir(), "progressTracker.png")
+    with open(imagePath, "wb") as f: f.write(progressTracker.render())
+
+    # Shows the cached graph when a display is available
+    try: root = tk.Tk()
+    except tk.TclError: sys.exit(f"No display, graph was only rendered to {imagePath}")
+    root.withdraw()
+    progressTracker.show(root).protocol("WM_DELETE_WINDOW", root.destroy)
+    root.mainloop()
@@ -0,0 +1,94 @@
+import heapq
+from datetime import datetime, timedelta
+
+REMINDER_FORMAT = '%Y-%m-%d %H:%M'  # How reminders are entered & stored in a task's "reminder" field
+parseReminder = datetime.fromisoformat  # Much faster than strptime for stored REMINDER_FORMAT texts
+SNOOZE_MINUTES = 5
+MAX_TIMER_MS = 3600000  # Far away reminders re-check hourly so clock changes & sleep can't delay them
+
+
+class ReminderScheduler:
+    """
+    This class keeps every pending task reminder in a min-heap keyed on fire time
+    & arms a single timer for the earliest one, firing all due reminders as one batch
+    """
+
+    def __init__(self, timer, fireReminders):
+        """
+        timer provides Tk's after & after_cancel, fireReminders(taskIds)
+        receives the tasks of every reminder due at once
+        """
+        self.timer = timer
+        self.fireReminders = fireReminders
+        self.heap = []  # (fire time, task ID) entries, some may be stale
+        self.dueAt = {}  # Task ID -> fire time of its current reminder
+        self.timerId = None
+        self.timerAt = None  # Fire time the armed timer was set for
+        self.store = None
+
+    def __len__(self): return len(self.dueAt)
+
+    def rebuild(self, store):
+        """ Schedules every stored reminder & keeps up with mutations of store """
+        if self.store is not store:
+            if self.store is not None: self.store.removeObserver(self.update)
+            store.addObserver(self.update)
+            self.store = store
+        self.dueAt = {task["id"]: parseReminder(task["reminder"])
+                      for task in store.tasksById.values() if task["reminder"]}
+        self.heap = [(fireTime, taskId) for taskId, fireTime in self.dueAt.items()]
+        heapq.heapify(self.heap)
+        self.arm()
+
+    def update(self, action, *args):
+        """ Task store observer that schedules or cancels changed reminders """
+        if action == "reminder": self.schedule(*args)
+        elif action == "delete": self.schedule(args[0], None)
+        elif action == "restore":
+            for task in args[0]: self.schedule(task.id, task.reminder)
+        elif action == "clear":
+            self.heap, self.dueAt = [], {}
+            self.arm()
+        elif action == "batch":
+            for mutation in args[0]: self.update(*mutation)
+
+    def schedule(self, taskId, reminder):
+        """ Replaces task's reminder, a reminder of None cancels it """
+        if reminder is None:
+            # Cancelled entries stay in heap until popped or compacted
+            if self.dueAt.pop(taskId, None) is not None and len(self.heap) > 2 * len(self.dueAt) + 64:
+                self.heap = [(fireTime, taskId) for taskId, fireTime in self.dueAt.items()]
+                heapq.heapify(self.heap)
+            return
+        fireTime = parseReminder(reminder)
+        self.dueAt[taskId] = fireTime
+        heapq.heappush(self.heap, (fireTime, taskId))
+        if self.timerAt is None or fireTime < self.timerAt: self.arm()
+
+    def arm(self):
+        """ Re-arms the single timer for the earliest pending reminder """
+        while self.heap and self.dueAt.get(self.heap[0][1]) != self.heap[0][0]: heapq.heappop(self.heap)
+        if self.timerId is not None: self.timer.after_cancel(self.timerId)
+        self.timerId = self.timerAt = None
+        if not self.heap: return
+        self.timerAt = self.heap[0][0]
+        delay = (self.timerAt - datetime.now()).total_seconds() * 1000
+        self.timerId = self.timer.after(max(0, min(int(delay), MAX_TIMER_MS)), self.fire)
+
+    def fire(self):
+        """ Pops every due reminder & hands them over in one batch """
+        self.timerId = self.timerAt = None
+        now = datetime.now()
+        taskIds = []
+        while self.heap and self.heap[0][0] <= now:
+            fireTime, taskId = heapq.heappop(self.heap)
+            if self.dueAt.get(taskId) == fireTime:
+                del self.dueAt[taskId]
+                taskIds.append(taskId)
+        self.arm()
+        if taskIds: self.fireReminders(taskIds)
+
+
+def snoozedReminder(now=None):
+    """ Returns reminder text SNOOZE_MINUTES from now """
+    return ((now or datetime.now()) + timedelta(minutes=SNOOZE_MINUTES)).strftime(REMINDER_FORMAT)
@@ -0,0 +1,216 @@
+import heapq
+import math
+from collections import Counter
+from itertools import islice
+
+MAX_GRAM_LENGTH = 3  # Longest substring stored in posting lists
+SEARCH_FIELDS = ["name", "deadline", "category", "creation date", "description"]
+FUZZY_FIELDS = {"name": 1.0, "description": 0.5}  # Field -> weight of its n-grams shared with a fuzzy term
+FUZZY_GRAM_LENGTHS = (2, 3)  # Misspellings still share most 2 & 3 character n-grams with the intended word
+FUZZY_RESULTS = 50  # Best matches a fuzzy search returns
+FUZZY_SCAN_BUDGET = 20000  # Posting list entries a fuzzy search counts at most, rarest n-grams first
+FUZZY_CANDIDATE_RATIO = 8  # Tasks weighed per result returned, picked by most shared n-grams
+
+
+def fieldTexts(task, field):
+    """ Returns lowercase texts the search bar matches against for a task field """
+    if field == "category": return [category.lower() for category in task["category"]]
+    if field == "creation date": return [task["creation date"].strftime('%Y/%m/%d/%H:%M')]
+    return [task[field].lower()]
+
+
+def grams(text):
+    """ Returns every substring of text up to MAX_GRAM_LENGTH characters long """
+    return {text[i:i + length] for length in range(1, MAX_GRAM_LENGTH + 1)
+            for i in range(len(text) - length + 1)}
+
+
+class SearchIndex:
+    """
+    This class keeps an inverted n-gram index over the searchable task fields
+    so each search bar keystroke looks up posting lists instead of scanning tasks.
+    Fields are indexed a chunk at a time by buildStep, or all at once when first searched.
+    """
+
+    def __init__(self):
+        self.postings = {field: {} for field in SEARCH_FIELDS}  # Field -> n-gram -> task IDs
+        self.texts = {field: {} for field in SEARCH_FIELDS}  # Field -> task ID -> indexed texts
+        self.buildTasks = []  # Tasks present when index was last rebuilt
+        self.buildPositions = {}  # Field -> next build task to index, removed once field is built
+        self.store = None
+
+    def rebuild(self, store):
+        """ Re-indexes every task of store & keeps index updated with its mutations """
+        if self.store is not store:
+            if self.store is not None: self.store.removeObserver(self.update)
+            store.addObserver(self.update)
+            self.store = store
+        self.clear()
+        self.buildTasks = store.orderedTasks()
+        self.buildPositions = {field: 0 for field in SEARCH_FIELDS}
+
+    def clear(self):
+        for field in SEARCH_FIELDS:
+            self.postings[field].clear()
+            self.texts[field].clear()
+        self.buildTasks = []
+        self.buildPositions = {}
+
+    def buildStep(self, field=None, chunkSize=2000):
+        """
+        Indexes next chunk of tasks for field (first unbuilt field if None),
+        a chunk size of None builds the whole field. Returns whether work remains.
+        """
+        if field is None:
+            if not self.buildPositions: return False
+            field = next(iter(self.buildPositions))
+        if field not in self.buildPositions: return bool(self.buildPositions)
+
+        start = self.buildPositions[field]
+        stop = len(self.buildTasks) if chunkSize is None else start + chunkSize
+        texts = self.texts[field]
+        for task in self.buildTasks[start:stop]:
+            # Tasks deleted or added since the rebuild are already handled by update
+            if task["id"] not in texts and task["id"] in self.store.tasksById: self.addField(task, field)
+
+        if stop >= len(self.buildTasks): del self.buildPositions[field]
+        else: self.buildPositions[field] = stop
+        if not self.buildPositions: self.buildTasks = []
+        return bool(self.buildPositions)
+
+    def update(self, action, *args):
+        """ Task store observer that re-indexes changed tasks """
+        if action == "add": self.addTask(args[0])
+        elif action == "edit":
+            self.removeTask(args[0])
+            task = self.store.tasksById.get(args[0])  # A batch may delete the task after editing it
+            if task is not None: self.addTask(task)
+        elif action == "delete": self.removeTask(args[0])
+        elif action == "restore":
+            # Restored tasks kept their searchable fields, only the ones no longer indexed are indexed lazily
+            texts = self.texts["name"]
+            self.queueTasks([task for task in args[0] if task.id not in texts])
+        elif action == "clear": self.clear()
+        elif action == "batch":
+            for mutation in args[0]: self.update(*mutation)
+
+    def queueTasks(self, tasks):
+        """ Indexes tasks a chunk at a time like a rebuild, so restoring many tasks stays instant """
+        if not tasks: return
+        start = len(self.buildTasks)
+        self.buildTasks.extend(tasks)
+        for field in SEARCH_FIELDS: self.buildPositions.setdefault(field, start)
+
+    def addTask(self, task):
+        for field in SEARCH_FIELDS: self.addField(task, field)
+
+    def addField(self, task, field):
+        texts = fieldTexts(task, field)
+        self.texts[field][task["id"]] = texts
+        postings = self.postings[field]
+        for gram in (grams(texts[0]) if len(texts) == 1 else set().union(*map(grams, texts))):
+            if gram in postings: postings[gram].add(task["id"])
+            else: postings[gram] = {task["id"]}
+
+    def removeTask(self, taskId):
+        for field in SEARCH_FIELDS:
+            texts = self.texts[field].pop(taskId, None)
+            if texts is None: continue
+            postings = self.postings[field]
+            for gram in set().union(*map(grams, texts)):
+                taskIds = postings[gram]
+                taskIds.discard(taskId)
+                if not taskIds: del postings[gram]
+
+    def search(self, field, term):
+        """
+        Returns IDs of tasks whose field contains lowercase term,
+        matching the search bar's substring semantics exactly
+        """
+        if field in self.buildPositions: self.buildStep(field, None)
+        postings = self.postings[field]
+        texts = self.texts[field]
+        if term == "": return set(texts)
+        if len(term) <= MAX_GRAM_LENGTH: return set(postings.get(term, ()))
+
+        # Longer terms are only in tasks holding their rarest n-gram, which are then verified
+        candidates = min((postings.get(term[i:i + MAX_GRAM_LENGTH], set())
+                          for i in range(len(term) - MAX_GRAM_LENGTH + 1)), key=len)
+        return {taskId for taskId in candidates if any(term in text for text in texts[taskId])}
+
+    def fuzzySearch(self, term, k=FUZZY_RESULTS):
+        """
+        Returns IDs of up to k tasks whose name & description share the most n-grams with lowercase term,
+        best match first. Rare n-grams weigh more & common ones beyond FUZZY_SCAN_BUDGET are skipped.
+        """
+        for field in FUZZY_FIELDS:
+            if field in self.buildPositions: self.buildStep(field, None)
+        term = " ".join(term.split())
+        termGrams = {term[i:i + length] for length in FUZZY_GRAM_LENGTHS for i in range(len(term) - length + 1)}
+        if not termGrams and term: termGrams = {term}
+        postingLists = sorted(((taskIds, FUZZY_FIELDS[field]) for field in FUZZY_FIELDS
+                               for taskIds in map(self.postings[field].get, termGrams) if taskIds),
+                              key=lambda postingList: len(postingList[0]))
+        if not postingLists: return []
+
+        # Even the rarest n-gram is in too many tasks to rank, they all match equally
+        if len(postingLists[0][0]) > FUZZY_SCAN_BUDGET: return list(islice(postingLists[0][0], k))
+
+        # Shared n-grams are counted in C, rarest first until the budget runs out
+        counts = Counter()
+        budget = FUZZY_SCAN_BUDGET
+        for taskIds, fieldWeight in postingLists:
+            if len(taskIds) > budget: break
+            budget -= len(taskIds)
+            counts.update(taskIds)
+
+        # Only tasks sharing the most counted n-grams are weighed, by every n-gram they share
+        candidateCount = k * FUZZY_CANDIDATE_RATIO
+        histogram = Counter(counts.values())
+        kept = 0
+        for threshold in sorted(histogram, reverse=True):
+            kept += histogram[threshold]
+            if kept >= candidateCount: break
+        candidates = [taskId for taskId, count in counts.items() if count > threshold]
+        candidates += islice((taskId for taskId, count in counts.items() if count == threshold),
+                             max(0, candidateCount - len(candidates)))
+
+        # Bounded heap keeps the best k, ties go to shorter names as they're closer to the term
+        taskCount = len(self.texts["name"]) + 1
+        scores = dict.fromkeys(candidates, 0.0)
+        candidates = set(candidates)
+        for taskIds, fieldWeight in postingLists:
+            weight = fieldWeight * math.log(taskCount / len(taskIds))
+            for taskId in candidates & taskIds: scores[taskId] += weight
+        names = self.texts["name"]
+        return heapq.nlargest(k, scores, key=lambda taskId: (scores[taskId], -len(names[taskId][0]), -taskId))
+
+
+# Meant for testing purposes
+if __name__ == "__main__":
+    import random
+    import statistics
+    import sys
+    import time
+
+    from taskStore import TaskStore
+
+    words = ["report", "meeting", "groceries", "dentist", "invoice", "laundry", "project", "review", "budget",
+             "email", "call", "plan", "garden", "insurance", "taxes", "birthday", "gift", "car", "book", "flight"]
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    store = TaskStore()
+    for i in range(size):
+        store.addTask(" ".join(random.sample(words, 3)) + f" {i}", "", [], " ".join(random.sample(words, 5)))
+    index = SearchIndex()
+    index.rebuild(store)
+    index.fuzzySearch("")  # Builds name & description postings
+
+    # Misspelled, partial & common terms, each must stay under a 16 ms frame
+    for term in ["reprot", "grocreies", "dentist invoce", "budget 4242", "meeting", "car", "zzz"]:
+        seconds = []
+        for _ in range(5):
+            start = time.perf_counter()
+            taskIds = index.fuzzySearch(term)
+            seconds.append(time.perf_counter() - start)
+        best = store.getTask(taskIds[0]).name if taskIds else "-"
+        print(f"{term!r:<18} {statistics.median(seconds) * 1000:6.2f} ms  {len(taskIds):>3} results, best: {best}")
@@ -0,0 +1,134 @@
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+
+from taskStorage import writeFirstPage
+
+AUTOSAVE_SECONDS = 5  # Changes are snapshotted at most this often
+LATENCY_SAMPLES = 100  # Most recent saves kept for latency metrics
+
+
+class SnapshotWriter:
+    """
+    This class autosaves the task store on a background writer thread. Every mutation only
+    counts as a dirty change, changes are coalesced into at most one snapshot per interval.
+    Only copying the store content happens on the UI thread, pickling & writing don't.
+    """
+
+    def __init__(self, storage, timer, interval=AUTOSAVE_SECONDS, firstPage=None):
+        """
+        storage is a snapshot storage backend, timer provides Tk's after & after_cancel.
+        firstPage(store) copies the first task panel rows, saved along with each snapshot.
+        """
+        self.storage = storage
+        self.firstPage = firstPage
+        self.timer = timer
+        self.intervalMs = int(interval * 1000)
+        self.store = None
+        self.timerId = None
+        self.dirtyCount = 0  # Changes since the last captured snapshot
+        self.writingCount = 0  # Changes in captured snapshots that aren't on disk yet
+        self.captures = queue.Queue()  # Captured (save data, first page, capture time) waiting for writer thread
+        self.idle = threading.Event()  # Set while no captured snapshot is waiting or being written
+        self.idle.set()
+        self.thread = None
+        self.saveCount = 0
+        self.captureSeconds = deque(maxlen=LATENCY_SAMPLES)  # UI thread time spent copying store content
+        self.saveLatencies = deque(maxlen=LATENCY_SAMPLES)  # Seconds from capture until snapshot is on disk
+        self.lastError = None
+
+    def attach(self, store):
+        """ Starts autosaving mutations of store, storage that saves every change itself isn't autosaved """
+        if self.store is not None: self.store.removeObserver(self.update)
+        self.store = store
+        if not hasattr(self.storage, "captureSnapshot"): return
+        store.addObserver(self.update)
+        if hasattr(self.storage, "compactEvery"): self.storage.compactEvery = None  # Journal is compacted here instead
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="snapshotWriter", daemon=True)
+            self.thread.start()
+
+    def update(self, action, *args):
+        """ Task store observer that schedules a snapshot once the interval has passed """
+        self.dirtyCount += 1
+        if self.timerId is None: self.timerId = self.timer.after(self.intervalMs, self.capture)
+
+    def capture(self):
+        """ Copies store content for the writer thread, waits for another interval while it's busy """
+        self.timerId = None
+        if not self.idle.is_set():
+            self.timerId = self.timer.after(self.intervalMs, self.capture)
+            return
+        start = time.perf_counter()
+        data = self.storage.captureSnapshot(self.store)
+        page = None if self.firstPage is None else self.firstPage(self.store)
+        captured = time.perf_counter()
+        self.captureSeconds.append(captured - start)
+        if data is not None:
+            self.idle.clear()
+            self.writingCount += self.dirtyCount
+            self.captures.put((data, page, captured))
+        elif page is not None: writeFirstPage(page)  # Storage compacted right away instead
+        self.dirtyCount = 0
+
+    def run(self):
+        """ Writer thread loop, writes captured snapshots until None is received """
+        while True:
+            item = self.captures.get()
+            if item is None: break
+            data, page, captured = item
+            try:
+                self.storage.writeCapture(data)
+                if page is not None: writeFirstPage(page)
+            except OSError as error:
+                self.lastError = error  # Changes stay counted as unsaved, the next snapshot retries
+            else:
+                self.saveLatencies.append(time.perf_counter() - captured)
+                self.saveCount += 1
+                self.writingCount = 0
+            self.idle.set()
+
+    def cancelTimer(self):
+        if self.timerId is not None: self.timer.after_cancel(self.timerId)
+        self.timerId = None
+
+    # ============== Synchronous Saves ==============
+
+    def save(self):
+        """ Waits for pending writes, then saves the whole store right away """
+        self.idle.wait()
+        self.cancelTimer()
+        self.storage.save(self.store)
+        self.dirtyCount = self.writingCount = 0
+
+    def clear(self):
+        """ Waits for pending writes, then deletes all saved content """
+        self.idle.wait()
+        self.cancelTimer()
+        self.storage.clear()
+        self.dirtyCount = self.writingCount = 0
+
+    def close(self, store):
+        """ Writes remaining changes, stops writer thread & closes storage """
+        self.cancelTimer()
+        if self.thread is None:
+            self.storage.close(store)
+            return
+        self.idle.wait()
+        if self.dirtyCount or self.writingCount: self.capture()
+        self.captures.put(None)
+        self.thread.join()
+        self.thread = None
+        self.storage.closeFiles()
+
+    # ============== Metrics ==============
+
+    def metrics(self):
+        """ Returns autosave counters & latencies in seconds, queue depth counts changes not on disk yet """
+        return {"saves": self.saveCount, "queue depth": self.dirtyCount + self.writingCount,
+                "median save latency": statistics.median(self.saveLatencies) if self.saveLatencies else None,
+                "max save latency": max(self.saveLatencies, default=None),
+                "median capture time": statistics.median(self.captureSeconds) if self.captureSeconds else None,
+                "last error": self.lastError}
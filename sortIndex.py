@@ -0,0 +1,123 @@
+from bisect import bisect_left, insort
+
+NO_DEADLINE = float("inf")
+SMALL_FILTER_RATIO = 16  # Filtered views smaller than 1/16 of all tasks are sorted directly
+
+# "Sort By" option -> task sort key, "default" is the task store's own order
+SORT_KEYS = {
+    "name": lambda task: task["name"],
+    "deadline": lambda task: NO_DEADLINE if task.due is None else task.due,  # Chronological, none last
+    "creation date": lambda task: task.created
+}
+
+
+class SortIndex:
+    """
+    This class keeps every "Sort By" order of the task store as a sorted list of
+    (key, task ID, task) entries so changing or flipping the sort only walks an index
+    """
+
+    def __init__(self):
+        self.entries = {}  # Sort option -> sorted entries, built when option is first used
+        self.entryOf = {}  # Sort option -> task ID -> its current entry
+        self.store = None
+
+    def rebuild(self, store):
+        """ Drops built orders & keeps index updated with mutations of store """
+        if self.store is not store:
+            if self.store is not None: self.store.removeObserver(self.update)
+            store.addObserver(self.update)
+            self.store = store
+        self.clear()
+
+    def clear(self):
+        self.entries.clear()
+        self.entryOf.clear()
+
+    def buildOption(self, sortType):
+        key = SORT_KEYS[sortType]
+        entryOf = {task["id"]: (key(task), task["id"], task) for task in self.store.tasksById.values()}
+        self.entryOf[sortType] = entryOf
+        self.entries[sortType] = sorted(entryOf.values())
+
+    def update(self, action, *args):
+        """ Task store observer that moves changed tasks within each built order """
+        if action == "add": self.addTask(args[0])
+        elif action == "edit":
+            self.removeTask(args[0])
+            self.addTask(self.store.getTask(args[0]))
+        elif action == "delete": self.removeTask(args[0])
+        elif action == "restore": self.restoreTasks(args[0])
+        elif action == "clear": self.clear()
+        elif action == "batch": self.updateBatch(args[0])
+
+    def updateBatch(self, mutations):
+        """
+        Filters a batch's changed tasks out of each built order in one pass & adds back the ones still in
+        the store. A batch is notified once it's done, so a task may be added or edited then deleted within it.
+        """
+        changedIds = set()
+        for action, *args in mutations:
+            if action == "add": changedIds.add(args[0].id)
+            elif action in ("edit", "delete"): changedIds.add(args[0])
+            elif action == "restore": changedIds.update(task.id for task in args[0])
+            elif action == "clear":
+                self.clear()  # Sorted again when next used
+                return
+        if not changedIds: return
+        tasksById = self.store.tasksById
+        tasks = [tasksById[taskId] for taskId in changedIds if taskId in tasksById]
+        if len(tasks) * SMALL_FILTER_RATIO > len(self.store):
+            self.clear()
+            return
+        for sortType, entries in self.entries.items():
+            entryOf = self.entryOf[sortType]
+            for taskId in changedIds: entryOf.pop(taskId, None)
+            entries[:] = [entry for entry in entries if entry[1] not in changedIds]
+            for task in tasks:
+                entryOf[task.id] = entry = (SORT_KEYS[sortType](task), task.id, task)
+                insort(entries, entry)
+
+    def addTask(self, task):
+        for sortType, entries in self.entries.items():
+            entry = (SORT_KEYS[sortType](task), task["id"], task)
+            self.entryOf[sortType][task["id"]] = entry
+            insort(entries, entry)
+
+    def restoreTasks(self, tasks):
+        """ Restored tasks kept their sort keys, only the ones no longer in built orders are added """
+        if len(tasks) * SMALL_FILTER_RATIO > len(self.store): self.clear()  # Sorted again when next used
+        for sortType, entries in self.entries.items():
+            entryOf = self.entryOf[sortType]
+            for task in tasks:
+                if task.id in entryOf: continue
+                task = self.store.getTask(task.id)
+                entryOf[task.id] = entry = (SORT_KEYS[sortType](task), task.id, task)
+                insort(entries, entry)
+
+    def removeTask(self, taskId):
+        for sortType, entries in self.entries.items():
+            entry = self.entryOf[sortType].pop(taskId)
+            del entries[bisect_left(entries, entry[:2])]
+
+    def orderedTasks(self, sortType, flipped=False, taskIds=None):
+        """ Returns tasks in "Sort By" order, reversed if flipped & limited to taskIds if given """
+        if sortType != "default" and sortType not in self.entries: self.buildOption(sortType)
+
+        # Few filtered tasks are cheaper to sort on their own than to pick out of a whole order
+        # Filtered IDs of tasks deleted since the search are skipped
+        if taskIds is not None and len(taskIds) * SMALL_FILTER_RATIO < len(self.store):
+            tasksById = self.store.tasksById
+            if sortType == "default":
+                tasks = sorted((tasksById[taskId] for taskId in taskIds if taskId in tasksById), key=lambda x: x["order"])
+            else:
+                entryOf = self.entryOf[sortType]
+                tasks = [entry[2] for entry in sorted(entryOf[taskId] for taskId in taskIds if taskId in entryOf)]
+        elif sortType == "default":
+            tasks = self.store.orderedTasks()
+            if taskIds is not None: tasks = [task for task in tasks if task["id"] in taskIds]
+        elif taskIds is None: tasks = [entry[2] for entry in self.entries[sortType]]
+        else: tasks = [entry[2] for entry in self.entries[sortType] if entry[1] in taskIds]
+
+        if flipped: tasks.reverse()
+        return tasks
@@ -0,0 +1,327 @@
+import os
+import sqlite3
+from datetime import datetime
+from itertools import chain
+
+from progressRollup import UNKNOWN_YEAR, ProgressRollup
+from task import Task, parseDeadline
+from taskStorage import JournalStorage, StorageLock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    deadline TEXT NOT NULL,
+    creationDate TEXT NOT NULL,
+    description TEXT NOT NULL,
+    done INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    reminder TEXT,
+    due INTEGER
+);
+CREATE TABLE IF NOT EXISTS taskCategories (
+    taskId INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    PRIMARY KEY (taskId, category)
+);
+CREATE TABLE IF NOT EXISTS progress (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL,
+    month TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS progressCounts (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (year, month, action)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE INDEX IF NOT EXISTS tasksPosition ON tasks(position);
+CREATE INDEX IF NOT EXISTS tasksName ON tasks(name, id);
+CREATE INDEX IF NOT EXISTS tasksDeadline ON tasks(deadline, id);
+CREATE INDEX IF NOT EXISTS tasksCreationDate ON tasks(creationDate, id);
+CREATE INDEX IF NOT EXISTS tasksDone ON tasks(done, position);
+CREATE INDEX IF NOT EXISTS tasksPriority ON tasks(priority, position);
+CREATE INDEX IF NOT EXISTS taskCategoriesCategory ON taskCategories(category, taskId);
+"""
+
+# "Sort By" option -> indexed ORDER BY clause
+SORT_COLUMNS = {"default": "position", "name": "name, id", "deadline": "due IS NULL, due, id",
+                "creation date": "creationDate, id"}
+
+
+class SqliteStorage:
+    """
+    This class keeps the task store in an indexed SQLite database
+    so every mutation only writes the rows it touches
+    """
+
+    def __init__(self, databasePath='../persistentSave.db', snapshotPath='../persistentSave.pkl',
+                 journalPath='../persistentSave.journal'):
+        self.databasePath = databasePath
+        self.snapshotPath = snapshotPath  # Older pickle save migrated on first run
+        self.journalPath = journalPath
+        self.connection = None
+        self.store = None
+        self.lock = StorageLock(os.path.splitext(databasePath)[0] + ".lock")  # Held from load until closed
+
+    def connect(self):
+        """ Opens database in WAL mode & creates schema if needed """
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.databasePath)
+            # Searches fold case like str.lower() & the search bar, SQLite's lower() only folds ASCII letters
+            self.connection.create_function("foldCase", 1, str.lower, deterministic=True)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("PRAGMA foreign_keys=ON")
+            self.connection.executescript(SCHEMA)
+
+            # Databases written before deadlines were parsed lack the due column
+            if "due" not in [column[1] for column in self.connection.execute("PRAGMA table_info(tasks)")]:
+                with self.connection:
+                    self.connection.execute("ALTER TABLE tasks ADD COLUMN due INTEGER")
+                    self.connection.executemany("UPDATE tasks SET due = ? WHERE id = ?", [
+                        (parseDeadline(deadline), taskId)
+                        for taskId, deadline in self.connection.execute("SELECT id, deadline FROM tasks")])
+            self.connection.execute("CREATE INDEX IF NOT EXISTS tasksDue ON tasks(due, id)")
+        return self.connection
+
+    # ============== Storage Interface ==============
+
+    def load(self, store):
+        """ Loads database into task store, returns whether a save was found """
+        self.lock.acquire()
+        connection = self.connect()
+        if self.getMeta("migrated") is None:
+            self.migratePickle(store)
+
+        # Databases written before rollups hold one progress row per user action
+        with connection:
+            connection.execute("INSERT INTO progressCounts SELECT ?, CAST(month AS INTEGER), action, COUNT(*) "
+                               "FROM progress WHERE true GROUP BY month, action "
+                               "ON CONFLICT (year, month, action) DO UPDATE SET count = count + excluded.count",
+                               (UNKNOWN_YEAR,))
+            connection.execute("DELETE FROM progress")
+
+        found = connection.execute("SELECT 1 FROM tasks UNION ALL SELECT 1 FROM progressCounts LIMIT 1").fetchone() is not None
+        if found:
+            progress = ProgressRollup()
+            for year, month, action, count in connection.execute("SELECT * FROM progressCounts"):
+                progress.bump(action, year, month, count)
+            relabeled = store.loadData({
+                "tasks": self.queryTasks(),
+                "progress": progress.toData(),
+                "tasksListFlipped": bool(self.getMeta("tasksListFlipped", 0)),
+                "nextTaskId": self.getMeta("nextTaskId", 0)})
+
+            # Databases written before order labels hold row numbers, stored once as labels
+            if relabeled:
+                with connection:
+                    connection.executemany("UPDATE tasks SET position = ? WHERE id = ?",
+                                           ((task["order"], task["id"]) for task in store.tasksById.values()))
+        self.attach(store)
+        return found
+
+    def migratePickle(self, store):
+        """ Copies an existing pickle snapshot & journal into the database once """
+        migrated = 0
+        if os.path.exists(self.snapshotPath) or os.path.exists(self.journalPath):
+            legacyStorage = JournalStorage(self.snapshotPath, self.journalPath)
+            legacyStorage.lock = StorageLock(None)  # Covered by the database's lock
+            if legacyStorage.load(store):
+                self.save(store)
+                migrated = 1
+            legacyStorage.close(store)
+            store.removeObserver(legacyStorage.record)
+        with self.connection: self.setMeta("migrated", migrated)
+
+    def attach(self, store):
+        """ Starts writing mutations of task store to the database """
+        self.lock.acquire()
+        if self.store is not None: self.store.removeObserver(self.record)
+        self.store = store
+        store.addObserver(self.record)
+
+    def save(self, store):
+        """ Rewrites whole database from task store in one transaction """
+        connection = self.connect()
+        with connection:
+            self.deleteAll()
+            connection.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                   (self.taskRow(task) for task in store.tasksById.values()))
+            connection.executemany("INSERT INTO taskCategories VALUES (?, ?)",
+                                   ((task["id"], category) for task in store.orderedTasks()
+                                    for category in task["category"]))
+            connection.executemany("INSERT INTO progressCounts VALUES (?, ?, ?, ?)", store.progress.rows())
+            self.setMeta("tasksListFlipped", int(store.tasksListFlipped))
+            self.setMeta("nextTaskId", store.nextTaskId)
+        if self.store is not store: self.attach(store)
+
+    def close(self, store):
+        """ Every mutation is already committed, only needs to be closed """
+        self.closeFiles()
+
+    def closeFiles(self):
+        if self.connection is not None: self.connection.close()
+        self.connection = None
+        self.lock.release()
+
+    def clear(self):
+        """ Deletes all saved content """
+        connection = self.connect()
+        with connection: self.deleteAll()
+
+    # ============== Mutation Observer ==============
+
+    def record(self, action, *args):
+        """ Writes one task store mutation, or every mutation of a batch, in its own transaction """
+        connection = self.connect()
+        with connection:
+            if action == "batch":
+                for mutation in args[0]: self.writeMutation(*mutation)
+            else: self.writeMutation(action, *args)
+
+    def writeMutation(self, action, *args):
+        """
+        Writes one task store mutation inside the current transaction. A batch is written once it's
+        done, so a task it deleted is skipped by its earlier mutations, the delete removes its row.
+        """
+        connection = self.connection
+        tasksById = self.store.tasksById
+        if action == "add":
+            task = args[0]
+            connection.execute("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.taskRow(task))
+            connection.executemany("INSERT INTO taskCategories VALUES (?, ?)",
+                                   ((task["id"], category) for category in task["category"]))
+            self.setMeta("nextTaskId", self.store.nextTaskId)
+        elif action == "edit":
+            taskId, name, deadline, categories, description = args
+            if taskId not in tasksById: return
+            connection.execute("UPDATE tasks SET name = ?, deadline = ?, due = ?, description = ? WHERE id = ?",
+                               (name, deadline, tasksById[taskId].due, description, taskId))
+            connection.execute("DELETE FROM taskCategories WHERE taskId = ?", (taskId,))
+            connection.executemany("INSERT INTO taskCategories VALUES (?, ?)",
+                                   ((taskId, category) for category in categories))
+        elif action == "delete":
+            connection.execute("DELETE FROM tasks WHERE id = ?", (args[0],))
+        elif action == "restore":
+            tasks = list({task.id: tasksById[task.id] for task in args[0] if task.id in tasksById}.values())
+            connection.executemany("DELETE FROM tasks WHERE id = ?", ((task["id"],) for task in tasks))
+            connection.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", map(self.taskRow, tasks))
+            connection.executemany("INSERT INTO taskCategories VALUES (?, ?)",
+                                   ((task["id"], category) for task in tasks for category in task["category"]))
+        elif action == "done" or action == "priority":
+            if args[0] in tasksById: self.moveTask(tasksById[args[0]])
+        elif action == "reminder":
+            connection.execute("UPDATE tasks SET reminder = ? WHERE id = ?", (args[1], args[0]))
+        elif action == "progress":
+            progressAction, year, month = args[:3]
+            amount = args[3] if len(args) > 3 else 1  # Batches record each action's count together
+            connection.execute("INSERT INTO progressCounts VALUES (?, ?, ?, ?) ON CONFLICT (year, month, action) "
+                               "DO UPDATE SET count = count + excluded.count", (year, month, progressAction, amount))
+        elif action == "flip":
+            self.setMeta("tasksListFlipped", int(args[0]))
+        elif action == "clear": self.deleteAll()
+
+    def deleteAll(self):
+        """ Deletes every task & user action inside the current transaction """
+        self.connection.execute("DELETE FROM taskCategories")
+        self.connection.execute("DELETE FROM tasks")
+        self.connection.execute("DELETE FROM progressCounts")
+        self.setMeta("tasksListFlipped", 0)
+
+    def moveTask(self, task):
+        """ Stores task's new segment & order label, no other row moves """
+        self.connection.execute("UPDATE tasks SET position = ?, done = ?, priority = ? WHERE id = ?",
+                                (task["order"], int(task["done"]), int(task["priority"]), task["id"]))
+
+    # ============== Indexed Queries ==============
+
+    def queryTasks(self, sortType="default", flipped=False, searchType=None, searchTerm="",
+                   done=None, priority=None, limit=None, offset=0, dueRange=None):
+        """
+        Returns one page of tasks sorted by a "Sort By" option & filtered with
+        the search bar's substring semantics straight from the database
+        """
+        return list(chain.from_iterable(self.queryTaskPages(sortType, flipped, searchType, searchTerm, done,
+                                                            priority, limit, offset, dueRange)))
+
+    def queryTaskPages(self, sortType="default", flipped=False, searchType=None, searchTerm="",
+                       done=None, priority=None, limit=None, offset=0, dueRange=None, pageSize=500):
+        """
+        Yields queryTasks' result pageSize tasks at a time from one query, so however many tasks
+        match only a page of them is in memory. dueRange is a [start, stop) range of due times.
+        """
+        clauses, parameters = [], []
+        searchTerm = searchTerm.lower()
+        if searchTerm and searchTerm != "search":
+            if searchType == "category":
+                clauses.append("EXISTS (SELECT 1 FROM taskCategories WHERE taskId = tasks.id "
+                               "AND instr(foldCase(category), ?) > 0)")
+            elif searchType == "creation date":
+                clauses.append("instr(strftime('%Y/%m/%d/%H:%M', creationDate), ?) > 0")
+            elif searchType in ("name", "deadline", "description"):
+                clauses.append(f"instr(foldCase({searchType}), ?) > 0")
+            else: raise ValueError(f"Unknown search type: {searchType}")
+            parameters.append(searchTerm)
+        if done is not None:
+            clauses.append("done = ?")
+            parameters.append(int(done))
+        if priority is not None:
+            clauses.append("priority = ?")
+            parameters.append(int(priority))
+        if dueRange is not None:
+            clauses.append("due >= ? AND due < ?")
+            parameters.extend(dueRange)
+
+        direction = " DESC" if flipped else ""
+        orderBy = ", ".join(column + direction for column in SORT_COLUMNS[sortType].split(", "))
+        query = "SELECT * FROM tasks"
+        if clauses: query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY {orderBy} LIMIT ? OFFSET ?"
+        parameters.extend([-1 if limit is None else limit, offset])
+
+        cursor = self.connect().execute(query, parameters)
+        while True:
+            tasks = [self.rowTask(row) for row in cursor.fetchmany(pageSize)]
+            if not tasks: return
+            categories = {}
+            for i in range(0, len(tasks), 500):
+                taskIds = [task["id"] for task in tasks[i:i + 500]]
+                for taskId, category in self.connection.execute(
+                        f"SELECT taskId, category FROM taskCategories "
+                        f"WHERE taskId IN ({','.join('?' * len(taskIds))}) ORDER BY rowid", taskIds):
+                    categories.setdefault(taskId, []).append(category)
+            for task in tasks: task["category"] = categories.get(task["id"], ())
+            yield tasks
+
+    def countTasks(self, done=None):
+        """ Counts tasks, optionally only done or not done ones """
+        if done is None: return self.connect().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        return self.connect().execute("SELECT COUNT(*) FROM tasks WHERE done = ?", (int(done),)).fetchone()[0]
+
+    # ============== Row Conversion ==============
+
+    @staticmethod
+    def taskRow(task):
+        return (task["id"], task["order"], task["name"], task["deadline"],
+                task["creation date"].isoformat(" "), task["description"],
+                int(task["done"]), int(task["priority"]), task["reminder"], task.due)
+
+    @staticmethod
+    def rowTask(row):
+        taskId, position, name, deadline, creationDate, description, done, priority, reminder, due = row
+        return Task(taskId, position, name, deadline, (), int(datetime.fromisoformat(creationDate).timestamp()),
+                    description, bool(done), bool(priority), reminder)
+
+    def getMeta(self, key, default=None):
+        row = self.connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def setMeta(self, key, value):
+        self.connection.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
@@ -0,0 +1,49 @@
+"""
+Title: To-Do List Startup Benchmark
+Description: Launches the application repeatedly & reports its import time & time to first paint
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APPLICATION = os.path.join(os.path.dirname(os.path.abspath(__file__)), "todoLIstApplication.py")
+STAGES = ["imports", "first paint", "loaded"]
+
+
+def launch():
+    """ Runs application once in benchmark mode, returns stage -> seconds & whole process seconds """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, APPLICATION], capture_output=True, text=True,
+                            env=dict(os.environ, TODO_STARTUP_BENCHMARK="1"))
+    wallTime = time.perf_counter() - start
+    if result.returncode != 0: raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    timings = {}
+    for line in result.stdout.splitlines():
+        stage, seconds = line.rsplit(" ", 1)
+        timings[stage] = float(seconds)
+    return timings, wallTime
+
+
+def importSeconds(module):
+    """ Returns seconds a fresh interpreter needs to import module, None if it isn't installed """
+    command = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", command], capture_output=True, text=True)
+    return float(result.stdout) if result.returncode == 0 else None
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    try: launches = [launch() for _ in range(runs)]
+    except RuntimeError as error: sys.exit(f"Application couldn't start (a display is required): {error}")
+
+    print(f"Median of {runs} launches, seconds since application start:")
+    for stage in STAGES:
+        print(f"  {stage:<12} {statistics.median(timings[stage] for timings, _ in launches):.3f}")
+    print(f"  {'process':<12} {statistics.median(wallTime for _, wallTime in launches):.3f} (including interpreter)")
+
+    # What launching would cost if the progress graph was still imported up front
+    matplotlibSeconds = importSeconds("matplotlib.pyplot")
+    if matplotlibSeconds is not None: print(f"Deferred matplotlib.pyplot import: {matplotlibSeconds:.3f}")
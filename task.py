@@ -0,0 +1,149 @@
+import re
+import sys
+from datetime import datetime
+from operator import attrgetter
+
+DEADLINE_PATTERN = re.compile(r"(\d{4})/(\d{1,2})/(\d{1,2})/(\d{1,2}):(\d{1,2})")  # 'YYYY/M/D/H:M'
+
+# Mapping key -> slot, every key a task dict had
+TASK_KEYS = {"id": "id", "order": "order", "name": "name", "deadline": "deadline", "category": "category",
+             "creation date": "created", "description": "description", "done": "done",
+             "priority": "priority", "reminder": "reminder"}
+
+
+def parseDeadline(deadline):
+    """ Returns a deadline's time in epoch seconds, None if it's empty or not a real date """
+    match = DEADLINE_PATTERN.fullmatch(deadline)
+    if match is None: return None
+    try: return int(datetime(*map(int, match.groups())).timestamp())
+    except ValueError: return None
+
+
+def restoreTask(*fields):
+    """ Unpickles a task from its slot values without parsing its deadline again """
+    task = Task.__new__(Task)
+    for slot, value in zip(Task.__slots__, fields): setattr(task, slot, value)
+    return task
+
+
+def internCategories(categories):
+    """ Returns categories as a tuple sharing one string object per distinct category """
+    return tuple(sys.intern(category) for category in categories)
+
+
+class Task:
+    """
+    This class is a compact task record with one slot per field, interned categories &
+    an epoch seconds creation time. It can still be used like the dict tasks used to be.
+    The deadline is parsed once whenever it's set, into due epoch seconds (None if missing).
+    """
+
+    __slots__ = ("id", "order", "name", "deadline", "category", "created", "description",
+                 "done", "priority", "reminder", "due")
+
+    def __init__(self, taskId, order, name, deadline, categories, created, description,
+                 done=False, priority=False, reminder=None):
+        """ created is the creation time in whole epoch seconds """
+        self.id = taskId
+        self.order = order
+        self.name = name
+        self.deadline = deadline
+        self.due = parseDeadline(deadline)
+        self.category = internCategories(categories)
+        self.created = created
+        self.description = description
+        self.done = done
+        self.priority = priority
+        self.reminder = reminder
+
+    @classmethod
+    def fromMapping(cls, task):
+        """ Converts a task dict from an older save, Task objects are returned as they are """
+        if isinstance(task, cls): return task
+        return cls(task.get("id"), task["order"], task["name"], task["deadline"], task["category"],
+                   int(task["creation date"].timestamp()), task["description"], task["done"],
+                   task["priority"], task.get("reminder"))
+
+    def __reduce__(self):
+        """ Pickles as a plain tuple of slot values """
+        return restoreTask, taskFields(self)
+
+    def __repr__(self): return f"Task({self.id!r}, {self.name!r})"
+
+    # ============== Mapping Adapter ==============
+
+    def __getitem__(self, key):
+        if key == "creation date": return datetime.fromtimestamp(self.created)
+        return getattr(self, TASK_KEYS[key])
+
+    def __setitem__(self, key, value):
+        if key == "creation date": self.created = int(value.timestamp())
+        elif key == "category": self.category = internCategories(value)
+        elif key == "deadline":
+            self.deadline = value
+            self.due = parseDeadline(value)
+        else: setattr(self, TASK_KEYS[key], value)
+
+    def __contains__(self, key): return key in TASK_KEYS
+
+    def __iter__(self): return iter(TASK_KEYS)
+
+    def __len__(self): return len(TASK_KEYS)
+
+    def get(self, key, default=None): return self[key] if key in TASK_KEYS else default
+
+    def keys(self): return TASK_KEYS.keys()
+
+    def items(self): return [(key, self[key]) for key in TASK_KEYS]
+
+
+taskFields = attrgetter(*Task.__slots__)  # Returns a task's slot values as a tuple, restoreTask reverses it
+SLOTS = [getattr(Task, slot) for slot in Task.__slots__]  # Slot descriptors, they skip MappedTask's lazy properties
+
+
+def copyTask(task):
+    """ Returns a copy of task with the same type & slot values, fields a MappedTask hasn't decoded stay undecoded """
+    copy = object.__new__(type(task))
+    for slot in SLOTS: slot.__set__(copy, slot.__get__(task))
+    return copy
+
+
+class TaskList(list):
+    """
+    A list of tasks that pickles as one list of slot values per slot instead of a tuple per task, so
+    journaling the thousands of tasks an undone Clear All or bulk delete restores takes a few C passes.
+    Fields a MappedTask hasn't decoded yet are pickled as its snapshot, not decoded.
+    """
+
+    def __reduce__(self):
+        return restoreTaskList, (list(map(type, self)), *[list(map(slot.__get__, self)) for slot in SLOTS])
+
+
+def restoreTaskList(types, *columns):
+    """ Unpickles a TaskList, each task gets back its type & slot values """
+    tasks = TaskList(map(object.__new__, types))
+    for slot, values in zip(SLOTS, columns):
+        for task, value in zip(tasks, values): slot.__set__(task, value)
+    return tasks
+
+
+# Meant for testing purposes
+if __name__ == "__main__":
+    import tracemalloc
+
+    def measure(makeTask, count=100000):
+        """ Returns traced bytes per task kept alive by makeTask """
+        tracemalloc.start()
+        tasks = [makeTask(i) for i in range(count)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size / len(tasks)
+
+    now = datetime.now()
+    dictSize = measure(lambda i: {
+        "id": i, "order": i, "name": f"Task {i}", "deadline": "2024/01/01/12:00",
+        "category": ["Work", "Personal"][:i % 3], "creation date": datetime.now(),
+        "description": "", "done": False, "priority": False, "reminder": None})
+    taskSize = measure(lambda i: Task(i, i, f"Task {i}", "2024/01/01/12:00", ["Work", "Personal"][:i % 3],
+                                      int(now.timestamp()) + i, ""))
+    print(f"dict task: {dictSize:.0f} bytes, Task: {taskSize:.0f} bytes, {dictSize / taskSize:.1f}x smaller")
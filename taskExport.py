@@ -0,0 +1,116 @@
+import json
+import time
+from datetime import datetime
+
+from task import Task
+
+TASK_LINES_FORMAT = "todo-task-lines"  # Header marking a line-delimited task list
+
+
+def encodeDate(value):
+    """ JSON default hook writing tasks & datetimes as 'YYYY-MM-DD HH:MM:SS' without touching the task """
+    if isinstance(value, Task): return dict(value)
+    if isinstance(value, datetime): return value.isoformat(" ", "seconds")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def decodeTask(task):
+    """ Converts an exported task's creation date back to a datetime """
+    task["creation date"] = datetime.fromisoformat(task["creation date"])
+    return task
+
+
+# ============== Line-Delimited Task Lists ==============
+
+def writeTaskLines(store, f):
+    """
+    Writes a header line with the application status followed by one task per line,
+    returns the number of tasks written. Live tasks are never modified.
+    """
+    header = {"format": TASK_LINES_FORMAT, "version": 1, "progress": store.progress.toData(),
+              "tasksListFlipped": store.tasksListFlipped, "nextTaskId": store.nextTaskId}
+    f.write(json.dumps(header) + "\n")
+    encode = json.JSONEncoder(default=encodeDate, separators=(",", ":")).encode
+    count = 0
+    for task in store.orderedTasks():
+        f.write(encode(task))
+        f.write("\n")
+        count += 1
+    return count
+
+
+def readTaskLines(f):
+    """ Returns a line-delimited task list's header & a generator of its tasks """
+    header = json.loads(f.readline())
+    if header.get("format") != TASK_LINES_FORMAT: raise ValueError("Not a line-delimited task list")
+
+    def tasks():
+        for line in f:
+            if line.strip(): yield decodeTask(json.loads(line))
+    return header, tasks()
+
+
+# ============== Single Document Task Lists ==============
+
+def writeTaskDocument(store, f):
+    """ Writes the older single JSON document format, returns the number of tasks written """
+    json.dump(store.saveData(), f, default=encodeDate)
+    return len(store)
+
+
+def readTaskDocument(f):
+    """ Reads the older single JSON document format into save file data """
+    data = json.load(f)
+    for task in data["tasks"]: decodeTask(task)
+    return data
+
+
+# ============== Application Save Files ==============
+
+def exportTasks(store, filePath):
+    """ Saves store as a task list, line-delimited unless filePath ends with .json. Returns (tasks, tasks/sec) """
+    start = time.perf_counter()
+    with open(filePath, 'w') as f:
+        if filePath.lower().endswith(".json"): count = writeTaskDocument(store, f)
+        else: count = writeTaskLines(store, f)
+    return count, count / max(time.perf_counter() - start, 1e-9)
+
+
+def importTasks(store, filePath):
+    """ Replaces store content with a saved task list of either format. Returns (tasks, tasks/sec) """
+    start = time.perf_counter()
+    with open(filePath, 'r') as f:
+        lineDelimited = f.read(len('{"format"')) == '{"format"'
+        f.seek(0)
+        if lineDelimited:
+            header, tasks = readTaskLines(f)
+            header["tasks"] = tasks
+            store.loadData(header)
+        else: store.loadData(readTaskDocument(f))
+    return len(store), len(store) / max(time.perf_counter() - start, 1e-9)
+
+
+# Meant for testing purposes
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import tracemalloc
+
+    from taskStore import TaskStore
+
+    store = TaskStore()
+    for i in range(100000): store.addTask(f"Task {i}", "2024/01/01/12:00", ["Work"], "Description " * 3)
+
+    for extension in (".json", ".jsonl"):
+        filePath = os.path.join(tempfile.mkdtemp(), "tasks" + extension)
+        count, rate = exportTasks(store, filePath)
+        tracemalloc.start()
+        exportTasks(store, filePath)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{extension}: exported {count} tasks at {rate:,.0f} tasks/sec, peak {peak / 2 ** 20:.1f} MiB")
+
+        loaded = TaskStore()
+        count, rate = importTasks(loaded, filePath)
+        print(f"{extension}: imported {count} tasks at {rate:,.0f} tasks/sec")
+        os.remove(filePath)
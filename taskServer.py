@@ -0,0 +1,367 @@
+"""
+Title: To-Do List Server
+Description: Shares one task list between several clients over HTTP/JSON & load tests it
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from deadlineIndex import DEADLINE_RANGES, DeadlineIndex
+from searchIndex import SEARCH_FIELDS, SearchIndex
+from snapshotWriter import SnapshotWriter
+from sortIndex import SORT_KEYS, SortIndex
+from task import parseDeadline
+from taskExport import encodeDate
+from taskStorage import StorageLockedError, openStorage
+from taskStore import TaskStore
+
+SORT_TYPES = ["default"] + list(SORT_KEYS)
+SEARCH_TYPES = SEARCH_FIELDS + list(DEADLINE_RANGES)
+STATUS_TEXTS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                412: "Precondition Failed", 413: "Content Too Large"}
+KEEP_ALIVE_SECONDS = 30  # Idle keep-alive connections are closed after this long
+MAX_BODY_BYTES = 1 << 20  # Larger request bodies are refused without being read
+encodeJson = json.JSONEncoder(default=encodeDate, separators=(",", ":")).encode
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LoopTimer:
+    """ Gives an asyncio event loop Tk's after & after_cancel, so Tk timer users can run on it """
+
+    def __init__(self, loop): self.loop = loop
+
+    def after(self, ms, callback): return self.loop.call_later(ms / 1000, callback)
+
+    def after_cancel(self, handle): handle.cancel()
+
+
+class TaskServer:
+    """
+    This class serves one task store to many keep-alive HTTP clients on a single event loop.
+    Handlers never await between reading & changing the store, so every request is applied
+    atomically. Each task carries a revision, sent as its ETag, & a write with an If-Match
+    header is refused once another client changed the task, so no update is silently lost.
+    """
+
+    def __init__(self, store, snapshotWriter=None):
+        self.store = store
+        self.snapshotWriter = snapshotWriter
+        self.searchIndex = SearchIndex()
+        self.sortIndex = SortIndex()
+        self.deadlineIndex = DeadlineIndex()
+        self.searchIndex.rebuild(store)
+        self.sortIndex.rebuild(store)
+        self.deadlineIndex.rebuild(store)
+        self.revision = 0  # Bumped by every task change
+        self.revisions = {}  # Task ID -> revision of its last change, unchanged tasks are revision 0
+        store.addObserver(self.trackRevision)
+        self.requestCount = 0
+
+    def trackRevision(self, action, *args):
+        """ Task store observer that stamps changed tasks with a new revision """
+        if action in ("progress", "flip"): return
+        if action == "clear":
+            self.revisions.clear()
+            return
+        if action == "batch":
+            for mutation in args[0]: self.trackRevision(*mutation)
+            return
+        self.revision += 1
+        if action == "restore":
+            for task in args[0]: self.revisions[task.id] = self.revision
+            return
+        if action == "add": self.revisions[args[0].id] = self.revision
+        elif action == "delete": self.revisions.pop(args[0], None)
+        else: self.revisions[args[0]] = self.revision
+
+    # ============== HTTP ==============
+
+    async def handleConnection(self, reader, writer):
+        """ Answers requests of one connection until the client closes it or asks to """
+        try:
+            while True:
+                try: requestLine = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError: break
+                if not requestLine.strip(): break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""): break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                body = None
+                try:
+                    method, target, version = requestLine.decode("latin-1").split()
+                    keepAlive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                    body = await reader.readexactly(self.contentLength(headers))
+                    status, payload, responseHeaders = self.dispatch(method, target, body, headers)
+                except HttpError as error:
+                    status, payload, responseHeaders = error.status, {"error": str(error)}, {}
+                    if body is None: keepAlive = False  # Unread body would be taken for the next request
+                except ValueError:  # Connection is closed as the request can't be trusted to be complete
+                    status, payload, responseHeaders, keepAlive = 400, {"error": "Malformed request"}, {}, False
+                self.requestCount += 1
+
+                content = encodeJson(payload).encode()
+                head = [f"HTTP/1.1 {status} {STATUS_TEXTS[status]}", "Content-Type: application/json",
+                        f"Content-Length: {len(content)}", f"Connection: {'keep-alive' if keepAlive else 'close'}"]
+                head += [f"{name}: {value}" for name, value in responseHeaders.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + content)
+                await writer.drain()
+                if not keepAlive: break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError): pass  # Cancelled on shutdown
+        finally: writer.close()
+
+    @staticmethod
+    def contentLength(headers):
+        """ Returns the request body's byte length, refusing a malformed or too large Content-Length """
+        length = headers.get("content-length", "0")
+        if not (length.isascii() and length.isdigit()): raise HttpError(400, "Content-Length must be a byte count")
+        if int(length) > MAX_BODY_BYTES: raise HttpError(413, f"Body can't be over {MAX_BODY_BYTES} bytes")
+        return int(length)
+
+    def dispatch(self, method, target, body, headers):
+        """ Routes a request, returns (status, JSON payload, extra response headers) """
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        try: data = json.loads(body) if body else {}
+        except json.JSONDecodeError: raise HttpError(400, "Body isn't valid JSON")
+        if not isinstance(data, dict): raise HttpError(400, "Body must be a JSON object")
+
+        if parts == ["tasks"]:
+            if method == "GET": return 200, self.orderedTasks(query), {}
+            if method == "POST": return self.addTask(data)
+        elif len(parts) >= 2 and parts[0] == "tasks":
+            try: taskId = int(parts[1])
+            except ValueError: raise HttpError(404, f"No task with ID {parts[1]}")
+            if taskId not in self.store.tasksById: raise HttpError(404, f"No task with ID {taskId}")
+            if len(parts) == 2:
+                if method == "GET": return self.taskResponse(taskId)
+                if method == "PUT": return self.editTask(taskId, data, headers)
+                if method == "DELETE":
+                    self.checkRevision(taskId, headers)
+                    self.store.deleteTask(taskId)
+                    return 200, {"deleted": taskId}, {}
+            elif len(parts) == 3 and parts[2] in ("done", "priority") and method == "PUT":
+                return self.setFlag(taskId, parts[2], data, headers)
+        elif parts == ["search"] and method == "GET": return 200, self.searchTasks(query), {}
+        elif parts == ["progress"] and method == "GET": return 200, self.progressCounts(query), {}
+        elif parts == ["status"] and method == "GET": return 200, self.status(), {}
+        else: raise HttpError(404, f"Unknown path {url.path}")
+        raise HttpError(405, f"{method} isn't supported on {url.path}")
+
+    # ============== Endpoints ==============
+
+    def taskResponse(self, taskId, status=200):
+        return status, self.store.getTask(taskId), {"ETag": f'"{self.revisions.get(taskId, 0)}"'}
+
+    def checkRevision(self, taskId, headers):
+        """ Refuses a write whose If-Match revision is no longer the task's revision """
+        expected = headers.get("if-match")
+        if expected is not None and expected.strip('"') != str(self.revisions.get(taskId, 0)):
+            raise HttpError(412, f"Task {taskId} was changed by another client")
+
+    def taskFields(self, data):
+        """ Returns validated (name, deadline, categories, description) of a task request body """
+        name, deadline = data.get("name", ""), data.get("deadline", "")
+        categories, description = data.get("category", []), data.get("description", "")
+        if not isinstance(name, str) or not name.strip(): raise HttpError(400, "A task needs a name")
+        if not isinstance(deadline, str) or (deadline and parseDeadline(deadline) is None):
+            raise HttpError(400, "The deadline isn't a real date in the correct format ('YYYY/M/D/H:M')")
+        if not isinstance(categories, list) or not all(isinstance(category, str) for category in categories):
+            raise HttpError(400, "Categories must be a list of strings")
+        if not isinstance(description, str): raise HttpError(400, "The description must be a string")
+        return name, deadline, categories, description
+
+    def addTask(self, data):
+        task = self.store.addTask(*self.taskFields(data))
+        return self.taskResponse(task.id, 201)
+
+    def editTask(self, taskId, data, headers):
+        self.checkRevision(taskId, headers)
+        self.store.editTask(taskId, *self.taskFields(data))
+        return self.taskResponse(taskId)
+
+    def setFlag(self, taskId, flag, data, headers):
+        """ Sets a task's done or priority flag to the requested value, so repeating it changes nothing """
+        value = data.get(flag)
+        if not isinstance(value, bool): raise HttpError(400, f'Body must be {{"{flag}": true or false}}')
+        self.checkRevision(taskId, headers)
+        if self.store.getTask(taskId)[flag] != value:
+            if flag == "done": self.store.toggleDone(taskId)
+            else: self.store.togglePriority(taskId)
+        return self.taskResponse(taskId)
+
+    def orderedTasks(self, query, taskIds=None):
+        """ Returns one page of tasks in the query's sort order """
+        sortType = query.get("sort", "default")
+        if sortType not in SORT_TYPES: raise HttpError(400, f"Sort must be one of {', '.join(SORT_TYPES)}")
+        try: offset, limit = int(query.get("offset", 0)), int(query.get("limit", 100))
+        except ValueError: raise HttpError(400, "Offset & limit must be numbers")
+        if offset < 0 or limit < 0: raise HttpError(400, "Offset & limit can't be negative")
+        tasks = self.sortIndex.orderedTasks(sortType, query.get("flip") in ("1", "true"), taskIds)
+        return {"total": len(tasks), "offset": offset, "tasks": tasks[offset:offset + limit]}
+
+    def searchTasks(self, query):
+        searchType, term = query.get("type", "name"), query.get("term", "").lower()
+        if searchType not in SEARCH_TYPES: raise HttpError(400, f"Type must be one of {', '.join(SEARCH_TYPES)}")
+        if searchType in DEADLINE_RANGES:
+            taskIds = set(self.deadlineIndex.search(searchType))
+            if term: taskIds &= self.searchIndex.search("name", term)
+        else: taskIds = self.searchIndex.search(searchType, term)
+        return self.orderedTasks(query, taskIds)
+
+    def progressCounts(self, query):
+        """ Returns month -> action -> count for the queried year, or every year merged """
+        try: year = int(query["year"]) if "year" in query else None
+        except ValueError: raise HttpError(400, "Year must be a number")
+        return {"year": year, "actions": len(self.store.progress), "months": self.store.progress.monthTotals(year)}
+
+    def status(self):
+        status = {"tasks": len(self.store), "requests": self.requestCount}
+        if self.snapshotWriter is not None: status["autosave"] = self.snapshotWriter.metrics()
+        return status
+
+
+async def serve(host, port, storageMode, seed=0):
+    """ Serves the saved task list, or an unsaved one of seed synthetic tasks in "memory" mode, until stopped """
+    store = TaskStore()
+    snapshotWriter = None
+    if storageMode != "memory":
+        storage = openStorage(storageMode)
+        storage.load(store)
+        snapshotWriter = SnapshotWriter(storage, LoopTimer(asyncio.get_running_loop()))
+        snapshotWriter.attach(store)
+    for i in range(seed):
+        store.addTask(f"Task {i}", random.choice(["", "2026/9/1/12:00", "2026/12/24/18:00"]),
+                      random.sample(["Work", "Personal", "Hobby"], random.randint(0, 2)), f"Description {i}")
+
+    server = TaskServer(store, snapshotWriter)
+    listener = await asyncio.start_server(server.handleConnection, host, port)
+    print(f"Serving {len(store)} tasks on http://{host}:{port}", flush=True)
+    try:
+        async with listener: await listener.serve_forever()
+    finally:
+        if snapshotWriter is not None: snapshotWriter.close(store)
+
+
+# ============== Load Generator ==============
+
+async def request(reader, writer, method, path, data=None):
+    """ Sends one keep-alive request & returns (status, response payload) """
+    body = json.dumps(data).encode() if data is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""): break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length": length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, count, latencies, taskIds):
+    """ Sends count requests of a mostly reading mix over one connection, recording each latency """
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(count):
+        choice = random.random()
+        start = time.perf_counter()
+        if choice < 0.5: await request(reader, writer, "GET", "/tasks?limit=50&sort=name")
+        elif choice < 0.7: await request(reader, writer, "GET", f"/search?type=name&term={random.randrange(100)}")
+        elif choice < 0.85:
+            status, task = await request(reader, writer, "POST", "/tasks", {"name": f"Load {i}", "category": ["Work"]})
+            taskIds.append(task["id"])
+        elif taskIds:
+            await request(reader, writer, "PUT", f"/tasks/{random.choice(taskIds)}/done",
+                          {"done": random.random() < 0.5})
+        else: await request(reader, writer, "GET", "/progress")
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def loadTest(host, port, connections, requests):
+    """ Runs concurrent keep-alive clients, returns (requests/sec, sorted latencies) """
+    latencies, taskIds = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, requests // connections, latencies, taskIds)
+                           for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, latencies
+
+
+async def waitForServer(host, port, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            writer = (await asyncio.open_connection(host, port))[1]
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline: raise
+            await asyncio.sleep(0.1)
+
+
+def benchmark(arguments):
+    """ Load tests a running server, or a fresh unsaved one in a separate process when none is given """
+    server = None
+    if arguments.connect is None:
+        server = subprocess.Popen([sys.executable, __file__, "--port", str(arguments.port), "--storage", "memory",
+                                   "serve", "--seed", str(arguments.seed)], stdout=subprocess.DEVNULL)
+        host, port = "127.0.0.1", arguments.port
+    else:
+        host, _, port = arguments.connect.partition(":")
+        port = int(port)
+    try:
+        asyncio.run(waitForServer(host, port))
+        rate, latencies = asyncio.run(loadTest(host, port, arguments.connections, arguments.requests))
+    finally:
+        if server is not None: server.terminate()
+
+    percentile = lambda fraction: latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+    print(f"{len(latencies)} requests over {arguments.connections} connections: {rate:,.0f} requests/sec, "
+          f"p50 {percentile(0.5):.2f} ms, p99 {percentile(0.99):.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Share the to-do list over HTTP/JSON or load test a server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--storage", choices=["pickle", "journal", "binary", "sqlite", "memory"], default="binary",
+                        help="save mode, memory serves an unsaved task list (default: binary)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("serve", help="serve the task list until interrupted")
+    command.add_argument("--seed", type=int, default=0, help="add SEED synthetic tasks first")
+
+    command = commands.add_parser("bench", help="measure requests/sec & latency percentiles")
+    command.add_argument("--connect", metavar="HOST:PORT", help="server to load test, default starts one")
+    command.add_argument("--connections", type=int, default=16)
+    command.add_argument("--requests", type=int, default=20000)
+    command.add_argument("--seed", type=int, default=10000, help="tasks of the started server")
+
+    arguments = parser.parse_args(argv)
+    if arguments.command == "bench": benchmark(arguments)
+    else:
+        try: asyncio.run(serve(arguments.host, arguments.port, arguments.storage, arguments.seed))
+        except KeyboardInterrupt: pass
+        except StorageLockedError as error: sys.exit(str(error))
+
+
+if __name__ == "__main__":
+    main()
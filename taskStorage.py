@@ -0,0 +1,295 @@
+import os
+import pickle
+from itertools import chain, islice
+
+from task import restoreTask, taskFields
+
+try:
+    import fcntl
+except ImportError:  # Windows locks the file's first byte with msvcrt instead
+    fcntl = None
+    import msvcrt
+
+FIRST_PAGE_ROWS = 50  # Task panel rows saved to be shown at launch before the full load
+
+
+def firstPageRows(store):
+    """ Returns field tuples of the rows the next launch starts on, unsearched & in default order """
+    flipped = store.tasksListFlipped
+    segments = reversed(store.segments) if flipped else store.segments
+    tasks = chain.from_iterable(reversed(segment.values()) if flipped else segment.values() for segment in segments)
+    return [taskFields(task) for task in islice(tasks, FIRST_PAGE_ROWS)]
+
+
+def writeFirstPage(rows, pagePath='../persistentSave.page'):
+    """ Saves first task panel rows from firstPageRows, shown by the next launch while it loads """
+    tempPath = pagePath + ".tmp"
+    with open(tempPath, 'wb') as f:
+        pickle.dump(rows, f)
+    os.replace(tempPath, pagePath)
+
+
+def readFirstPage(pagePath='../persistentSave.page'):
+    """ Returns the saved first task panel rows, or no rows if there are none or they can't be read """
+    try:
+        with open(pagePath, 'rb') as f:
+            rows = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError): return []
+    return [restoreTask(*row) if type(row) is tuple else row for row in rows]  # Older pages hold tasks
+
+
+class StorageLockedError(Exception):
+    """ Raised when another process already has the saved tasks open """
+
+
+class StorageLock:
+    """
+    This class holds an exclusive lock on a file next to the save while tasks are loaded, so the
+    application, command line & task server never write the same save from two processes
+    """
+
+    def __init__(self, path):
+        self.path = path  # None for a storage covered by another storage's lock
+        self.file = None
+
+    def acquire(self):
+        """ Locks the save for this process, raises StorageLockedError if another process holds it """
+        if self.file is not None or self.path is None: return
+        f = open(self.path, 'a+')
+        f.seek(0)
+        try:
+            if fcntl is not None: fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else: msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            try: owner = f.read().strip()
+            except OSError: owner = ""  # Windows can't read the locked byte
+            f.close()
+            owner = f" (PID {owner})" if owner else ""
+            raise StorageLockedError(f"The saved tasks are open in another process{owner}, "
+                                     "close it or send changes to its task server") from None
+        f.truncate(0)
+        f.write(str(os.getpid()))
+        f.flush()
+        self.file = f
+
+    def release(self):
+        if self.file is not None: self.file.close()  # Closing the file drops its lock
+        self.file = None
+
+
+class PickleStorage:
+    """
+    This class saves the whole task store to one pickle
+    file every time the application status is saved
+    """
+
+    def __init__(self, snapshotPath='../persistentSave.pkl'):
+        self.snapshotPath = snapshotPath
+        self.snapshotBytes = 0  # Bytes of snapshots written since opened
+        self.lock = StorageLock(os.path.splitext(snapshotPath)[0] + ".lock")  # Held from load until closed
+
+    @property
+    def bytesWritten(self): return self.snapshotBytes
+
+    def load(self, store):
+        """ Loads saved content into task store, returns whether a save was found """
+        self.lock.acquire()
+        data = self.readSnapshot()
+        if data is None: return False
+        store.loadData(data)
+        return True
+
+    def readSnapshot(self):
+        """ Returns saved task store content or None if nothing was saved """
+        if not os.path.exists(self.snapshotPath) or os.path.getsize(self.snapshotPath) == 0: return None
+        with open(self.snapshotPath, 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, store): self.writeSnapshot(store.saveData())
+
+    def writeSnapshot(self, data):
+        """ Saves the whole task store content, a crash while writing leaves the previous save intact """
+        tempPath = self.snapshotPath + ".tmp"
+        with open(tempPath, 'wb') as f:
+            pickle.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+            self.snapshotBytes += f.tell()
+        os.replace(tempPath, self.snapshotPath)
+
+    def captureSnapshot(self, store):
+        """ Returns save data with tasks copied as field tuples, so it can be written while tasks change """
+        data = store.saveData()
+        data["tasks"] = list(map(self.captureFields, data["tasks"]))
+        return data
+
+    captureFields = staticmethod(taskFields)  # Copies a task's slot values for the writer thread
+
+    def writeCapture(self, data):
+        """ Writes save data from captureSnapshot, meant to run on the snapshot writer thread """
+        data["tasks"] = [restoreTask(*fields) for fields in data["tasks"]]
+        self.writeSnapshot(data)
+
+    def close(self, store):
+        self.save(store)
+        self.closeFiles()
+
+    def closeFiles(self):
+        """ Releases open save files & the lock, the snapshot file is only open while writing """
+        self.lock.release()
+
+    def clear(self):
+        """ Deletes all saved content """
+        if os.path.exists(self.snapshotPath): os.remove(self.snapshotPath)
+
+
+class JournalStorage(PickleStorage):
+    """
+    This class appends every task store mutation to a write-ahead
+    journal & only rewrites the whole pickle snapshot on compaction
+    """
+
+    def __init__(self, snapshotPath='../persistentSave.pkl',
+                 journalPath='../persistentSave.journal', compactEvery=1000):
+        super().__init__(snapshotPath)
+        self.journalPath = journalPath
+        self.oldJournalPath = journalPath + ".old"  # Journal rotated out by a snapshot still being written
+        self.compactEvery = compactEvery  # Journal records kept before compacting, None to never compact
+        self.journalFile = None
+        self.recordCount = 0
+        self.generation = 0  # Snapshot the journal records apply to
+        self.store = None
+        self.journalBytes = 0  # Bytes of journal records written since opened
+
+    @property
+    def bytesWritten(self): return self.snapshotBytes + self.journalBytes
+
+    def load(self, store):
+        """ Loads snapshot & replays journal tail, returns whether a save was found """
+        self.lock.acquire()
+        data = self.readSnapshot()
+        found = data is not None
+        if found:
+            store.loadData(data)
+            self.generation = data.get("journalGeneration", 0)
+
+        # A snapshot that never finished writing is rebuilt from the journal it rotated out
+        recovered = self.replayJournal(store, self.oldJournalPath, self.generation) is not None
+        validSize = self.replayJournal(store, self.journalPath, self.generation + recovered) or 0
+        found = found or self.recordCount > 0
+
+        self.attach(store, validSize)
+        if recovered: self.save(store)
+        elif os.path.exists(self.oldJournalPath): os.remove(self.oldJournalPath)
+        return found
+
+    def replayJournal(self, store, journalPath, generation):
+        """
+        Replays every complete record of a journal continuing the snapshot of generation, a torn
+        final record is dropped. Returns the journal's valid size, None if it doesn't apply.
+        """
+        validSize = None
+        if not os.path.exists(journalPath): return validSize
+        with open(journalPath, 'rb') as f:
+            while True:
+                try: action, args = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError, IndexError): break
+
+                # Journal left over from before the latest compaction is already in snapshot
+                if action == "generation":
+                    if args[0] != generation: break
+                else:
+                    store.replay(action, *args)
+                    self.recordCount += 1
+                validSize = f.tell()
+        return validSize
+
+    def attach(self, store, validSize=0):
+        """ Starts journaling mutations of task store """
+        self.lock.acquire()
+        if self.store is not None: self.store.removeObserver(self.record)
+        self.store = store
+        if self.journalFile is None: self.journalFile = open(self.journalPath, 'ab')
+        self.journalFile.truncate(validSize)
+        if validSize == 0: self.startJournal()
+        store.addObserver(self.record)
+
+    def startJournal(self):
+        """ Empties journal & marks which snapshot its records apply to """
+        self.journalFile.truncate(0)
+        pickle.dump(("generation", (self.generation,)), self.journalFile)
+        self.journalFile.flush()
+        self.recordCount = 0
+
+    def record(self, action, *args):
+        """ Appends one mutation to the journal """
+        record = pickle.dumps((action, args))
+        self.journalFile.write(record)
+        self.journalFile.flush()
+        self.journalBytes += len(record)
+        self.recordCount += 1
+        if self.compactEvery is not None and self.recordCount >= self.compactEvery: self.save(self.store)
+
+    def save(self, store):
+        """ Compacts journal into a new snapshot """
+        if self.store is not store or self.journalFile is None: self.attach(store)
+        self.generation += 1
+        data = store.saveData()
+        data["journalGeneration"] = self.generation
+        self.writeSnapshot(data)
+        self.startJournal()
+        if os.path.exists(self.oldJournalPath): os.remove(self.oldJournalPath)
+
+    def captureSnapshot(self, store):
+        """
+        Copies store content for the next snapshot & rotates the journal, the rotated
+        journal is kept until writeCapture has the snapshot on disk
+        """
+        if self.store is not store or self.journalFile is None: self.attach(store)
+
+        # A rotated journal whose snapshot failed to write can't be replaced, compacts right away instead
+        if os.path.exists(self.oldJournalPath):
+            self.save(store)
+            return None
+
+        self.generation += 1
+        data = super().captureSnapshot(store)
+        data["journalGeneration"] = self.generation
+        self.journalFile.close()
+        os.replace(self.journalPath, self.oldJournalPath)
+        self.journalFile = open(self.journalPath, 'ab')
+        self.startJournal()
+        return data
+
+    def writeCapture(self, data):
+        super().writeCapture(data)
+        os.remove(self.oldJournalPath)
+
+    def close(self, store):
+        """ Journal is already up to date, only needs to be closed """
+        self.closeFiles()
+
+    def closeFiles(self):
+        if self.journalFile is not None: self.journalFile.close()
+        self.journalFile = None
+        super().closeFiles()
+
+    def clear(self):
+        """ Deletes all saved content & starts an empty journal """
+        super().clear()
+        self.generation = 0
+        if os.path.exists(self.oldJournalPath): os.remove(self.oldJournalPath)
+        if self.journalFile is not None: self.startJournal()
+
+
+def openStorage(mode):
+    """ Creates storage backend for "pickle", "journal", "binary" or "sqlite" save mode """
+    if mode == "pickle": return PickleStorage()
+    if mode == "journal": return JournalStorage()
+    if mode == "binary":
+        from binarySnapshot import BinaryStorage
+        return BinaryStorage()
+    if mode == "sqlite":
+        from sqliteStorage import SqliteStorage
+        return SqliteStorage()
+    raise ValueError(f"Unknown storage mode: {mode}")
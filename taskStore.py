@@ -0,0 +1,339 @@
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from itertools import chain
+
+from progressRollup import UNKNOWN_YEAR, ProgressRollup
+from task import SLOTS, Task, copyTask
+
+# Each segment's "order" labels are kept around segment rank * ORDER_SPAN, so labels
+# grow outwards from there & moving a task to either end of a segment never renumbers others
+ORDER_SPAN = 1 << 40
+PRIORITY_RANK, NORMAL_RANK, DONE_RANK = 0, 1, 2
+
+
+class TaskStore:
+    """
+    This class owns the to-do list's tasks and their default ordering
+    without depending on Tkinter, so any interface can drive it
+    """
+
+    def __init__(self):
+        """ Create an empty task store """
+        # Default order is the priority, normal, then done segment, each mapping task ID -> task
+        self.segments = (OrderedDict(), OrderedDict(), OrderedDict())
+        self.tasksById = {}  # Stable task ID -> task
+        self.rowIds = []  # Task panel row -> stable task ID
+        self.progress = ProgressRollup()  # Counts user actions in managing tasks
+        self.tasksListFlipped = False
+        self.nextTaskId = 0
+        self.observers = []  # Called with every mutation, e.g. to persist it
+        self.trackProgress = True  # Disabled while replaying recorded mutations
+        self.pending = None  # Mutations of the batch in progress, sent as one "batch" notification
+        self.pendingProgress = Counter()  # User actions of the batch in progress, recorded together
+        self.undoLog = None  # Receives the inverse of every mutation in replay format while a list
+
+    def __len__(self): return len(self.tasksById)
+
+    @property
+    def topDoneIndex(self):
+        """ Default order index of topmost completed task """
+        return len(self.segments[PRIORITY_RANK]) + len(self.segments[NORMAL_RANK])
+
+    @property
+    def bottomPriorityIndex(self):
+        """ Default order index below the bottom most prioritized task """
+        return len(self.segments[PRIORITY_RANK])
+
+    # ============== Mutation Observers ==============
+
+    def addObserver(self, observer):
+        """ Registers a callback that receives (action, *args) for every mutation """
+        self.observers.append(observer)
+
+    def removeObserver(self, observer):
+        if observer in self.observers: self.observers.remove(observer)
+
+    def notify(self, action, *args):
+        if self.pending is not None: self.pending.append((action, *args))
+        else:
+            for observer in self.observers: observer(action, *args)
+
+    @contextmanager
+    def batched(self):
+        """
+        Collects mutations made inside into one "batch" notification of (action, *args) mutations,
+        so observers persist & repaint them once. User actions are recorded as one progress count each.
+        """
+        if self.pending is not None:
+            yield
+            return
+        self.pending = []
+        try: yield
+        finally:
+            for action, count in self.pendingProgress.items():
+                self.pending.append(("progress", *self.progress.record(action, amount=count), count))
+            mutations, self.pending = self.pending, None
+            self.pendingProgress.clear()
+            if mutations: self.notify("batch", mutations)
+
+    def replay(self, action, *args):
+        """ Re-applies a mutation previously received by an observer """
+        tracking, self.trackProgress = self.trackProgress, False
+        try:
+            if action == "add": self.insertTask(args[0])
+            elif action == "edit": self.editTask(*args)
+            elif action == "delete": self.deleteTask(*args)
+            elif action == "done": self.toggleDone(*args)
+            elif action == "priority": self.togglePriority(*args)
+            elif action == "reminder": self.setReminder(*args)
+            elif action == "restore": self.restoreTasks(*args)
+            elif action == "progress":
+                # Journals written before rollups hold [action, "MM"] entries
+                if len(args) == 1: args = (args[0][0], UNKNOWN_YEAR, int(args[0][1]))
+                self.progress.bump(*args)
+                self.notify("progress", *args)
+            elif action == "flip": self.setFlipped(*args)
+            elif action == "clear": self.clear()
+            elif action == "batch":
+                with self.batched():
+                    for mutation in args[0]: self.replay(*mutation)
+            else: raise ValueError(f"Unknown task store action: {action}")
+        finally: self.trackProgress = tracking
+
+    # ============== Task Lookup ==============
+
+    def getTask(self, taskId):
+        """ Returns task with given stable ID """
+        return self.tasksById[taskId]
+
+    def orderedTasks(self):
+        """ Returns all tasks in default order (priority, normal, then done) """
+        return list(chain.from_iterable(segment.values() for segment in self.segments))
+
+    def taskAtRow(self, row):
+        """ Returns task currently displayed at given task panel row """
+        return self.tasksById[self.rowIds[row]]
+
+    def setRows(self, taskIds):
+        """ Records which task is displayed in each task panel row """
+        self.rowIds = taskIds
+
+    # ============== Task Mutations ==============
+
+    def logInverse(self, action, *args):
+        """ Records the mutation undoing the one about to be made, see UndoHistory """
+        if self.undoLog is not None: self.undoLog.append((action, *args))
+
+    def recordProgress(self, action):
+        """ Stores user action for the progress tracker """
+        if not self.trackProgress: return
+        if self.pending is not None: self.pendingProgress[action] += 1
+        else: self.notify("progress", *self.progress.record(action))
+
+    def setFlipped(self, flipped):
+        """ Stores whether task list is shown in reverse """
+        self.logInverse("flip", self.tasksListFlipped)
+        self.tasksListFlipped = flipped
+        self.notify("flip", flipped)
+
+    def addTask(self, name, deadline, categories, description):
+        """ Creates a new task above the topmost completed task """
+        task = Task(self.nextTaskId, None, name, deadline, categories, int(time.time()), description)
+        self.insertTask(task)
+        self.recordProgress("add")
+        return task
+
+    def insertTask(self, task):
+        """ Inserts an existing task last in its segment, above the topmost completed task if not done """
+        task = Task.fromMapping(task)  # Older journals hold task dicts
+        self.nextTaskId = max(self.nextTaskId, task["id"] + 1)
+        self.tasksById[task["id"]] = task
+        self.pushBack(self.rankOf(task), task)
+        self.logInverse("delete", task["id"])
+        self.notify("add", task)
+        return task
+
+    def editTask(self, taskId, name, deadline, categories, description):
+        """ Updates user editable fields of a task """
+        task = self.tasksById[taskId]
+        self.logInverse("edit", taskId, task.name, task.deadline, list(task.category), task.description)
+        task["name"] = name
+        task["deadline"] = deadline
+        task["category"] = categories
+        task["description"] = description
+        self.notify("edit", taskId, name, deadline, categories, description)
+        return task
+
+    def setReminder(self, taskId, reminder):
+        """ Stores task's reminder time text, None removes it """
+        task = self.tasksById[taskId]
+        self.logInverse("reminder", taskId, task.reminder)
+        task["reminder"] = reminder
+        self.notify("reminder", taskId, reminder)
+        return task
+
+    def deleteTask(self, taskId):
+        """ Deletes task from its segment """
+        task = self.tasksById.pop(taskId)
+        del self.segments[self.rankOf(task)][taskId]
+        self.logInverse("restore", [task])
+        self.notify("delete", taskId)
+        self.recordProgress("delete")
+        return task
+
+    def toggleDone(self, taskId):
+        """
+        Marks task as done & moves it to bottom of task list or marks
+        it as not done & moves it above the topmost completed task
+        """
+        task = self.tasksById[taskId]
+
+        # Prioritized tasks are unprioritized before being marked done
+        if task["priority"]: self.togglePriority(taskId)
+
+        if self.undoLog is not None: self.logInverse("restore", [copyTask(task)])
+        del self.segments[self.rankOf(task)][taskId]
+        task["done"] = not task["done"]
+        self.pushBack(self.rankOf(task), task)
+        self.notify("done", taskId)
+        self.recordProgress("done" if task["done"] else "undone")
+        return task
+
+    def togglePriority(self, taskId):
+        """
+        Prioritizes task & moves it to top of task list or unprioritizes
+        it & moves it below the bottom most prioritized task
+        """
+        task = self.tasksById[taskId]
+
+        # Completed tasks are marked not done before being prioritized
+        if task["done"]: self.toggleDone(taskId)
+
+        if self.undoLog is not None: self.logInverse("restore", [copyTask(task)])
+        del self.segments[self.rankOf(task)][taskId]
+        task["priority"] = not task["priority"]
+        self.pushFront(self.rankOf(task), task)
+        self.notify("priority", taskId)
+        return task
+
+    def restoreTasks(self, tasks):
+        """
+        Puts tasks back with the fields & "order" labels they had, tasks still present are updated
+        in place. Undoes deletes & moves, tasks landing between others re-sort only their segment.
+        """
+        unsortedRanks = set()
+        for task in tasks:
+            current = self.tasksById.get(task.id)
+            if current is None:
+                current = self.tasksById[task.id] = task
+                self.nextTaskId = max(self.nextTaskId, task.id + 1)
+            else:
+                del self.segments[self.rankOf(current)][task.id]
+                for slot in SLOTS: slot.__set__(current, slot.__get__(task))  # Lazy fields stay undecoded
+
+            # Labels outside a segment's first & last label are placed at its ends right away
+            rank = self.rankOf(current)
+            segment = self.segments[rank]
+            if segment and current.order < segment[next(reversed(segment))].order:
+                segment[task.id] = current
+                if current.order < segment[next(iter(segment))].order: segment.move_to_end(task.id, last=False)
+                else: unsortedRanks.add(rank)
+            else: segment[task.id] = current
+
+        for rank in unsortedRanks:
+            segment = self.segments[rank]
+            ordered = sorted(segment.values(), key=lambda x: x.order)
+            segment.clear()
+            segment.update((task.id, task) for task in ordered)
+        self.notify("restore", tasks)
+
+    # ============== Batched Task Mutations ==============
+
+    def deleteTasks(self, taskIds):
+        """ Deletes tasks as one batch """
+        with self.batched(): return [self.deleteTask(taskId) for taskId in taskIds]
+
+    def setDone(self, taskIds, done):
+        """ Marks tasks done or not done as one batch in given order, tasks already so are skipped """
+        with self.batched():
+            return [self.toggleDone(taskId) for taskId in taskIds if self.tasksById[taskId]["done"] != done]
+
+    def setPriority(self, taskIds, priority):
+        """ Prioritizes or unprioritizes tasks as one batch in given order, tasks already so are skipped """
+        with self.batched():
+            return [self.togglePriority(taskId) for taskId in taskIds
+                    if self.tasksById[taskId]["priority"] != priority]
+
+    # ============== Order Segments ==============
+
+    @staticmethod
+    def rankOf(task):
+        """ Returns index of segment holding task """
+        if task.priority: return PRIORITY_RANK
+        return DONE_RANK if task.done else NORMAL_RANK
+
+    def pushFront(self, rank, task):
+        """ Puts task first in segment with a label below the current first one """
+        segment = self.segments[rank]
+        task["order"] = segment[next(iter(segment))]["order"] - 1 if segment else rank * ORDER_SPAN
+        segment[task["id"]] = task
+        segment.move_to_end(task["id"], last=False)
+
+    def pushBack(self, rank, task):
+        """ Puts task last in segment with a label above the current last one """
+        segment = self.segments[rank]
+        task["order"] = segment[next(reversed(segment))]["order"] + 1 if segment else rank * ORDER_SPAN
+        segment[task["id"]] = task
+
+    def clear(self):
+        """ Resets store to default status """
+        if self.undoLog is not None:
+            self.logInverse("restore", self.orderedTasks())
+            for year, month, action, count in self.progress.rows():
+                self.logInverse("progress", action, year, month, count)
+            self.logInverse("flip", self.tasksListFlipped)
+        self.segments = (OrderedDict(), OrderedDict(), OrderedDict())
+        self.tasksById = {}
+        self.rowIds = []
+        self.progress = ProgressRollup()
+        self.tasksListFlipped = False
+        self.notify("clear")
+
+    # ============== Save File Conversion ==============
+
+    def loadData(self, data):
+        """
+        Replaces store content with the content of a save file,
+        returns whether task "order" labels had to be renumbered
+        """
+        observers, self.observers = self.observers, []
+        self.clear()
+        self.observers = observers
+        if "progress" in data: self.progress = ProgressRollup.fromData(data["progress"])
+        else: self.progress = ProgressRollup.fromEntries(data.get("progressTracker", []))
+        self.tasksListFlipped = data.get("tasksListFlipped", False)
+
+        # Older saves may hold sorted or flipped tasks without stable IDs, every task is a Task from here on
+        tasks = sorted(map(Task.fromMapping, data["tasks"]), key=lambda x: (self.rankOf(x), x.order))
+        self.nextTaskId = max([data.get("nextTaskId", 0)] + [task.id + 1 for task in tasks if task.id is not None])
+        for task in tasks:
+            if task.id is None or task.id in self.tasksById:
+                task.id = self.nextTaskId
+                self.nextTaskId += 1
+            self.tasksById[task.id] = task
+
+        # Labels are kept when already unique & inside their segment's span, older saves hold row numbers
+        ranks = [self.rankOf(task) for task in tasks]
+        relabel = any(abs(task.order - rank * ORDER_SPAN) >= ORDER_SPAN // 2 for task, rank in zip(tasks, ranks)) \
+            or any(tasks[i].order == tasks[i + 1].order for i in range(len(tasks) - 1))
+        for task, rank in zip(tasks, ranks):
+            if relabel: self.pushBack(rank, task)
+            else: self.segments[rank][task.id] = task
+        return relabel
+
+    def saveData(self):
+        """ Returns store content in save file format """
+        return {"tasks": self.orderedTasks(), "progress": self.progress.toData(),
+                "tasksListFlipped": self.tasksListFlipped, "bottomPriorityIndex": self.bottomPriorityIndex,
+                "topDoneIndex": self.topDoneIndex, "nextTaskId": self.nextTaskId}
@@ -0,0 +1,202 @@
+"""
+Title: To-Do List Command Line
+Description: Manages the to-do list's saved tasks without a display, e.g. from cron jobs & CI
+"""
+
+import argparse
+import sys
+import time
+
+from columnarTasks import TaskColumns
+from deadlineIndex import DEADLINE_RANGES
+from searchIndex import SEARCH_FIELDS
+from sortIndex import SORT_KEYS, SortIndex
+from task import Task, parseDeadline
+from taskExport import exportTasks, readTaskDocument, readTaskLines
+from taskStorage import StorageLockedError, openStorage
+from taskStore import TaskStore
+
+SORT_TYPES = ["default"] + list(SORT_KEYS)
+SEARCH_TYPES = SEARCH_FIELDS + list(DEADLINE_RANGES)
+
+
+def formatTask(task):
+    """ Formats task as one tab separated line """
+    status = "done" if task.done else "priority" if task.priority else "open"
+    return "\t".join([str(task.id), status, task.name, task.deadline, ",".join(task.category), task.description])
+
+
+def reportRate(operation, count, seconds):
+    """ Prints operation count & operations/sec to stderr so listed tasks stay pipeable """
+    print(f"{operation}: {count} operations in {seconds:.3f}s ({count / max(seconds, 1e-9):,.0f} ops/sec)",
+          file=sys.stderr)
+
+
+def checkTaskIds(store, taskIds):
+    """ Exits before anything is changed if a task ID is unknown, so a command changes every task or none """
+    for taskId in taskIds:
+        if taskId not in store.tasksById: raise SystemExit(f"No task with ID {taskId}")
+
+
+def listTasks(store, sortType, flipped, limit=None):
+    sortIndex = SortIndex()
+    sortIndex.rebuild(store)
+    tasks = sortIndex.orderedTasks(sortType, flipped)
+    for task in tasks[:limit]: print(formatTask(task))
+    return len(tasks)
+
+
+# ============== Commands ==============
+
+def addCommand(store, storage, arguments):
+    if arguments.deadline and parseDeadline(arguments.deadline) is None:
+        raise SystemExit("The deadline isn't a real date in the correct format ('YYYY/M/D/H:M').")
+    task = store.addTask(arguments.name, arguments.deadline, arguments.category, arguments.description)
+    print(task.id)
+    return 1
+
+
+def deleteCommand(store, storage, arguments):
+    taskIds = list(dict.fromkeys(arguments.ids))  # A repeated ID is deleted once
+    checkTaskIds(store, taskIds)
+    store.deleteTasks(taskIds)
+    return len(taskIds)
+
+
+def doneCommand(store, storage, arguments):
+    checkTaskIds(store, arguments.ids)
+    with store.batched():
+        for taskId in arguments.ids: store.toggleDone(taskId)
+    return len(arguments.ids)
+
+
+def priorityCommand(store, storage, arguments):
+    checkTaskIds(store, arguments.ids)
+    with store.batched():
+        for taskId in arguments.ids: store.togglePriority(taskId)
+    return len(arguments.ids)
+
+
+def listCommand(store, storage, arguments):
+    return listTasks(store, arguments.sort, arguments.flip, limit=arguments.limit)
+
+
+def searchCommand(store, storage, arguments):
+    """ Filters & sorts task columns, one vectorized scan is cheaper than indexing for a single search """
+    columns = TaskColumns()
+    columns.rebuild(store)
+    if arguments.type in DEADLINE_RANGES:
+        # Deadline ranges list open tasks due in range, narrowed by name like the search bar
+        rows = columns.select(done=False, dueRange=DEADLINE_RANGES[arguments.type](time.time()),
+                              searchType="name", searchTerm=arguments.term)
+    else: rows = columns.select(searchType=arguments.type, searchTerm=arguments.term)
+    taskIds = columns.sortedIds(arguments.sort, rows, arguments.flip)
+    for taskId in taskIds[:arguments.limit]: print(formatTask(store.tasksById[taskId]))
+    return len(taskIds)
+
+
+def queryCommand(storage, arguments):
+    """ Lists or searches straight from a database a page at a time, memory stays flat however many tasks match """
+    searchType, term = getattr(arguments, "type", None), getattr(arguments, "term", "")
+    done = dueRange = None
+    if searchType in DEADLINE_RANGES:
+        searchType, done, dueRange = "name", False, DEADLINE_RANGES[searchType](time.time())
+    count = 0
+    for tasks in storage.queryTaskPages(arguments.sort, arguments.flip, searchType, term, done=done,
+                                        limit=arguments.limit, dueRange=dueRange):
+        for task in tasks: print(formatTask(task))
+        count += len(tasks)
+    return count
+
+
+def importCommand(store, storage, arguments):
+    """ Appends every task of a task list file with new IDs, saved in one transaction """
+    with open(arguments.file, 'r') as f:
+        if f.read(len('{"format"')) == '{"format"':
+            f.seek(0)
+            tasks = readTaskLines(f)[1]
+        else:
+            f.seek(0)
+            tasks = readTaskDocument(f)["tasks"]
+
+        # Observers are skipped so nothing is written per task, the whole store is saved once after
+        observers, store.observers = store.observers, []
+        count = 0
+        try:
+            for task in map(Task.fromMapping, tasks):
+                task.id = store.nextTaskId
+                store.insertTask(task)
+                count += 1
+        finally: store.observers = observers
+    storage.save(store)
+    return count
+
+
+def exportCommand(store, storage, arguments):
+    return exportTasks(store, arguments.file)[0]
+
+
+def buildParser():
+    parser = argparse.ArgumentParser(description="Manage the to-do list's saved tasks without a display")
+    parser.add_argument("--storage", choices=["pickle", "journal", "binary", "sqlite"], default="binary",
+                        help="save mode used by the application (default: binary)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("add", help="add a task & print its ID")
+    command.add_argument("name")
+    command.add_argument("--deadline", default="", help="deadline as YYYY/M/D/H:M")
+    command.add_argument("--category", action="append", default=[], help="category, may be repeated")
+    command.add_argument("--description", default="")
+    command.set_defaults(run=addCommand)
+
+    for name, run, summary in [("delete", deleteCommand, "delete tasks"),
+                               ("done", doneCommand, "mark tasks done or not done"),
+                               ("priority", priorityCommand, "prioritize or unprioritize tasks")]:
+        command = commands.add_parser(name, help=summary)
+        command.add_argument("ids", type=int, nargs="+", metavar="ID")
+        command.set_defaults(run=run)
+
+    for name, run, summary in [("list", listCommand, "list tasks"), ("search", searchCommand, "search tasks")]:
+        command = commands.add_parser(name, help=summary)
+        if name == "search":
+            command.add_argument("type", choices=SEARCH_TYPES)
+            command.add_argument("term", nargs="?", default="")
+        command.add_argument("--sort", choices=SORT_TYPES, default="default")
+        command.add_argument("--flip", action="store_true", help="reverse the order")
+        command.add_argument("--limit", type=int, help="only print the first LIMIT tasks")
+        command.set_defaults(run=run, query=queryCommand)
+
+    command = commands.add_parser("import", help="append tasks from a .jsonl or .json task list")
+    command.add_argument("file")
+    command.set_defaults(run=importCommand)
+
+    command = commands.add_parser("export", help="save tasks as a task list, .json for a single document")
+    command.add_argument("file")
+    command.set_defaults(run=exportCommand)
+    return parser
+
+
+def main(argv=None):
+    arguments = buildParser().parse_args(argv)
+    store = TaskStore()
+    storage = openStorage(arguments.storage)
+
+    # A migrated database answers listing & searching on its own without loading every task
+    if hasattr(arguments, "query") and hasattr(storage, "queryTaskPages") and storage.getMeta("migrated") is not None:
+        try:
+            start = time.perf_counter()
+            reportRate(arguments.command, arguments.query(storage, arguments), time.perf_counter() - start)
+        finally: storage.close(store)
+        return
+    try: storage.load(store)
+    except StorageLockedError as error: raise SystemExit(str(error))
+    try:
+        start = time.perf_counter()
+        try: count = arguments.run(store, storage, arguments)
+        except KeyError as error: raise SystemExit(f"No task with ID {error.args[0]}")
+        reportRate(arguments.command, count, time.perf_counter() - start)
+    finally: storage.close(store)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,10 @@ Last Modified: April 06, 2023
 # ==============================================
 
 # ============== Built-In Module & Package Imports ==============
+import time
+startTime = time.perf_counter()  # Startup benchmark measures from here
+
 import os
-import json
-import pickle
-import re
 import tkinter as tk
 from datetime import datetime
 from tkinter import *
@@ -21,7 +21,22 @@ from tkinter import filedialog, messagebox
 from tkinter.font import Font
 
 # ============== Personal Class Import ==============
+from deadlineIndex import DEADLINE_RANGES, DeadlineIndex
+from listboxReconciler import ListboxReconciler
+from perfMetrics import PerfMetrics
 from progressTracker import ProgressTracker
+from reminderScheduler import REMINDER_FORMAT, ReminderScheduler, snoozedReminder
+from searchIndex import SearchIndex
+from snapshotWriter import SnapshotWriter
+from sortIndex import SortIndex
+from taskExport import exportTasks, importTasks
+from taskStorage import StorageLockedError, firstPageRows, openStorage, readFirstPage, writeFirstPage
+from task import parseDeadline
+from taskStore import TaskStore
+from undoHistory import UndoHistory
+from virtualTaskList import VirtualTaskList
+
+importedTime = time.perf_counter()
 
 # ============== Global Constant Variables ==============
 WHITE_COLOR = "WHITE"  # Can be used to set window(s) bg color
@@ -30,15 +45,26 @@ LIGHT_GREEN_COLOR = "#94FFA6"
 BLUE_COLOR = "#7DE0FF"
 GREY_COLOR = "#555555"
 YELLOW_COLOR = "#F5FF83"
+VIRTUAL_TASK_PANEL = True  # Draws only rows in view instead of one Listbox row per task
+SEARCH_DEBOUNCE_MS = 40  # Keystrokes closer together than this are searched once
+SHIFT_MASK = 0x0001  # Shift bit of a key event's state, Caps Lock has its own bit
+STORAGE_MODE = "binary"  # "pickle" rewrites whole save, "journal" appends changes, "binary" journals into a
+                         # memory-mapped snapshot that decodes descriptions when shown, "sqlite" uses a database
+STARTUP_BENCHMARK = "TODO_STARTUP_BENCHMARK" in os.environ  # Prints startup timings & exits once loaded
 
 # ============== Global Non-Constant Variables ==============
-tasks = []  # Contains all current tasks
-progressTracker = []  # Stores user actions in manging tasks
-filteredTasks = []  # Search bar filtered task list
-tasksListFlipped = False
-
-topDoneIndex = len(tasks)  # Topmost completed task
-bottomPriorityIndex = 0  # Bottom most prioritized task
+store = TaskStore()  # Contains all current tasks, their order & user actions
+storage = openStorage(STORAGE_MODE)  # Persists task changes between application uses
+searchIndex = SearchIndex()  # N-gram posting lists kept in sync with task store
+sortIndex = SortIndex()  # Sorted task orders kept in sync with task store
+deadlineIndex = DeadlineIndex()  # Open tasks sorted by deadline for deadline range searches
+undoHistory = UndoHistory(store)  # Inverse commands of recent user actions, bounded by a memory budget
+filteredTaskIds = None  # Search bar filtered task IDs (None when not searching)
+rankedTaskIds = None  # Fuzzy search results best match first (None when not fuzzy searching)
+pendingSearch = None  # Scheduled search bar repaint
+perfMetrics = PerfMetrics(tclCalls=lambda: tasksPanelRenderer.tclCalls,  # Task panel calls, what operations pay for
+                          bytesWritten=lambda: getattr(storage, "bytesWritten", 0),
+                          extraMetrics={"autosave": lambda: snapshotWriter.metrics()})
 
 # ==============================================
 #                 Functions
@@ -46,8 +72,8 @@ bottomPriorityIndex = 0  # Bottom most prioritized task
 
 # ============== Import & Export Application Save Files ==============
 
-def insertItem(task, index):
-    """ Formats new task item & inserts into task list box """
+def formatTaskRow(task):
+    """ Formats task item as a task list box row & its background color """
 
     # Only adds task name, description, and creation date to task list box view
     name = task['name']
@@ -65,165 +91,142 @@ def insertItem(task, index):
         totalLength = len(name) + len(copyDescription)
         numSpaces = " " * (37 - totalLength)
 
-    # Insert formatted string into listbox
-    tasksPanelView.insert(index, f"  {name}: {copyDescription} {numSpaces} {dateMade.strftime('%d/%m/%y')}")
+    # Formatted string for listbox
+    row = f"  {name}: {copyDescription} {numSpaces} {dateMade.strftime('%d/%m/%y')}"
 
     # Set background color to indicate whether task is done or has priority
-    if task["done"]: tasksPanelView.itemconfig(index, {'bg': LIGHT_GREEN_COLOR})
-    elif task["priority"]: tasksPanelView.itemconfig(index, {'bg': YELLOW_COLOR})
-
-
-def loadSavedFile():
-    """ Loads file saved content back into global variables and lists """
+    if task["done"]: return row, LIGHT_GREEN_COLOR
+    if task["priority"]: return row, YELLOW_COLOR
+    return row, None
 
-    # If application was used previously or saved file is opened by user
-    if os.path.exists('../persistentSave.pkl'):
-        if os.path.getsize('../persistentSave.pkl') > 0:
-            with open('../persistentSave.pkl', 'rb') as f:
-                data = pickle.load(f)
-
-            # Update application status with file saved status
-            global tasks
-            tasks.clear()
-            tasks.extend(data["tasks"])
-
-            global progressTracker
-            progressTracker.clear()
-            progressTracker.extend(data["progressTracker"])
 
-            global tasksPanelView
-            tasksPanelView.delete(0, tk.END)
-
-            global tasksListFlipped
-            tasksListFlipped = data["tasksListFlipped"]
+def refreshTasksPanelView():
+    """
+    Updates task list box to show sorted & filtered tasks,
+    only changed rows are sent to the listbox
+    """
+    store.setRows(tasksPanelRenderer.render(viewTasks()))
 
-            global topDoneIndex
-            topDoneIndex = data["topDoneIndex"]
 
-            global bottomPriorityIndex
-            bottomPriorityIndex = data["bottomPriorityIndex"]
+def resetTasksPanelView():
+    """ Makes the next refresh redraw every row, the store was reloaded without notifying observers """
+    if not VIRTUAL_TASK_PANEL: tasksPanelRenderer.reset()  # The virtual task panel redraws every render anyway
 
-            # Show new status of application and task panel view
-            for index, task in enumerate(tasks): insertItem(task, index)
 
+@perfMetrics.timed("loadSavedFile")
+def loadSavedFile():
+    """ Loads saved snapshot & journaled changes back into task store """
 
+    # If application was used previously or saved file is opened by user
+    found = storage.load(store)
+    undoHistory.clear()  # Nothing loaded can be undone
+    resetTasksPanelView()  # Loaded tasks may reuse IDs of the first page rows shown while loading
+    snapshotWriter.attach(store)  # Autosaves changes from now on
+    searchIndex.rebuild(store)
+    sortIndex.rebuild(store)
+    deadlineIndex.rebuild(store)
+    reminderScheduler.rebuild(store)  # Reminders missed while closed fire together right away
+    root.after(1, warmSearchIndex)
+    if found:
+        # Show new status of application and task panel view
+        refreshTasksPanelView()
+
+
+def warmSearchIndex():
+    """ Indexes search bar fields a chunk at a time while application is idle, lazily loaded ones once searched """
+    fields = [field for field in searchIndex.buildPositions if field not in getattr(storage, "lazyFields", ())]
+    if fields:
+        searchIndex.buildStep(fields[0])
+        root.after(1, warmSearchIndex)
+
+
+@perfMetrics.timed("updatePersistentFile")
 def updatePersistentFile():
-    """ Save primary status of application to persistent pickle file """
-    with open('../persistentSave.pkl', 'wb') as f:
-        data = {"tasks": tasks, "progressTracker": progressTracker,
-                "tasksListFlipped": tasksListFlipped, "bottomPriorityIndex": bottomPriorityIndex,
-                "topDoneIndex": topDoneIndex}
-        pickle.dump(data, f)
+    """ Save primary status of application to persistent snapshot file """
+    snapshotWriter.save()
+    saveFirstPage()
 
 
-def clearAll():
-    """ Reset application to default status """
+def saveFirstPage():
+    """ Saves the rows the next launch starts on, autosaves refresh them too """
+    writeFirstPage(firstPageRows(store))
 
-    global topDoneIndex
-    topDoneIndex = 0
 
-    global bottomPriorityIndex
-    bottomPriorityIndex = 0
+def showFirstPage():
+    """ Shows task panel rows saved by the last session until the full load replaces them """
+    tasksPanelRenderer.render(readFirstPage())
 
-    global progressTracker
-    progressTracker = []
 
-    global tasks
-    tasks = []
+def reportStartup(stage, reachedTime=None):
+    """ Prints seconds from launch until stage was reached (now if None) for the startup benchmark """
+    if STARTUP_BENCHMARK: print(f"{stage} {(reachedTime or time.perf_counter()) - startTime:.4f}", flush=True)
 
-    global tasksPanelView
-    tasksPanelView.delete(0, END)
 
-    global filteredTasks
-    filteredTasks = []
+def clearAll():
+    """ Reset application to default status, which can be undone """
 
-    global tasksListFlipped
-    tasksListFlipped = False
+    with undoHistory.recording("Clear All"): store.clear()
 
-    # Also deletes the persistent file
-    if os.path.exists('../persistentSave.pkl'): os.remove(
-        '../persistentSave.pkl')
+    global filteredTaskIds, rankedTaskIds
+    filteredTaskIds = rankedTaskIds = None
+    refreshTasksPanelView()
+
+    # Persistent files are emptied by autosave, cleared tasks stay undoable until later actions outgrow the history
+    writeFirstPage([])
 
 
 def saveTaskList():
     """
-    Saves task list as a json file to allow easier
-    readability & computer transferences
+    Saves task list as a line-delimited or single document json file
+    to allow easier readability & computer transferences
     """
 
-    filePath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+    filePath = filedialog.asksaveasfilename(defaultextension=".jsonl", filetypes=[
+        ("JSON Lines Files", "*.jsonl"), ("JSON Files", "*.json")])
     if filePath:
-        with open(filePath, 'w') as f:
-
-            # Convert datetime objects to strings
-            for task in tasks: task["creation date"] = task["creation date"].strftime('%Y-%m-%d %H:%M:%S')
-
-            # Save application status variables to file
-            data = {"tasks": tasks, "progressTracker": progressTracker,
-                    "tasksListFlipped": tasksListFlipped, "bottomPriorityIndex": bottomPriorityIndex,
-                    "topDoneIndex": topDoneIndex}
-            json.dump(data, f)
+        # Tasks are written one at a time without converting live tasks
+        count, rate = exportTasks(store, filePath)
 
         # Alert user of a successful save
-        messagebox.showinfo("Save To-Do List", "Your To-Do List Was Successfully Saved")
+        messagebox.showinfo("Save To-Do List", f"Your To-Do List Was Successfully Saved\n"
+                                               f"({count} tasks, {rate:,.0f} tasks/sec)")
 
 
 def openTaskList():
     """ Open and load user selected json saved task list to application """
 
-    filePath = filedialog.askopenfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+    filePath = filedialog.askopenfilename(defaultextension=".jsonl", filetypes=[
+        ("JSON Lines Files", "*.jsonl"), ("JSON Files", "*.json")])
     if filePath:
-        with open(filePath, 'r') as f:
-            data = json.load(f)
-
-        global tasksListFlipped
-        tasksListFlipped = data["tasksListFlipped"]
-
-        global topDoneIndex
-        topDoneIndex = data["topDoneIndex"]
-
-        global bottomPriorityIndex
-        bottomPriorityIndex = data["bottomPriorityIndex"]
-
-        global progressTracker
-        progressTracker.clear()
-        progressTracker.extend(data["progressTracker"])
-
-        global tasks
-        tasks.clear()
-        tasks.extend(data["tasks"])
-
-        # Convert strings back to datetime objects
-        for task in tasks: task["creation date"] = datetime.strptime(task["creation date"], '%Y-%m-%d %H:%M:%S')
-
-        # Load saved task list to application & alert user
+        count, rate = importTasks(store, filePath)
+        undoHistory.clear()  # Opened task list replaced every task
+        resetTasksPanelView()
+        searchIndex.rebuild(store)
+        sortIndex.rebuild(store)
+        deadlineIndex.rebuild(store)
+        reminderScheduler.rebuild(store)
+        root.after(1, warmSearchIndex)
+
+        # Save loaded task list as new snapshot, show it & alert user
         updatePersistentFile()
-        loadSavedFile()
-        messagebox.showinfo("Open To-Do List", "Your To-Do List Was Opened successfully")
+        refreshTasksPanelView()
+        messagebox.showinfo("Open To-Do List", f"Your To-Do List Was Opened successfully\n"
+                                               f"({count} tasks, {rate:,.0f} tasks/sec)")
 
 
 def onClosing():
     """ Save application status for next time window is reopened """
-    updatePersistentFile()
+    root.withdraw()  # Window disappears right away while the last changes are written
+    snapshotWriter.close(store)
+    saveFirstPage()
     root.destroy()
 
 # ============== Related To Main Window’s Bottom Buttons ==============
 
-def priorTaskOccurrences(selectedTaskIndex, selectedTaskValue):
-    """
-    Counts and returns the number of times a task with exact
-    name was found before currently selected task
-    """
-    count = 0
-    for i in range(selectedTaskIndex):
-        currentTaskValue = tasksPanelView.get(i)[2:2 + len(selectedTaskValue)]
-        if currentTaskValue == selectedTaskValue: count += 1
-    return count
-
-
 def addNewTask():
     """ Opens a new window that lets you enter and save info for new task """
 
+    @perfMetrics.timed("addTask")
     def submit():
         """ Saves user entered values & updates main window's status """
 
@@ -234,35 +237,16 @@ def addNewTask():
 
         # Ensure correct date format entered for deadline before saving user inputs
         deadline = deadlineEntry.get()
-        deadlinePattern = re.compile(r'\d{4}/\d{1,2}/\d{1,2}/\d{1,2}:\d{1,2}')
-        if deadline == "" or deadlinePattern.fullmatch(deadline):
+        if deadline == "" or parseDeadline(deadline) is not None:
             # Save user inputs to tasks list
             categories = [category for category, wasSelected in categoryVars.items() if wasSelected.get()]
-            creationDate = datetime.now()
             summary = descriptionEntry.get("1.0", "end-1c")
-            done = False
-            prioritize = False
-            reminder = None
-            global topDoneIndex
-
-            tasks.insert(topDoneIndex, {
-                "order": topDoneIndex,
-                "name": name,
-                "deadline": deadline,
-                "category": categories,
-                "creation date": creationDate,
-                "description": summary,
-                "done": done,
-                "priority": prioritize,
-                "reminder": reminder
-            })
-
-            # Update remaining main window's status variables
-            insertItem(tasks[topDoneIndex], topDoneIndex)
-            progressTracker.append(["add", datetime.now().strftime('%m')])
-            topDoneIndex += 1
+            with undoHistory.recording("Add Task"): store.addTask(name, deadline, categories, summary)
+
+            # Update task panel view
+            refreshTasksPanelView()
             top.destroy()
-        else: messagebox.showerror("Error", "The deadline isn't in the correct format ('YYYY/M/D/H:M').")
+        else: messagebox.showerror("Error", "The deadline isn't a real date in the correct format ('YYYY/M/D/H:M').")
 
     # New temporary add task window
     top = Toplevel()
@@ -334,55 +318,38 @@ def addNewTask():
     submitButton.pack(pady=20)
 
 
-def deleteTask():
-    """ Deletes selected task from list of tasks """
+def selectedTaskIds():
+    """ Returns IDs of tasks selected in task list panel, in row order """
+    return [store.rowIds[row] for row in tasksPanelView.curselection()]
 
-    global topDoneIndex
-    global bottomPriorityIndex
 
-    # If something is selected in task list panel, delete it
-    selection = tasksPanelView.curselection()
-    if selection:
+def selectAllResults(*args):
+    """ Selects every task shown in task list panel, i.e. all search results while searching """
+    tasksPanelView.selection_set(0, END)
+    tasksPanelView.focus_set()  # Panel deselects tasks once it loses focus
+    taskSelected(None)
+    return "break"
 
-        # Find where that selected item is in the task list
-        # This approach is useful when using the search bar to delete
-        index = selection[0]
-        value = tasksPanelView.get(index)
-        value = value[2:value.rfind(':')]
-        occurrence = priorTaskOccurrences(index, value)
-
-        taskIndex = None
-        count = 0
-        for item in tasks:
-            if item["name"] == value:
-                if count == occurrence:
-                    taskIndex = tasks.index(item)  # Found task index in task list
-                    tasks.remove(item)  # Remove task from task list
-                    break
-                count += 1
-
-        # Update other application status variables
-        tasksPanelView.delete(index)
-        progressTracker.append(["delete", datetime.now().strftime('%m')])
-        if index <= topDoneIndex: topDoneIndex -= 1
-        if index < bottomPriorityIndex > 0: bottomPriorityIndex -= 1
-        for i in range(taskIndex, len(tasks)): tasks[i]["order"] -= 1
-
-        # If all tasks are deleted
-        if not tasks:
-            topDoneIndex = len(tasks)
-            bottomPriorityIndex = 0
 
+@perfMetrics.timed("deleteTask")
+def deleteTask():
+    """ Deletes selected tasks from list of tasks """
 
-def markTaskDoneOrUndone():
-    """ Marks or unmarks selected task from list of tasks as done """
+    # If something is selected in task list panel, delete it all in one batch
+    # Row to task ID lookup also works when using the search bar to delete
+    taskIds = selectedTaskIds()
+    if taskIds:
+        with undoHistory.recording("Delete"): store.deleteTasks(taskIds)
+        refreshTasksPanelView()
 
-    global topDoneIndex
-    global bottomPriorityIndex
+
+@perfMetrics.timed("markTaskDoneOrUndone")
+def markTaskDoneOrUndone():
+    """ Marks or unmarks selected tasks from list of tasks as done """
 
     # If something is selected in task list panel, mark/unmark done
-    selection = tasksPanelView.curselection()
-    if selection:
+    taskIds = selectedTaskIds()
+    if taskIds:
 
         # Don't let user mark/unmark done while using search bar
         searchTerm = entryVar.get().lower()
@@ -396,60 +363,29 @@ def markTaskDoneOrUndone():
         if sortVar.get().lower() != "default":
             messagebox.showerror("Error", '"Sort By" Must be Set To Default.')
             return
-        if tasksListFlipped:
+        if store.tasksListFlipped:
             messagebox.showerror("Error", "Tasks Must Not Be Flipped.")
             return
 
-        # If selected task is prioritized, unprioritize it
-        index = selection[0]
-        if tasks[index]["priority"]:
-            prioritizeOrUnprioritizeTask()
-            index = bottomPriorityIndex
-
-        task = tasks.pop(index)
-        task["done"] = not task["done"]
-
-        # Mark selected task as done and move to bottom of task list
-        if task["done"]:
-            topDoneIndex -= 1
-            tasks.append(task)
-            tasksPanelView.delete(index)
-
-            # Update task panel & give task green color to indicate it's done
-            insertItem(task, END)
-            tasksPanelView.itemconfig(END, {'bg': LIGHT_GREEN_COLOR})
-
-            # Update other application status variables
-            progressTracker.append(["done", datetime.now().strftime('%m')])
-            for i in range(index, len(tasks)): tasks[i]["order"] -= 1
-            tasks[len(tasks) - 1]["order"] = len(tasks) - 1
-
-        # Mark selected task as not done & move it above highest done task
-        else:
-            tasks.insert(topDoneIndex, task)
-            tasksPanelView.delete(index)
-            insertItem(task, topDoneIndex)
-
-            # Update other application status variables
-            progressTracker.append(["undone", datetime.now().strftime('%m')])
-            topDoneIndex += 1
-            for i in range(topDoneIndex, len(tasks)): tasks[i]["order"] += 1
-            tasks[topDoneIndex - 1]["order"] = topDoneIndex - 1
-
-            # Return to default statuses
-            markTaskDoneOrUndone.config(text="Mark Done", bg=LIGHT_GREEN_COLOR)
+        # Done tasks move to bottom of task list, undone tasks above highest done task
+        # Prioritized tasks are unprioritized first by the task store
+        # Selected tasks are all marked done unless every one already is
+        done = not all(store.getTask(taskId)["done"] for taskId in taskIds)
+        with undoHistory.recording("Mark Done" if done else "Mark Not Done"): store.setDone(taskIds, done)
+        refreshTasksPanelView()
+
+        # Return to default statuses
+        if not done: markDoneOrUndoneButton.config(text="Mark Done", bg=LIGHT_GREEN_COLOR)
         tasksPanelView.selection_clear(0, END)
 
 
+@perfMetrics.timed("prioritizeOrUnprioritizeTask")
 def prioritizeOrUnprioritizeTask():
-    """ Prioritizes or unprioritizes selected task """
-
-    global bottomPriorityIndex
-    global topDoneIndex
+    """ Prioritizes or unprioritizes selected tasks """
 
     # If something is selected in task list panel, prioritize/unprioritize it
-    selection = tasksPanelView.curselection()
-    if selection:
+    taskIds = selectedTaskIds()
+    if taskIds:
 
         # Don't let user prioritize/unprioritize while using search bar
         searchTerm = entryVar.get().lower()
@@ -463,46 +399,19 @@ def prioritizeOrUnprioritizeTask():
         if sortVar.get().lower() != "default":
             messagebox.showerror("Error", '"Sort By" Must be Set To Default.')
             return
-        if tasksListFlipped:
+        if store.tasksListFlipped:
             messagebox.showerror("Error", "Tasks Must Not Be Flipped.")
             return
 
-        # If selected task is marked as done, unmark it
-        index = selection[0]
-        if tasks[index]["done"]:
-            markTaskDoneOrUndone()
-            index = topDoneIndex - 1
-
-        task = tasks.pop(index)
-        task["priority"] = not task["priority"]
-
-        # Mark selected task as priority and move to top of task list
-        if task["priority"]:
-            bottomPriorityIndex += 1
-            tasks.insert(0, task)
-            tasksPanelView.delete(index)
-
-            # Update task panel & give task yellow color to indicate it's a priority
-            insertItem(task, 0)
-            tasksPanelView.itemconfig(0, {'bg': YELLOW_COLOR})
-
-            # Update other application status variables
-            for i in range(1, index + 1): tasks[i]["order"] += 1
-            tasks[0]["order"] = 0
-
-        # Mark selected task as normal & move it below lowest priority task
-        else:
-            bottomPriorityIndex -= 1
-            tasks.insert(bottomPriorityIndex, task)
-            tasksPanelView.delete(index)
-            insertItem(task, bottomPriorityIndex)
-
-            # Update other application status variables
-            for i in range(bottomPriorityIndex + 1, len(tasks)): tasks[i]["order"] -= 1
-            tasks[bottomPriorityIndex]["order"] = bottomPriorityIndex
-
-            # Return to default statuses
-            prioritizeOrUnprioritizeButton.config(text="Prioritize", bg=LIGHT_GREEN_COLOR)
+        # Prioritized tasks move to top of task list, normal tasks below lowest priority task
+        # Done tasks are marked as not done first by the task store
+        # Selected tasks are all prioritized unless every one already is
+        priority = not all(store.getTask(taskId)["priority"] for taskId in taskIds)
+        with undoHistory.recording("Prioritize" if priority else "De-Prioritize"): store.setPriority(taskIds, priority)
+        refreshTasksPanelView()
+
+        # Return to default statuses
+        if not priority: prioritizeOrUnprioritizeButton.config(text="Prioritize", bg=LIGHT_GREEN_COLOR)
         tasksPanelView.selection_clear(0, END)
 
 
@@ -513,46 +422,26 @@ def setTaskReminder():
     selection = tasksPanelView.curselection()
     if selection:
 
-        # Only need task name
-        index = selection[0]
-        value = tasksPanelView.get(index)
-        taskName = value[2:value.rfind(':')]
+        # Only need task name & ID
+        task = store.taskAtRow(selection[0])
+        taskName = task["name"]
 
         def setReminder():
-            """ Sets reminder for user selected task """
+            """ Stores reminder for user selected task, reminder scheduler keeps track of it """
 
             # Ensure imputed reminder time is entered correctly
             reminderTime = reminderEntry.get()
             try:
-                reminderDatetime = datetime.strptime(reminderTime, '%Y-%m-%d %H:%M')
+                reminderDatetime = datetime.strptime(reminderTime, REMINDER_FORMAT)
 
                 # Ensure inputted reminder time occurs in future
-                currentTime = datetime.now()
-                timeDifference = (reminderDatetime - currentTime).total_seconds() * 1000
-                if timeDifference > 0:
-                    root.after(int(timeDifference), showReminder)
+                if reminderDatetime > datetime.now():
+                    with undoHistory.recording("Set Reminder"):
+                        store.setReminder(task["id"], reminderDatetime.strftime(REMINDER_FORMAT))
                     reminderWindow.destroy()
                 else: messagebox.showerror("Error", "The reminder time must be in the future.")
             except ValueError: messagebox.showerror("Error", "Invalid format. Please enter as 'YYYY-MM-DD HH:MM'.")
 
-        def showReminder():
-            """ Create reminder window when inputted reminder time arrives """
-            reminderAlertWindow = Toplevel()
-            reminderAlertWindow.title(f"Reminder: {taskName.title()}")
-            reminderAlertWindow.geometry("400x100")
-            reminderAlertWindow.configure(bg=WHITE_COLOR)
-            Label(reminderAlertWindow, text=f'It\'s Time For "{taskName.title()}"!!!', bg=WHITE_COLOR).pack(pady=10)
-
-            def dismiss(): reminderAlertWindow.destroy()
-            def snooze():
-                reminderAlertWindow.destroy()
-                root.after(300000, showReminder)  # 5 minute snooze
-
-            buttonFrame = Frame(reminderAlertWindow, bg=WHITE_COLOR)
-            Button(buttonFrame, text="Snooze", command=snooze, bg=YELLOW_COLOR).pack(side=LEFT, padx=5)
-            Button(buttonFrame, text="Dismiss", command=dismiss, bg=RED_COLOR).pack(side=LEFT, padx=5)
-            buttonFrame.pack(pady=10)
-
         # New temporary set task reminder window
         reminderWindow = Toplevel()
         reminderWindow.title("Set Reminder")
@@ -573,31 +462,94 @@ def setTaskReminder():
         buttonFrame.pack(pady=10)
     else: messagebox.showerror("Error", "Please select a task from the list.")
 
+def showReminders(taskIds):
+    """ Creates one reminder window for every reminder that came due at once """
+    tasks = [store.getTask(taskId) for taskId in taskIds]
+    names = [task["name"].title() for task in tasks]
+
+    reminderAlertWindow = Toplevel()
+    reminderAlertWindow.configure(bg=WHITE_COLOR)
+    if len(tasks) == 1:
+        reminderAlertWindow.title(f"Reminder: {names[0]}")
+        reminderAlertWindow.geometry("400x100")
+        Label(reminderAlertWindow, text=f'It\'s Time For "{names[0]}"!!!', bg=WHITE_COLOR).pack(pady=10)
+    else:
+        # Reminders missed while application was closed are listed together
+        reminderAlertWindow.title(f"{len(tasks)} Reminders")
+        reminderAlertWindow.geometry("400x250")
+        shownNames = "\n".join(names[:8]) + (f"\n... And {len(names) - 8} More" if len(names) > 8 else "")
+        Label(reminderAlertWindow, text=f"It's Time For:\n{shownNames}", bg=WHITE_COLOR).pack(pady=10)
+
+    def dismiss():
+        reminderAlertWindow.destroy()
+        with undoHistory.recording("Dismiss Reminder"):
+            for task in tasks:
+                if task["id"] in store.tasksById: store.setReminder(task["id"], None)
+    def snooze():
+        reminderAlertWindow.destroy()
+        reminder = snoozedReminder()  # 5 minute snooze
+        with undoHistory.recording("Snooze Reminder"):
+            for task in tasks:
+                if task["id"] in store.tasksById: store.setReminder(task["id"], reminder)
+
+    buttonFrame = Frame(reminderAlertWindow, bg=WHITE_COLOR)
+    Button(buttonFrame, text="Snooze", command=snooze, bg=YELLOW_COLOR).pack(side=LEFT, padx=5)
+    Button(buttonFrame, text="Dismiss", command=dismiss, bg=RED_COLOR).pack(side=LEFT, padx=5)
+    buttonFrame.pack(pady=10)
+    reminderAlertWindow.protocol("WM_DELETE_WINDOW", dismiss)  # Closing the alert acknowledges it too
+
+def showPerformance():
+    """ Opens a window with operation latencies, Tcl calls, bytes persisted & slow action captures """
+    performanceWindow = Toplevel()
+    performanceWindow.title("Performance")
+    performanceWindow.configure(bg=WHITE_COLOR)
+    report = Text(performanceWindow, width=95, height=25, font=("Courier", 10), bg=WHITE_COLOR)
+    report.pack(padx=10, pady=10)
+    statusLabel = Label(performanceWindow, text="Latencies In Milliseconds", bg=WHITE_COLOR)
+    statusLabel.pack()
+
+    def refresh():
+        autosave = snapshotWriter.metrics()
+        latency = autosave["median save latency"]
+        lines = [perfMetrics.formatTable(), "",
+                 f"Autosave: {autosave['saves']} saves, {autosave['queue depth']} changes not saved yet, "
+                 f"median latency {'-' if latency is None else f'{latency * 1000:.2f}'}"]
+        for capture in reversed(perfMetrics.captures):
+            lines += ["", f"{capture['operation']} took {capture['seconds'] * 1000:.1f} ms at {capture['when']} "
+                          f"({capture['mode']}):", capture["report"]]
+        report.delete("1.0", END)
+        report.insert(END, "\n".join(lines))
+    def export():
+        filePath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+        if filePath: perfMetrics.exportJson(filePath)
+    def profileNext():
+        perfMetrics.captureNext()
+        statusLabel.config(text="The Next Action Will Be Profiled, Refresh Afterwards To See It")
+    def toggleSampling(): perfMetrics.sampleSlowActions(samplingVar.get())
+
+    buttonFrame = Frame(performanceWindow, bg=WHITE_COLOR)
+    Button(buttonFrame, text="Refresh", command=refresh, bg=LIGHT_GREEN_COLOR).pack(side=LEFT, padx=5)
+    Button(buttonFrame, text="Export JSON", command=export, bg=BLUE_COLOR).pack(side=LEFT, padx=5)
+    Button(buttonFrame, text="Profile Next Action", command=profileNext, bg=YELLOW_COLOR).pack(side=LEFT, padx=5)
+    samplingVar = BooleanVar(value=perfMetrics.captureMode == "sample")
+    Checkbutton(buttonFrame, text="Sample Slow Actions", variable=samplingVar, command=toggleSampling,
+                bg=WHITE_COLOR).pack(side=LEFT, padx=5)
+    buttonFrame.pack(pady=10)
+    refresh()
+
 """ Creates task progress graph """
-def viewProgress(): ProgressTracker(progressTracker).show()
+def viewProgress(): ProgressTracker(store.progress).show(root)
 
 # ============== Related To Main Window’s Center & Surrounding Area ==============
 
 def showAndEditInfo(event):
     """ Opens a new window that lets you view and update task info """
 
-    # If something is selected in task list panel, find it task list index
-    # This approach is useful when using the search bar to view/edit tasks
+    # If something is selected in task list panel, find its task
+    # Row to task ID lookup also works when using the search bar to view/edit tasks
     selection = tasksPanelView.curselection()
     if not selection: return
-    index = selection[0]
-    value = tasksPanelView.get(index)
-    value = value[2:value.rfind(':')]
-    occurrence = priorTaskOccurrences(index, value)
-
-    task = None
-    count = 0
-    for item in tasks:
-        if item["name"] == value:
-            if count == occurrence:
-                task = item  # Found task in task list
-                break
-            count += 1
+    task = store.taskAtRow(selection[0])
 
     def save():
         """ Updates user entered values & main window's status """
@@ -609,19 +561,17 @@ def showAndEditInfo(event):
 
         # Ensure correct date format entered for deadline before updating user inputs
         deadline = deadlineEntry.get()
-        deadlinePattern = re.compile(r'\d{4}/\d{1,2}/\d{1,2}/\d{1,2}:\d{1,2}')
-        if deadline == "" or deadlinePattern.fullmatch(deadline):
+        if deadline == "" or parseDeadline(deadline) is not None:
             # Update user selected task with new inputs
-            task["name"] = summary
-            task["deadline"] = deadlineEntry.get()
-            task["category"] = [category for category, var in categoryVars.items() if var.get()]
-            task["description"] = descriptionEntry.get("1.0", "end-1c")
+            with undoHistory.recording("Edit Task"):
+                store.editTask(task["id"], summary, deadline,
+                               [category for category, var in categoryVars.items() if var.get()],
+                               descriptionEntry.get("1.0", "end-1c"))
 
             # Update task panel view
-            tasksPanelView.delete(index)
-            insertItem(task, index)
+            refreshTasksPanelView()
             top.destroy()
-        else: messagebox.showerror("Error", "The deadline isn't in the correct format ('YYYY/M/D/H:M').")
+        else: messagebox.showerror("Error", "The deadline isn't a real date in the correct format ('YYYY/M/D/H:M').")
 
     # New temporary view/edit task window
     top = Toplevel()
@@ -727,21 +677,20 @@ def onWindowClick(event):
 
 
 def taskSelected(event):
-    """ Function to update mark done & prioritize buttons based on selected task """
+    """ Function to update mark done & prioritize buttons based on selected tasks """
 
     # If something is selected in task list panel, check priority & done status
-    selection = tasksPanelView.curselection()
-    if selection:
-        # Get selected task
-        index = selection[0]
-        task = tasks[index]
+    taskIds = selectedTaskIds()
+    if taskIds:
+        # Selected tasks count as done or prioritized only if every one is
+        tasks = [store.getTask(taskId) for taskId in taskIds]
 
         # Invert "Mark Done" button's text and color
-        if task["done"]: markDoneOrUndoneButton.config(text="Mark Not Done", bg=RED_COLOR)
+        if all(task["done"] for task in tasks): markDoneOrUndoneButton.config(text="Mark Not Done", bg=RED_COLOR)
         else: markDoneOrUndoneButton.config(text="Mark Done", bg=LIGHT_GREEN_COLOR)
 
         # Invert "Prioritize" button's text and color
-        if task["priority"]: prioritizeOrUnprioritizeButton.config(text="De-Prioritize", bg=RED_COLOR)
+        if all(task["priority"] for task in tasks): prioritizeOrUnprioritizeButton.config(text="De-Prioritize", bg=RED_COLOR)
         else: prioritizeOrUnprioritizeButton.config(text="Prioritize", bg=LIGHT_GREEN_COLOR)
 
 
@@ -774,59 +723,104 @@ def searchBarFocusOut(event):
         searchTasks()
 
 
+def scheduleSearch(*args):
+    """ Coalesces a burst of search bar keystrokes into one search & repaint """
+
+    global pendingSearch
+    if pendingSearch is not None: root.after_cancel(pendingSearch)
+    pendingSearch = root.after(SEARCH_DEBOUNCE_MS, searchTasks)
+
+
+@perfMetrics.timed("searchTasks")
 def searchTasks(*args):
     """ Filters task list based on user search input """
 
-    global filteredTasks
+    global filteredTaskIds, rankedTaskIds
+    global pendingSearch
+    pendingSearch = None
+    rankedTaskIds = None
     currentSearchTerm = entryVar.get().lower()
     currentSearchType = (searchTypeVar.get()).lower()
-    tasksPanelView.delete(0, END)
 
     # Filter tasks based on search input and type
-    if currentSearchTerm == "" or currentSearchTerm == "search": filteredTasks = tasks  # Not in use search bar shows all tasks
-    elif currentSearchType == "category":
-        filteredTasks = [task for task in tasks if any(currentSearchTerm in element.lower() for element in task["category"])]
-    elif currentSearchType == "creation date":
-        filteredTasks = [task for task in tasks if currentSearchTerm in task[currentSearchType].strftime('%Y/%m/%d/%H:%M')]
-    else: filteredTasks = [task for task in tasks if currentSearchTerm in task[currentSearchType].lower()]
+    searching = currentSearchTerm != "" and currentSearchTerm != "search"
+    if currentSearchType in DEADLINE_RANGES:
+        # Deadline ranges show open tasks due in range, narrowed by name if a term is entered
+        filteredTaskIds = set(deadlineIndex.search(currentSearchType))
+        if searching: filteredTaskIds &= searchIndex.search("name", currentSearchTerm)
+    elif not searching: filteredTaskIds = None  # Not in use search bar shows all tasks
+    elif currentSearchType == "fuzzy":
+        # Fuzzy search shows only the best matches, ranked in default sort order
+        rankedTaskIds = searchIndex.fuzzySearch(currentSearchTerm)
+        filteredTaskIds = set(rankedTaskIds)
+    else: filteredTaskIds = searchIndex.search(currentSearchType, currentSearchTerm)
 
     # Display all filtered tasks to task list panel
-    for task in filteredTasks: insertItem(task, END)
+    refreshTasksPanelView()
+
+
+def viewTasks():
+    """ Returns tasks in "Sort By" order, flipped & filtered by search bar if needed, fuzzy matches rank first """
 
+    if rankedTaskIds is not None and sortVar.get().lower() == "default":
+        tasks = [store.tasksById[taskId] for taskId in rankedTaskIds if taskId in store.tasksById]
+        return tasks[::-1] if store.tasksListFlipped else tasks
+    return sortIndex.orderedTasks(sortVar.get().lower(), store.tasksListFlipped, filteredTaskIds)
 
+
+@perfMetrics.timed("sortTasks")
 def sortTasks():
     """ Sorts list of tasks based on currently selected sorting option """
 
-    currentSortType = sortVar.get().lower()
-    if currentSortType == "name": tasks.sort(key=lambda x: x["name"])
-    elif currentSortType == "deadline": tasks.sort(key=lambda x: x["deadline"])
-    elif currentSortType == "default": tasks.sort(key=lambda x: x["order"])
-    elif currentSortType == "creation date": tasks.sort(key=lambda x: x["creation date"])
-
     # Displays a sorted & search bar filtered list to task list panel
-    tasksPanelView.delete(0, END)
-    taskList = tasks.copy()
-    if filteredTasks: taskList = [task for task in tasks if task in filteredTasks]
-    for task in taskList: insertItem(task, END)
+    refreshTasksPanelView()
 
 
+@perfMetrics.timed("flipSort")
 def flipSort():
     """ Reverses the list of tasks """
 
-    global tasksListFlipped
-    tasksListFlipped = not tasksListFlipped
-    tasks.reverse()
-    tasksPanelView.delete(0, END)
+    store.setFlipped(not store.tasksListFlipped)
 
     # Displays a flipped & search bar filtered list to task list panel
-    taskList = tasks.copy()
-    if filteredTasks: taskList = [task for task in tasks if task in filteredTasks]
-    for task in taskList: insertItem(task, END)
+    refreshTasksPanelView()
 
 
 """ Sorts tasks when sorting option is changed """
 def sortOptionChanged(*args): sortTasks()
 
+# ============== Undo & Redo ==============
+
+@perfMetrics.timed("undo")
+def undoAction(*args):
+    """ Reverts latest task change, a Clear All or bulk action at once """
+    if undoHistory.undo() is not None: showUndoneOrRedone()
+
+
+@perfMetrics.timed("redo")
+def redoAction(*args):
+    """ Applies latest undone task change again """
+    if undoHistory.redo() is not None: showUndoneOrRedone()
+
+
+def undoOrRedoKey(event):
+    """ Ctrl+Shift+Z redoes, Ctrl+Z sends the same key with Caps Lock on but without Shift & undoes """
+    if event.state & SHIFT_MASK: redoAction()
+    else: undoAction()
+
+
+def showUndoneOrRedone():
+    """ Updates task panel & lets restored tasks be indexed while idle, an active search is run again """
+    if filteredTaskIds is not None: searchTasks()  # Restored or changed tasks may now match, or no longer
+    else: refreshTasksPanelView()
+    root.after(1, warmSearchIndex)
+
+
+def updateEditMenu():
+    """ Names the action undo & redo would apply, greys them out when there's none """
+    for index, (verb, label) in enumerate([("Undo", undoHistory.undoLabel()), ("Redo", undoHistory.redoLabel())]):
+        editMenu.entryconfig(index, label=f"{verb} {label}" if label else verb, state=NORMAL if label else DISABLED)
+
 # ==============================================
 #                 Main Window
 # ==============================================
@@ -835,6 +829,9 @@ root = Tk()
 root.configure(background=WHITE_COLOR)
 root.title('To-Do List Application')
 root.geometry("750x515")
+reminderScheduler = ReminderScheduler(root, showReminders)  # Single timer for every task reminder
+# Coalesces changes into background snapshot writes, each refreshing the first rows shown by the next launch
+snapshotWriter = SnapshotWriter(storage, root, firstPage=firstPageRows)
 
 # Meant to contain & center window elements
 entryFrame = Frame(root, bg=WHITE_COLOR)
@@ -848,7 +845,8 @@ searchTypeVar = StringVar(value="Name")
 sortVar = StringVar(value="Default")
 
 # List of options for the search type and sorting dropdown menus
-searchTypeOptions = ["Name", "Deadline", "Category", "Creation Date", "Description"]
+searchTypeOptions = ["Name", "Deadline", "Category", "Creation Date", "Description",
+                     "Overdue", "Due In 24 Hours", "Due This Week", "Fuzzy"]
 sortOptions = ["Default", "Name", "Deadline", "Creation Date"]
 
 # Search bar
@@ -882,16 +880,31 @@ flipOrderButton.grid(row=0, column=4, padx=4)
 myFrame = Frame(root)
 myFrame.pack(pady=20)
 TaskPanelViewFont = Font(family="Courier", size=15, weight="bold")
-tasksPanelView = Listbox(myFrame, font=TaskPanelViewFont, width=53, height=11,
-                         bg=BLUE_COLOR, bd=0, fg="#5c4033", highlightthickness=0,
-                         selectbackground=BLUE_COLOR, selectforeground=WHITE_COLOR,
-                         activestyle="none")
+if VIRTUAL_TASK_PANEL:
+    tasksPanelView = VirtualTaskList(myFrame, formatTaskRow, font=TaskPanelViewFont, width=53, height=11,
+                                     bg=BLUE_COLOR, fg="#5c4033",
+                                     selectbackground=BLUE_COLOR, selectforeground=WHITE_COLOR)
+else:
+    tasksPanelView = Listbox(myFrame, font=TaskPanelViewFont, width=53, height=11,
+                             bg=BLUE_COLOR, bd=0, fg="#5c4033", highlightthickness=0,
+                             selectbackground=BLUE_COLOR, selectforeground=WHITE_COLOR,
+                             activestyle="none", selectmode=EXTENDED)
 tasksPanelView.pack(side=LEFT, fill=BOTH)
 
 tasksPanelViewScrollbar = Scrollbar(myFrame)
 tasksPanelViewScrollbar.pack(side=RIGHT, fill=BOTH)
-tasksPanelView.config(yscrollcommand=tasksPanelViewScrollbar.set)
-tasksPanelViewScrollbar.config(command=tasksPanelView.yview)
+
+if VIRTUAL_TASK_PANEL:
+    # Pulls & draws rows in view on its own, counting its Tcl calls
+    tasksPanelView.attachScrollbar(tasksPanelViewScrollbar)
+    tasksPanelRenderer = tasksPanelView
+else:
+    tasksPanelView.config(yscrollcommand=tasksPanelViewScrollbar.set)
+    tasksPanelViewScrollbar.config(command=tasksPanelView.yview)
+
+    # Only sends changed rows to the listbox & counts its Tcl calls
+    tasksPanelRenderer = ListboxReconciler(tasksPanelView, formatTaskRow)
+    store.addObserver(tasksPanelRenderer.update)
 
 # ============== Bottom Application Buttons ==============
 
@@ -929,14 +942,21 @@ optionsMenu = tk.Menu(commandMenu, tearoff=False)
 optionsMenu.add_command(label="Save", command=saveTaskList)
 optionsMenu.add_command(label="Load", command=openTaskList)
 optionsMenu.add_command(label="Clear All", command=clearAll)
+optionsMenu.add_command(label="Select All Results", command=selectAllResults)
+optionsMenu.add_command(label="Performance", command=showPerformance)
 commandMenu.add_cascade(label="File Options", menu=optionsMenu)
+editMenu = tk.Menu(commandMenu, tearoff=False, postcommand=updateEditMenu)
+editMenu.add_command(label="Undo", accelerator="Ctrl+Z", command=undoAction)
+editMenu.add_command(label="Redo", accelerator="Ctrl+Y", command=redoAction)
+commandMenu.add_cascade(label="Edit", menu=editMenu)
 root.config(menu=commandMenu)
 
 # ============== Track Application Clicks & Entries ==============
 
 root.protocol("WM_DELETE_WINDOW", onClosing)
 
-entryVar.trace("w", searchTasks)
+entryVar.trace("w", scheduleSearch)
+searchTypeVar.trace("w", scheduleSearch)
 sortVar.trace("w", sortOptionChanged)
 
 root.bind("<Button-1>", onWindowClick)
@@ -945,8 +965,25 @@ entry.bind("<FocusOut>", searchBarFocusOut)
 tasksPanelView.bind('<<ListboxSelect>>', taskSelected)
 tasksPanelView.bind("<FocusOut>", deselectTasks)
 tasksPanelView.bind("<Double-Button-1>", showAndEditInfo)
+tasksPanelView.bind("<Control-a>", selectAllResults)
+root.bind("<Control-z>", undoAction)
+root.bind("<Control-Z>", undoOrRedoKey)
+root.bind("<Control-y>", redoAction)
+root.bind("<Control-Y>", redoAction)  # Caps Lock on
 
 # ============== Retrieve Prior App Status & Start Program ==============
 
-loadSavedFile()
+# Paint window & last session's first rows before the full load
+reportStartup("imports", importedTime)
+showFirstPage()
+root.update()
+reportStartup("first paint")
+try: loadSavedFile()
+except StorageLockedError as error:
+    # The other process keeps saving its tasks, closing without onClosing leaves its save untouched
+    messagebox.showerror("Error", str(error))
+    root.destroy()
+    raise SystemExit(1)
+reportStartup("loaded")
+if STARTUP_BENCHMARK: root.after(1, root.destroy)
 root.mainloop()
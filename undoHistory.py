@@ -0,0 +1,176 @@
+from collections import deque
+from contextlib import contextmanager
+
+from task import Task, TaskList
+
+UNDO_MEMORY_BUDGET = 128 * 1024 * 1024  # Estimated bytes of history kept, oldest actions are forgotten first
+TASK_BYTES = 300  # Estimated size of a task kept alive by the history, besides its name & description
+MUTATION_BYTES = 100  # Estimated size of any other recorded mutation
+getDescription = Task.description.__get__  # Slot value, MappedTask's property would decode it
+
+
+def taskBytes(task):
+    """ Estimates memory a kept task holds, a description still in its binary snapshot holds none """
+    description = getDescription(task)
+    return TASK_BYTES + len(task.name) + (len(description) if type(description) is str else 0)
+
+
+def mutationBytes(mutation):
+    """ Estimates memory a recorded mutation keeps alive, mostly the tasks it holds """
+    action = mutation[0]
+    if action == "restore": tasks = mutation[1]
+    elif action == "add": tasks = [mutation[1]]
+    else: return MUTATION_BYTES
+    return MUTATION_BYTES + sum(map(taskBytes, tasks))
+
+
+def coalesced(mutations):
+    """ Yields mutations with consecutive restores merged into TaskLists, so each segment re-sorts once """
+    restored = TaskList()
+    for mutation in mutations:
+        if mutation[0] == "restore":
+            restored.extend(mutation[1])
+            continue
+        if restored: yield "restore", restored
+        restored = TaskList()
+        yield mutation
+    if restored: yield "restore", restored
+
+
+class UndoHistory:
+    """
+    This class makes user actions on the task store undoable with inverse commands. While an action is
+    recorded the store logs the inverse of each mutation, e.g. a delete keeps the deleted task itself,
+    so an action costs memory in proportion to what it changed & undoing it replays only that.
+    Redoing replays the action's own mutations. Undo & redo are one batch each, so they persist once.
+    """
+
+    def __init__(self, store, memoryBudget=UNDO_MEMORY_BUDGET):
+        self.store = store
+        self.memoryBudget = memoryBudget
+        self.undoEntries = deque()  # (label, mutations, inverse mutations, estimated bytes), oldest first
+        self.redoEntries = deque()
+        self.memoryUsed = 0
+        self.mutations = None  # Mutations of the action being recorded
+
+    @contextmanager
+    def recording(self, label):
+        """ Records store mutations made inside as one undoable action named label, forgets undone actions """
+        if self.mutations is not None:
+            yield
+            return
+        self.mutations = []
+        self.store.undoLog = []
+        self.store.addObserver(self.capture)
+        try: yield
+        finally:
+            self.store.removeObserver(self.capture)
+            mutations, inverses = self.mutations, self.store.undoLog
+            self.mutations = self.store.undoLog = None
+            if inverses:
+                while self.redoEntries: self.memoryUsed -= self.redoEntries.pop()[3]
+                self.push(self.undoEntries, (label, mutations, inverses))
+
+    def capture(self, action, *args):
+        """ Task store observer keeping the recorded action's mutations, user action counts are never redone """
+        if action == "batch": self.mutations.extend(mutation for mutation in args[0] if mutation[0] != "progress")
+        elif action != "progress": self.mutations.append((action, *args))
+
+    def push(self, entries, entry):
+        """
+        Adds entry, then forgets the oldest entries until history fits in memory budget. Entry itself
+        is always kept, so even an action larger than the budget, e.g. a huge Clear All, can be undone.
+        """
+        size = sum(map(mutationBytes, entry[1])) + sum(map(mutationBytes, entry[2]))
+        entries.append((*entry, size))
+        self.memoryUsed += size
+        while self.memoryUsed > self.memoryBudget:
+            older = [queue for queue in (self.undoEntries, self.redoEntries) if len(queue) > (queue is entries)]
+            if not older: break
+            self.memoryUsed -= older[0].popleft()[3]
+
+    def clear(self):
+        """ Forgets every action, e.g. once the store was replaced by a load """
+        self.undoEntries.clear()
+        self.redoEntries.clear()
+        self.memoryUsed = 0
+
+    # ============== Undo & Redo ==============
+
+    def undoLabel(self): return self.undoEntries[-1][0] if self.undoEntries else None
+
+    def redoLabel(self): return self.redoEntries[-1][0] if self.redoEntries else None
+
+    def undo(self):
+        """ Reverts the latest recorded action, returns its label or None if there's nothing to undo """
+        if not self.undoEntries: return None
+        label, mutations, inverses, size = entry = self.undoEntries.pop()
+        self.replay(coalesced(reversed(inverses)))
+        self.redoEntries.append(entry)
+        return label
+
+    def redo(self):
+        """ Applies the latest undone action again, returns its label or None if there's nothing to redo """
+        if not self.redoEntries: return None
+        label, mutations, inverses, size = entry = self.redoEntries.pop()
+        self.replay(mutations)
+        self.undoEntries.append(entry)
+        return label
+
+    def replay(self, mutations):
+        with self.store.batched():
+            for mutation in mutations: self.store.replay(*mutation)
+
+
+# Meant for testing purposes
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+    import time
+
+    from binarySnapshot import BinaryStorage
+    from taskStore import TaskStore
+
+    FRAME_SECONDS = 1 / 60
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    directory = tempfile.mkdtemp()
+    paths = os.path.join(directory, "tasks.bin"), os.path.join(directory, "tasks.journal")
+    store = TaskStore()
+    for i in range(size): store.addTask(f"Task {i}", "2026/9/1/12:00", ["Work"], f"Description of task {i}")
+    storage = BinaryStorage(*paths)
+    storage.save(store)
+    storage.closeFiles()
+
+    # Loaded tasks keep deadlines & descriptions in the snapshot like at launch, the journal is timed on its own
+    store = TaskStore()
+    storage = BinaryStorage(*paths)
+    storage.load(store)
+    journalSeconds = 0
+
+    def timedRecord(action, *args):
+        global journalSeconds
+        start = time.perf_counter()
+        storage.record(action, *args)
+        journalSeconds += time.perf_counter() - start
+    store.removeObserver(storage.record)
+    store.addObserver(timedRecord)
+
+    history = UndoHistory(store)
+    with history.recording("Clear All"): store.clear()
+    journalSeconds = 0
+    start = time.perf_counter()
+    history.undo()
+    undoSeconds = time.perf_counter() - start
+    undecoded = sum(type(getDescription(task)) is not str for task in store.tasksById.values())
+    print(f"Clear All undo of {size} tasks: {undoSeconds * 1000:.0f} ms, journaling it took "
+          f"{journalSeconds * 1000:.0f} ms ({journalSeconds / FRAME_SECONDS:.1f} frames), "
+          f"{undecoded} descriptions still undecoded")
+
+    # The journaled undo brings every task back after a reload
+    expected = [(task.id, task.order, task.name, task.deadline, task.description) for task in store.orderedTasks()]
+    storage.closeFiles()
+    store = TaskStore()
+    BinaryStorage(*paths).load(store)
+    restored = [(task.id, task.order, task.name, task.deadline, task.description) for task in store.orderedTasks()]
+    print("Reloaded tasks match" if restored == expected else "Reloaded tasks differ")
@@ -0,0 +1,207 @@
+from tkinter import Canvas
+
+OVERSCAN_ROWS = 2  # Extra rows drawn below the viewport for partially visible rows
+ROW_PADDING = 2  # Vertical pixels added to font line height
+
+
+class VirtualTaskList(Canvas):
+    """
+    This class is a Listbox-like task panel that only formats & draws the
+    rows in view, pulling task data from the shown task list when scrolled
+    """
+
+    def __init__(self, master, formatRow, font, width=40, height=10, bg="white", fg="black",
+                 selectbackground="grey", selectforeground="white", **kwargs):
+        """ formatRow(task) returns the row text & background color (or None) """
+        self.rowHeight = font.metrics("linespace") + ROW_PADDING
+        super().__init__(master, width=font.measure("0") * width, height=self.rowHeight * height,
+                         bg=bg, highlightthickness=0, bd=0, takefocus=1, **kwargs)
+        self.formatRow = formatRow
+        self.font = font
+        self.colors = {"bg": bg, "fg": fg, "selectbackground": selectbackground,
+                       "selectforeground": selectforeground}
+        self.tasks = []  # Every task shown in panel, in row order
+        self.rowIds = []  # Task ID shown in each row
+        self.rowOf = None  # Task ID -> row, built when first needed after a render
+        self.selectedIds = set()
+        self.anchorRow = None  # Last clicked row, answers curselection without building rowOf
+        self.topRow = 0
+        self.visibleRows = height
+        self.slots = []  # Canvas (rectangle, text) items reused for visible rows
+        self.drawn = []  # What each slot currently shows, to skip unchanged redraws
+        self.scrollbar = None
+        self.tclCalls = 0  # Canvas calls issued since creation
+        self.lastRenderTclCalls = 0  # Canvas calls issued by the most recent render
+
+        self.bind("<Configure>", self.resized)
+        self.bind("<Button-1>", self.clicked)
+        self.bind("<Control-Button-1>", self.controlClicked)
+        self.bind("<Shift-Button-1>", self.shiftClicked)
+        self.bind("<MouseWheel>", lambda event: self.yview("scroll", -1 if event.delta > 0 else 1, "units"))
+        self.bind("<Button-4>", lambda event: self.yview("scroll", -1, "units"))
+        self.bind("<Button-5>", lambda event: self.yview("scroll", 1, "units"))
+        self.bind("<Up>", lambda event: self.moveSelection(-1))
+        self.bind("<Down>", lambda event: self.moveSelection(1))
+        self.createSlots()
+
+    # ============== Rendering ==============
+
+    def render(self, tasks):
+        """ Shows tasks in order & returns the shown task IDs """
+        callsBefore = self.tclCalls
+        self.tasks = tasks
+        self.rowIds = [task["id"] for task in tasks]
+        self.rowOf = None
+        if self.selectedIds: self.selectedIds &= set(self.rowIds)
+        self.scrollTo(self.topRow)
+        self.lastRenderTclCalls = self.tclCalls - callsBefore
+        return self.rowIds
+
+    def createSlots(self):
+        """ Creates enough reusable canvas items to cover the viewport """
+        for i in range(len(self.slots), self.visibleRows + OVERSCAN_ROWS):
+            top = i * self.rowHeight
+            rectangle = self.create_rectangle(0, top, 0, top + self.rowHeight, width=0, state="hidden")
+            text = self.create_text(1, top + ROW_PADDING // 2, anchor="nw", font=self.font, state="hidden")
+            self.slots.append((rectangle, text))
+            self.drawn.append(None)
+
+    def redraw(self):
+        """ Formats & draws rows in view, only changed slots are sent to Tk """
+        width = max(self.winfo_width(), int(self.cget("width")))
+        for i, (rectangle, text) in enumerate(self.slots):
+            row = self.topRow + i
+            if row < len(self.tasks):
+                rowText, color = self.formatRow(self.tasks[row])
+                selected = self.rowIds[row] in self.selectedIds
+                wanted = (rowText, color, selected, width)
+            else: wanted = None
+            if wanted == self.drawn[i]: continue
+            self.drawn[i] = wanted
+
+            if wanted is None:
+                self.itemconfigure(rectangle, state="hidden")
+                self.itemconfigure(text, state="hidden")
+                self.tclCalls += 2
+                continue
+            if selected: fill, textFill = self.colors["selectbackground"], self.colors["selectforeground"]
+            else: fill, textFill = color or self.colors["bg"], self.colors["fg"]
+            top = i * self.rowHeight
+            self.coords(rectangle, 0, top, width, top + self.rowHeight)
+            self.itemconfigure(rectangle, fill=fill, state="normal")
+            self.itemconfigure(text, text=rowText, fill=textFill, state="normal")
+            self.tclCalls += 3
+
+    def resized(self, event):
+        """ Adds slots when viewport grows & redraws rows in view """
+        self.visibleRows = max(1, event.height // self.rowHeight)
+        self.createSlots()
+        self.drawn = [None] * len(self.slots)
+        self.scrollTo(self.topRow)
+
+    # ============== Scrolling ==============
+
+    def attachScrollbar(self, scrollbar):
+        """ Connects a Scrollbar to this panel's own scroll model """
+        self.scrollbar = scrollbar
+        scrollbar.config(command=self.yview)
+        self.updateScrollbar()
+
+    def yview(self, *args):
+        """ Accepts Scrollbar commands, returns viewed fractions when called without any """
+        if not args:
+            if not self.rowIds: return 0.0, 1.0
+            return self.topRow / len(self.rowIds), min(1.0, (self.topRow + self.visibleRows) / len(self.rowIds))
+        if args[0] == "moveto": self.scrollTo(round(float(args[1]) * len(self.rowIds)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2].startswith("page"): amount *= self.visibleRows
+            self.scrollTo(self.topRow + amount)
+
+    def scrollTo(self, row):
+        self.topRow = max(0, min(row, len(self.rowIds) - self.visibleRows))
+        self.redraw()
+        self.updateScrollbar()
+
+    def see(self, row):
+        """ Scrolls just enough to show row """
+        if row < self.topRow: self.scrollTo(row)
+        elif row >= self.topRow + self.visibleRows: self.scrollTo(row - self.visibleRows + 1)
+
+    def updateScrollbar(self):
+        if self.scrollbar is not None: self.scrollbar.set(*self.yview())
+
+    # ============== Listbox Style Selection ==============
+
+    def size(self): return len(self.rowIds)
+
+    def curselection(self):
+        """ Returns selected rows in ascending order """
+        if not self.selectedIds: return ()
+        if len(self.selectedIds) == 1 and self.anchorRow is not None and self.anchorRow < len(self.rowIds) \
+                and self.rowIds[self.anchorRow] in self.selectedIds:
+            return (self.anchorRow,)
+        if self.rowOf is None: self.rowOf = {taskId: row for row, taskId in enumerate(self.rowIds)}
+        return tuple(sorted(self.rowOf[taskId] for taskId in self.selectedIds))
+
+    def selection_set(self, first, last=None):
+        if first == 0 and last == "end": self.selectedIds = set(self.rowIds)
+        else:
+            for row in self.rowRange(first, last): self.selectedIds.add(self.rowIds[row])
+        self.redraw()
+
+    def selection_clear(self, first, last=None):
+        if not self.selectedIds: return
+        if first == 0 and last == "end": self.selectedIds.clear()
+        else:
+            for row in self.rowRange(first, last): self.selectedIds.discard(self.rowIds[row])
+        self.redraw()
+
+    def rowRange(self, first, last):
+        last = first if last is None else last
+        if last == "end": last = len(self.rowIds) - 1
+        return range(max(0, first), min(last, len(self.rowIds) - 1) + 1)
+
+    def clickedRow(self, event):
+        """ Returns row under a click, None below the last row """
+        self.focus_set()
+        row = self.topRow + event.y // self.rowHeight
+        return row if row < len(self.rowIds) else None
+
+    def clicked(self, event):
+        """ Selects only the clicked row like an extended selection Listbox """
+        row = self.clickedRow(event)
+        if row is None: return
+        self.selectedIds = {self.rowIds[row]}
+        self.anchorRow = row
+        self.redraw()
+        self.event_generate("<<ListboxSelect>>")
+
+    def controlClicked(self, event):
+        """ Adds clicked row to the selection or removes it """
+        row = self.clickedRow(event)
+        if row is None: return
+        self.selectedIds ^= {self.rowIds[row]}
+        self.anchorRow = row
+        self.redraw()
+        self.event_generate("<<ListboxSelect>>")
+
+    def shiftClicked(self, event):
+        """ Selects every row between the last clicked row & the clicked row """
+        row = self.clickedRow(event)
+        if row is None: return
+        anchorRow = row if self.anchorRow is None else min(self.anchorRow, len(self.rowIds) - 1)
+        self.selectedIds = set(self.rowIds[min(row, anchorRow):max(row, anchorRow) + 1])
+        self.redraw()
+        self.event_generate("<<ListboxSelect>>")
+
+    def moveSelection(self, amount):
+        """ Moves single selection up or down with arrow keys """
+        selection = self.curselection()
+        if not self.rowIds: return
+        row = max(0, min(selection[0] + amount if selection else 0, len(self.rowIds) - 1))
+        self.selectedIds = {self.rowIds[row]}
+        self.anchorRow = row
+        self.see(row)
+        self.redraw()
+        self.event_generate("<<ListboxSelect>>")